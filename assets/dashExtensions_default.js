@@ -0,0 +1,7 @@
+window.dashExtensions = Object.assign({}, window.dashExtensions, {
+    default: {
+        function0: function(feature, latlng, context) {
+            return L.circleMarker(latlng);
+        }
+    }
+});
\ No newline at end of file
@@ -0,0 +1,48 @@
+"""
+Helpers shared by the benchmarks (which are run as scripts, e.g. python benchmarks/compression.py).
+"""
+
+import argparse
+import statistics
+import time
+from collections.abc import Callable
+from typing import NamedTuple
+
+
+class Timing(NamedTuple):
+    """
+    Per-call timing (in seconds) over the repeated runs of a benchmark.
+    """
+
+    best: float
+    mean: float
+    std: float
+
+    def format(self, scale: float = 1e3) -> str:
+        """
+        Formats the timing as mean ± standard deviation, in units of 1/scale seconds (ms by default).
+        """
+        return f"{self.mean * scale:.1f} ± {self.std * scale:.1f}"
+
+
+def timeit(fn: Callable[[], object], repeat: int, number: int = 1) -> Timing:
+    """
+    Times repeat runs of number calls of fn.
+    """
+    samples = []
+    for _ in range(repeat):
+        tic = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - tic) / number)
+    std = statistics.stdev(samples) if repeat > 1 else 0.0
+    return Timing(min(samples), statistics.mean(samples), std)
+
+
+def parser(repeat: int) -> argparse.ArgumentParser:
+    """
+    Argument parser with the --repeat option (the number of timed runs), to which the benchmark adds its own options.
+    """
+    result = argparse.ArgumentParser()
+    result.add_argument("--repeat", type=int, default=repeat)
+    return result
@@ -0,0 +1,63 @@
+"""
+Benchmark of the payload size and encode/decode time of the ArrowTransform wire formats on typical DataFrames. Usage,
+
+    python benchmarks/arrow_transform.py --rows 100000
+
+The baseline is records JSON (DataFrame.to_dict("records") on dump, pd.DataFrame(records) on load). All timings
+include the JSON (de)serialization of the payload, i.e. the complete round trip through the callback response.
+"""
+
+import importlib.util
+import json
+
+import _common
+import numpy as np
+import pandas as pd
+
+from dash_extensions.enrich import ArrowTransform
+
+
+def make_frames(n_rows: int) -> dict:
+    rng = np.random.default_rng(42)
+    return {
+        "numeric": pd.DataFrame(rng.normal(size=(n_rows, 8)), columns=[f"col{i}" for i in range(8)]),
+        "mixed": pd.DataFrame(
+            {
+                "time": pd.date_range("2020-01-01", periods=n_rows, freq="s"),
+                "category": rng.choice(["alpha", "beta", "gamma", "delta"], size=n_rows),
+                "count": rng.integers(0, 100, size=n_rows),
+                "value": rng.normal(size=n_rows).round(2),
+            }
+        ),
+    }
+
+
+def run(df: pd.DataFrame, wire_formats: list, repeat: int):
+    print(f"{'format':>8} {'size [MB]':>10} {'encode [ms]':>12} {'decode [ms]':>12}")
+    payload = json.dumps(df.to_dict("records"), default=str)
+    encode = _common.timeit(lambda: json.dumps(df.to_dict("records"), default=str), repeat).best
+    decode = _common.timeit(lambda: pd.DataFrame(json.loads(payload)), repeat).best
+    print(f"{'records':>8} {len(payload) / 1e6:>10.2f} {encode * 1e3:>12.1f} {decode * 1e3:>12.1f}")
+    for wire_format in wire_formats:
+        run_transform(ArrowTransform(wire_format=wire_format), df, repeat)
+
+
+def run_transform(transform: ArrowTransform, df: pd.DataFrame, repeat: int):
+    payload = json.dumps(transform._try_dump(df), default=str)
+    encode = _common.timeit(lambda: json.dumps(transform._try_dump(df), default=str), repeat).best
+    decode = _common.timeit(lambda: transform._try_load(json.loads(payload), pd.DataFrame), repeat).best
+    print(f"{transform.wire_format:>8} {len(payload) / 1e6:>10.2f} {encode * 1e3:>12.1f} {decode * 1e3:>12.1f}")
+
+
+def main():
+    parser = _common.parser(repeat=3)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+    wire_formats = ["arrow", "bdata"] if importlib.util.find_spec("pyarrow") is not None else ["bdata"]
+    for name, df in make_frames(args.rows).items():
+        print(f"\n{name} ({args.rows} rows)")
+        run(df, wire_formats, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
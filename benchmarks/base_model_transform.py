@@ -0,0 +1,41 @@
+"""
+Benchmark of the BaseModelTransform load path with and without the model cache, for a (frozen) model holding a list of
+many items that is sent back by the client unchanged. Usage,
+
+    python benchmarks/base_model_transform.py --size 5000
+"""
+
+import _common
+from pydantic import BaseModel, ConfigDict
+
+from dash_extensions.enrich import BaseModelTransform
+
+
+class Item(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    index: int
+    label: str
+    value: float
+
+
+class Table(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    items: tuple[Item, ...]
+
+
+def main():
+    parser = _common.parser(repeat=20)
+    parser.add_argument("--size", type=int, default=5000)
+    args = parser.parse_args()
+    table = Table(items=tuple(Item(index=i, label=f"item {i}", value=i / 2) for i in range(args.size)))
+    print(f"{'cache_size':>10} {'load [ms]':>10}")
+    for cache_size in [0, 16]:
+        transform = BaseModelTransform(cache_size=cache_size)
+        # The payload as produced by the worker (which fills the cache).
+        payload = transform._try_dump(table)
+        load = _common.timeit(lambda: transform._try_load(payload, Table), args.repeat).best  # noqa: B023
+        print(f"{cache_size:>10} {load * 1e3:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark of compression ratio vs. encode/decode throughput of the serverside codecs on typical DataFrames. Usage,
+
+    python benchmarks/compression.py --rows 1000000
+
+Codecs that are not installed (lz4, zstandard) are skipped. The throughput is reported relative to the uncompressed
+(serialized) size, i.e. it is directly comparable across codecs.
+"""
+
+import functools
+import importlib.util
+
+import _common
+import numpy as np
+import pandas as pd
+
+from dash_extensions.enrich import ServersideSerializerRegistry
+
+
+def make_frames(n_rows: int) -> dict:
+    rng = np.random.default_rng(42)
+    return {
+        "numeric": pd.DataFrame(rng.normal(size=(n_rows, 8)), columns=[f"col{i}" for i in range(8)]),
+        "mixed": pd.DataFrame(
+            {
+                "time": pd.date_range("2020-01-01", periods=n_rows, freq="s"),
+                "category": rng.choice(["alpha", "beta", "gamma", "delta"], size=n_rows),
+                "count": rng.integers(0, 100, size=n_rows),
+                "value": rng.normal(size=n_rows).round(2),
+            }
+        ),
+    }
+
+
+def run(df: pd.DataFrame, codecs: list, repeat: int):
+    reference = len(ServersideSerializerRegistry(serializers=[]).dumps(df))
+    print(f"{'codec':>8} {'ratio':>8} {'encode [MB/s]':>14} {'decode [MB/s]':>14}")
+    for codec in codecs:
+        registry = ServersideSerializerRegistry(serializers=[], codec=codec, compression_threshold=0)
+        data = registry.dumps(df)
+        encode = _common.timeit(functools.partial(registry.dumps, df), repeat).best
+        decode = _common.timeit(functools.partial(registry.loads, data), repeat).best
+        print(
+            f"{codec or 'none':>8} {reference / len(data):>8.2f} "
+            f"{reference / encode / 1e6:>14.1f} {reference / decode / 1e6:>14.1f}"
+        )
+
+
+def main():
+    parser = _common.parser(repeat=3)
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+    modules = {"zlib": "zlib", "lz4": "lz4", "zstd": "zstandard"}
+    codecs = [None] + [codec for codec, module in modules.items() if importlib.util.find_spec(module) is not None]
+    for name, df in make_frames(args.rows).items():
+        print(f"\n{name} ({args.rows} rows)")
+        run(df, codecs, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
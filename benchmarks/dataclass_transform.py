@@ -0,0 +1,65 @@
+"""
+Benchmark of the DataclassTransform loaders/dumpers on nested dataclasses holding lists of many elements. Usage,
+
+    python benchmarks/dataclass_transform.py --size 10000
+
+The baseline is dataclass_wizard (fromdict/asdict) invoked per call, compared with the loaders/dumpers compiled by the
+transform in validated (dataclass_wizard) and unvalidated (direct construction) mode.
+"""
+
+import functools
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+import _common
+from dataclass_wizard import asdict, fromdict
+
+from dash_extensions.enrich import DataclassTransform
+
+
+@dataclass
+class Point:
+    x: float
+    y: float
+    label: str
+
+
+@dataclass
+class Series:
+    name: str
+    created: datetime
+    points: list[Point]
+
+
+@dataclass
+class Chart:
+    title: str
+    series: list[Series]
+    tags: dict[str, int]
+
+
+def make_chart(size: int) -> Chart:
+    points = [Point(float(i), float(i) ** 0.5, f"p{i}") for i in range(size)]
+    series = [Series(f"s{i}", datetime(2020, 1, 1) + timedelta(days=i), points) for i in range(3)]
+    return Chart("chart", series, {"a": 1, "b": 2})
+
+
+def main():
+    parser = _common.parser(repeat=5)
+    parser.add_argument("--size", type=int, default=10_000)
+    args = parser.parse_args()
+    chart = make_chart(args.size)
+    data = asdict(chart)
+    print(f"{'path':>12} {'load [ms]':>10} {'dump [ms]':>10}")
+    load = _common.timeit(lambda: fromdict(Chart, data), args.repeat).best
+    dump = _common.timeit(lambda: asdict(chart), args.repeat).best
+    print(f"{'baseline':>12} {load * 1e3:>10.1f} {dump * 1e3:>10.1f}")
+    for name, validate in [("validated", True), ("unvalidated", False)]:
+        transform = DataclassTransform(validate=validate)
+        load = _common.timeit(functools.partial(transform._try_load, data, Chart), args.repeat).best
+        dump = _common.timeit(functools.partial(transform._try_dump, chart), args.repeat).best
+        print(f"{name:>12} {load * 1e3:>10.1f} {dump * 1e3:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Benchmark of the DownsampleTransform on large time series traces. Usage,
+
+    python benchmarks/downsampling.py --points 10000000
+
+For each method, the time to downsample the full trace (i.e. the initial figure), and the time to re-sample a zoomed
+range (i.e. a relayout event, including the lookup of the stored data in a MemoryBackend) are reported.
+"""
+
+import uuid
+
+import _common
+import numpy as np
+
+from dash_extensions.enrich import DownsampleTransform, MemoryBackend
+
+
+def run(transform: DownsampleTransform, figure: dict, relayout: dict, repeat: int):
+    downsample = _common.timeit(lambda: transform._downsample_figure(figure, transform.max_points), repeat).best
+    _, data = transform._downsample_figure(figure, transform.max_points)
+    key = f"downsample_{uuid.uuid4().hex}"
+    transform.backend.set(key, data)
+    resample = _common.timeit(lambda: transform._resample(relayout, key), repeat).best
+    print(f"{transform.method:>8} {downsample * 1e3:>16.1f} {resample * 1e3:>14.1f}")
+
+
+def main():
+    parser = _common.parser(repeat=3)
+    parser.add_argument("--points", type=int, default=10_000_000)
+    parser.add_argument("--max-points", type=int, default=2000)
+    args = parser.parse_args()
+    x = np.datetime64("2020-01-01") + np.arange(args.points).astype("timedelta64[ms]")
+    y = np.random.default_rng(42).normal(size=args.points).cumsum()
+    figure = {"data": [{"type": "scattergl", "x": x, "y": y}]}
+    # A zoom to 10% of the range.
+    relayout = {
+        "xaxis.range[0]": str(x[args.points // 2]),
+        "xaxis.range[1]": str(x[args.points // 2 + args.points // 10]),
+    }
+    print(f"{'method':>8} {'downsample [ms]':>16} {'relayout [ms]':>14}")
+    for method in ["minmax", "lttb"]:
+        transform = DownsampleTransform(
+            backend=MemoryBackend(max_bytes=2 * 1024**3), max_points=args.max_points, method=method
+        )
+        run(transform, figure, relayout, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Benchmark of the response size and encoding time of figure outputs with and without the FigureTransform. Usage,
+
+    python benchmarks/figure_transform.py --points 2000000
+
+The figure (a dict holding numpy arrays, as returned by a callback) is encoded as Dash does, i.e. via to_json_plotly,
+with the given JSON engine ("json" or "orjson"). For reference, the double JSON pass of plotly_jsonify is included.
+"""
+
+import _common
+import numpy as np
+from plotly.io.json import to_json_plotly
+
+from dash_extensions.enrich import FigureTransform, plotly_jsonify
+
+
+def make_figure(n_points: int) -> dict:
+    rng = np.random.default_rng(42)
+    x = np.arange(n_points)
+    traces = [{"type": "scattergl", "x": x, "y": rng.normal(size=n_points).cumsum(), "mode": "lines"} for _ in range(2)]
+    return {"data": traces, "layout": {"title": "random walks"}}
+
+
+def main():
+    parser = _common.parser(repeat=3)
+    parser.add_argument("--points", type=int, default=1_000_000)
+    parser.add_argument("--engine", default="json")
+    args = parser.parse_args()
+    figure = make_figure(args.points)
+    transform = FigureTransform()
+    engine = args.engine
+    paths = {
+        "baseline": lambda: to_json_plotly(figure, engine=engine),
+        "jsonify": lambda: to_json_plotly(plotly_jsonify(figure), engine=engine),
+        "transform": lambda: to_json_plotly(transform._try_dump(figure), engine=engine),
+    }
+    print(f"{'path':>10} {'size [MB]':>10} {'encode [ms]':>12}")
+    for name, fn in paths.items():
+        size = len(fn())
+        print(f"{name:>10} {size / 1e6:>10.2f} {_common.timeit(fn, args.repeat).best * 1e3:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Benchmark of set/get latency as a function of the number of keys for the FileSystemBackend and the
+ShardedFileSystemBackend. Usage,
+
+    python benchmarks/file_system_backends.py --keys 1000000 --threshold 500000
+
+The latency is reported for each window of keys, i.e. flat numbers mean that the cost per operation does not grow with
+the number of entries in the cache.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from dash_extensions.enrich import FileSystemBackend, ShardedFileSystemBackend
+
+
+def run(backend, n_keys: int, window: int, payload: bytes):
+    print(f"{'keys':>10} {'set [us]':>10} {'get [us]':>10}")
+    for start in range(0, n_keys, window):
+        keys = [f"key-{i}" for i in range(start, start + window)]
+        tic = time.perf_counter()
+        for key in keys:
+            backend.set(key, payload)
+        set_latency = (time.perf_counter() - tic) / window * 1e6
+        tic = time.perf_counter()
+        for key in keys[:: max(1, window // 1000)]:
+            backend.get(key, ignore_expired=True)
+        get_latency = (time.perf_counter() - tic) / len(keys[:: max(1, window // 1000)]) * 1e6
+        print(f"{start + window:>10} {set_latency:>10.1f} {get_latency:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--keys", type=int, default=100_000)
+    parser.add_argument("--window", type=int, default=10_000)
+    parser.add_argument("--threshold", type=int, default=50_000, help="max number of entries (FileSystemBackend)")
+    parser.add_argument("--payload", type=int, default=1024, help="payload size in bytes")
+    parser.add_argument("--backends", nargs="+", default=["sharded", "flat"], choices=["sharded", "flat"])
+    args = parser.parse_args()
+    payload = os.urandom(args.payload)
+    for name in args.backends:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            if name == "sharded":
+                # Size the quota like the threshold of the flat backend to trigger eviction at the same point.
+                backend = ShardedFileSystemBackend(cache_dir, max_bytes=args.threshold * (args.payload + 64))
+            else:
+                backend = FileSystemBackend(cache_dir, threshold=args.threshold)
+            print(f"\n{backend.__class__.__name__}")
+            run(backend, args.keys, args.window, payload)
+
+
+if __name__ == "__main__":
+    main()
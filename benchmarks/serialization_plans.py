@@ -0,0 +1,91 @@
+"""
+Microbenchmark of the per-call overhead of the serialization transforms on trivial callbacks. Usage,
+
+    python benchmarks/serialization_plans.py --calls 100000
+
+For each transform, the time per call is reported for the function called directly, for the wrapper used before the
+serialization plans (which passes every argument and output through the transform, see legacy_wrap), and for the
+compiled plan. The timings are the mean ± standard deviation (in ns) over the repeated runs.
+"""
+
+import functools
+import inspect
+
+import _common
+
+from dash_extensions.enrich import (
+    BaseModelTransform,
+    CallbackBlueprint,
+    DataclassTransform,
+    Input,
+    MemoryBackend,
+    Output,
+    ServersideOutputTransform,
+)
+
+
+def trivial(n_clicks, value):
+    return n_clicks
+
+
+def annotated(n_clicks: int, value: str) -> int:
+    return n_clicks
+
+
+def wrap(transform, f):
+    cbp = CallbackBlueprint(Output("store", "data"), Input("btn", "n_clicks"), Input("dd", "value"))
+    cbp.f = f
+    transform.apply_serverside([cbp])
+    return cbp.f
+
+
+def legacy_wrap(transform, f):
+    # The wrapper of SerializationTransform._unpack_pack_callback before the serialization plans were introduced.
+    full_arg_spec = inspect.getfullargspec(f)
+
+    @functools.wraps(f)
+    def decorated_function(*args, **kwargs):
+        args = list(args)
+        for i, arg in enumerate(args):
+            an = full_arg_spec.annotations.get(full_arg_spec.args[i])
+            args[i] = (
+                [transform._try_load(a, an) for a in arg] if isinstance(arg, list) else transform._try_load(arg, an)
+            )
+        for key, arg in kwargs.items():
+            an = full_arg_spec.annotations.get(key)
+            kwargs[key] = (
+                [transform._try_load(a, an) for a in arg] if isinstance(arg, list) else transform._try_load(arg, an)
+            )
+        data = f(*args, **kwargs)
+        data = transform._try_dump(data)
+        if isinstance(data, list):
+            data = [transform._try_dump(element) for element in data]
+        if isinstance(data, tuple):
+            data = tuple([transform._try_dump(element) for element in data])
+        if isinstance(data, dict):
+            data = {key: transform._try_dump(data[key]) for key in data}
+        return data
+
+    return decorated_function
+
+
+def main():
+    parser = _common.parser(repeat=10)
+    parser.add_argument("--calls", type=int, default=100_000)
+    args = parser.parse_args()
+    transforms = {
+        "dataclass": (DataclassTransform, {}),
+        "base_model": (BaseModelTransform, {}),
+        "serverside": (ServersideOutputTransform, {"backends": [MemoryBackend()]}),
+    }
+    n = args.calls // args.repeat
+    print(f"{'transform':>12} {'callback':>10} {'direct [ns]':>14} {'legacy [ns]':>14} {'planned [ns]':>14}")
+    for f in [trivial, annotated]:
+        for name, (transform_type, kwargs) in transforms.items():
+            paths = [f, legacy_wrap(transform_type(**kwargs), f), wrap(transform_type(**kwargs), f)]
+            timings = [_common.timeit(functools.partial(path, 1, "value"), args.repeat, n) for path in paths]
+            print(f"{name:>12} {f.__name__:>10} " + " ".join(f"{t.format(1e9):>14}" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,57 @@
 from __future__ import annotations
 
+import base64
+import collections.abc
+import contextlib
 import dataclasses
+import decimal
+import enum
 import functools
 import hashlib
+import importlib.util
 import inspect
+import io
 import json
 import logging
+import math
+import mmap
+import os
+import pickle
+import re
 import secrets
+import sqlite3
 import struct
 import sys
+import tempfile
 import threading
+import time
 import uuid
-from collections import defaultdict
-from datetime import datetime
-from itertools import compress
-from types import UnionType
-from typing import Any, Callable, Dict, Generic, List, Optional, Tuple, TypeVar, Union, get_args
+from collections import OrderedDict, defaultdict
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextvars import ContextVar
+from datetime import date, datetime
+from itertools import compress, islice
+from types import SimpleNamespace, UnionType
+from typing import (
+    Annotated,
+    Any,
+    BinaryIO,
+    ClassVar,
+    Dict,
+    ForwardRef,
+    Generic,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+    get_args,
+    get_origin,
+    get_type_hints,
+    is_typeddict,
+)
 
 import dash
 import plotly
@@ -29,6 +65,7 @@ from dash import (  # lgtm [py/unused-import]; noqa: F401
     ClientsideFunction,
     Input,
     Output,
+    Patch,
     State,
     callback_context,  # noqa: F401
     ctx,  # noqa: F401
@@ -49,15 +86,17 @@ from dash.dependencies import DashDependency, _Wildcard  # lgtm [py/unused-impor
 from dash.development.base_component import Component
 from dash.exceptions import PreventUpdate
 from dataclass_wizard import asdict, fromdict
-from flask import session
+from flask import Response, abort, has_request_context, request, session
 from flask_caching.backends import FileSystemCache, RedisCache
-from pydantic import BaseModel  # type: ignore
+from pydantic import BaseModel, TypeAdapter  # type: ignore
 
 from dash_extensions import CycleBreaker
 from dash_extensions.utils import as_list
 
 T = TypeVar("T")
 
+logger = logging.getLogger(__name__)
+
 _wildcard_mappings = {ALL: "<ALL>", MATCH: "<MATCH>", ALLSMALLER: "<ALLSMALLER>"}
 _wildcard_values = list(_wildcard_mappings.values())
 
@@ -386,6 +425,10 @@ class DashProxy(dash.Dash):
     DashProxy is a wrapper around the DashBlueprint object enabling drop-in replacement of the original Dash object. It
     enables transforms (via the DashBlueprint object), performs the necessary app configuration for all transforms to
     work (e.g. setting a secret key on the server), and exposes convenience functions such as 'hijack'.
+
+    If serverside_route is True, serverside values are served over HTTP at '_dash-serverside?ref=<reference>', i.e.
+    the browser can fetch large values directly, bypassing the callback (JSON) round trip. Requires a
+    ServersideOutputTransform.
     """
 
     def __init__(
@@ -395,8 +438,11 @@ class DashProxy(dash.Dash):
         include_global_callbacks=True,
         blueprint=None,
         prevent_initial_callbacks="initial_duplicate",
+        serverside_route=False,
         **kwargs,
     ):
+        # Must be set before calling super, as the routes are set up during initialization.
+        self.serverside_route = serverside_route
         super().__init__(*args, prevent_initial_callbacks=prevent_initial_callbacks, **kwargs)
         self.blueprint = (
             DashBlueprint(transforms, include_global_callbacks=include_global_callbacks)
@@ -423,6 +469,17 @@ class DashProxy(dash.Dash):
     def register_callbacks(self):
         self.blueprint.register_callbacks(super())
 
+    def _setup_routes(self):
+        super()._setup_routes()
+        if self.serverside_route:
+            self._add_url("_dash-serverside", self._serve_serverside)
+
+    def _serve_serverside(self):
+        for transform in self.blueprint.transforms:
+            if isinstance(transform, ServersideOutputTransform):
+                return transform.serve(request.args.get("ref", ""))
+        abort(404)
+
     def _setup_server(self):
         with self.setup_server_lock:
             first_request = not bool(self._got_first_request["setup_server"])
@@ -1075,6 +1132,217 @@ def extract_non_optional(annotation):
     return annotation
 
 
+@dataclasses.dataclass
+class _SerializationNode:
+    """
+    Guides the (un)packing of a (nested) value. The transform is applied to the value itself (if apply is True and the
+    value is not descended into), while children and each guide the walk into items by key, or into all items.
+    Branches holding no values to (un)pack are pruned, i.e. the walk is proportional to the relevant leaves.
+    """
+
+    ann: Any = None
+    apply: bool = False
+    children: dict[int | str, _SerializationNode] = dataclasses.field(default_factory=dict)
+    each: _SerializationNode | None = None
+
+    @property
+    def descends(self) -> bool:
+        return len(self.children) > 0 or self.each is not None
+
+    def collect(self, container, key, locations: list, tuples: list):
+        """
+        Collect the (container, key, annotation) locations of the values to (un)pack. Containers are copied before
+        being modified, and tuples (which are converted to lists) are recorded for conversion back afterwards.
+        """
+        value = container[key]
+        if isinstance(value, (list, tuple, dict)) and self.descends:
+            if isinstance(value, tuple):
+                tuples.append((container, key))
+            value = dict(value) if isinstance(value, dict) else list(value)
+            container[key] = value
+            keys = value.keys() if isinstance(value, dict) else range(len(value))
+            for k, child in self.children.items():
+                if k in keys:
+                    child.collect(value, k, locations, tuples)
+            if self.each is not None:
+                for k in keys:
+                    if k not in self.children:
+                        self.each.collect(value, k, locations, tuples)
+            return
+        if not self.apply:
+            return
+        # Multi valued dependencies (e.g. ALL wildcards) are (un)packed element-wise.
+        if isinstance(value, (list, tuple)):
+            if isinstance(value, tuple):
+                tuples.append((container, key))
+            value = list(value)
+            container[key] = value
+            locations.extend((value, k, self.ann) for k in range(len(value)))
+            return
+        locations.append((container, key, self.ann))
+
+
+def _compile_node(structure, ann, required: Callable[[Any], bool], depth: int = 0) -> _SerializationNode | None:
+    """
+    Compile the node guiding the (un)packing of a value described by a dependency structure (if any, i.e. nested
+    lists/dicts of dependencies) and an annotation. Returns None, if nothing needs to be (un)packed.
+    """
+    ann = _strip_optional(ann)
+    if depth > _max_annotation_depth:
+        return _SerializationNode(ann, apply=required(ann)) if required(ann) else None
+    # Structures are descended, unless the annotation applies to the structure as a whole (e.g. a model).
+    is_whole = ann is not None and get_origin(ann) is None and not _is_bare_container(ann) and required(ann)
+    if isinstance(structure, (list, dict)) and not is_whole:
+        keys = structure.keys() if isinstance(structure, dict) else range(len(structure))
+        children = {k: _compile_node(structure[k], _item_annotation(ann, k), required, depth + 1) for k in keys}
+        children = {k: child for k, child in children.items() if child is not None}
+        return _SerializationNode(children=children) if len(children) > 0 else None
+    # Otherwise, the walk is guided by the annotation.
+    node = _SerializationNode(ann, apply=required(ann))
+    keys = _item_keys(ann)
+    if keys is not None:
+        children = {k: _compile_node(None, _item_annotation(ann, k), required, depth + 1) for k in keys}
+        node.children = {k: child for k, child in children.items() if child is not None}
+    else:
+        item_ann = _item_annotation(ann, None)
+        node.each = None if item_ann is None else _compile_node(None, item_ann, required, depth + 1)
+    return node if node.apply or node.descends else None
+
+
+_max_annotation_depth = 16
+
+
+def _strip_optional(ann):
+    # Handles both Optional[X] and X | None.
+    if isinstance(ann, UnionType) or get_origin(ann) is Union:
+        args = [arg for arg in get_args(ann) if arg is not type(None)]
+        return args[0] if len(args) == 1 else ann
+    return ann
+
+
+def _item_keys(ann) -> list | None:
+    """
+    The keys of the items of a heterogeneous container annotation (fixed length tuple, TypedDict), or None.
+    """
+    if is_typeddict(ann):
+        return list(get_type_hints(ann).keys())
+    args = get_args(ann)
+    if get_origin(ann) is tuple and not (len(args) == 2 and args[1] is Ellipsis):
+        return list(range(len(args)))
+    return None
+
+
+def _item_annotation(ann, key) -> Any:
+    """
+    The annotation of an item (by key) of a container annotation, or None if unknown. A key of None denotes any item
+    of a homogeneous container.
+    """
+    ann = _strip_optional(ann)
+    if is_typeddict(ann):
+        return None if key is None else get_type_hints(ann).get(key)
+    origin, args = get_origin(ann), get_args(ann)
+    if not isinstance(origin, type) or len(args) == 0:
+        return None
+    if origin is tuple:
+        if len(args) == 2 and args[1] is Ellipsis:
+            return args[0]
+        return args[key] if isinstance(key, int) and key < len(args) else None
+    if issubclass(origin, collections.abc.Mapping):
+        return args[-1]
+    if issubclass(origin, (collections.abc.Sequence, collections.abc.Set)) and not issubclass(origin, str):
+        return args[0]
+    return None
+
+
+@dataclasses.dataclass(frozen=True)
+class _SerializationPlan:
+    """
+    The nodes guiding the (un)packing of the arguments (by position and keyword) and the outputs of a callback.
+    Compiled once per callback, when the transform is applied.
+    """
+
+    positional: list[_SerializationNode | None]
+    rest_positional: _SerializationNode | None
+    keywords: dict[str, _SerializationNode]
+    rest_keyword: _SerializationNode | None
+    output: _SerializationNode | None
+
+    @property
+    def load(self) -> bool:
+        return (
+            any(node is not None for node in self.positional)
+            or len(self.keywords) > 0
+            or self.rest_positional is not None
+            or self.rest_keyword is not None
+        )
+
+    @property
+    def dump(self) -> bool:
+        return self.output is not None
+
+    def collect(self, args: list, kwargs: dict, locations: list, tuples: list):
+        for i in range(len(args)):
+            node = self.positional[i] if i < len(self.positional) else self.rest_positional
+            if node is not None:
+                node.collect(args, i, locations, tuples)
+        for key in kwargs:
+            node = self.keywords.get(key, self.rest_keyword)
+            if node is not None:
+                node.collect(kwargs, key, locations, tuples)
+
+    def leaves(self) -> list | None:
+        """
+        The annotations of the positional arguments, if all of them are (un)packed as a whole when they hold single
+        values (i.e. no walk is needed), otherwise None.
+        """
+        if any(node is None or not node.apply or node.descends for node in self.positional):
+            return None
+        return [node.ann for node in self.positional]
+
+
+def _leaf_items(leaves: list | None, args: tuple, kwargs: dict) -> list | None:
+    # The (value, annotation) pairs of the arguments, if they are all single values of leaf nodes (the common case).
+    if leaves is None or len(kwargs) > 0 or len(args) != len(leaves):
+        return None
+    for arg in args:
+        if isinstance(arg, (list, tuple, dict)):
+            return None
+    return list(zip(args, leaves))
+
+
+def _restore_tuples(tuples: list):
+    # Deepest containers were recorded last, so they are converted first.
+    for container, key in reversed(tuples):
+        container[key] = tuple(container[key])
+
+
+def _annotation_may_contain(ann, predicate: Callable[[Any], bool]) -> bool:
+    """
+    Whether a value with the annotation might contain values matching the predicate. Only concrete classes (and
+    containers thereof) are ruled out, i.e. missing annotations, forward references (strings), Any, object, type
+    variables, protocols and other non-concrete annotations might contain anything.
+    """
+    if ann is None or ann is Any or ann is object or isinstance(ann, (str, ForwardRef, TypeVar)):
+        return True
+    if predicate(ann):
+        return True
+    origin, args = get_origin(ann), get_args(ann)
+    # The arguments of Literal are values, and those of Annotated (except the first) are metadata.
+    if origin is Literal:
+        return False
+    if origin is Annotated:
+        return _annotation_may_contain(args[0], predicate)
+    # Traverses generic aliases and unions, e.g. Optional[Tuple[Model, str]].
+    if len(args) > 0:
+        return any(_annotation_may_contain(arg, predicate) for arg in args)
+    # Unparameterized containers (e.g. dict or list) might contain anything.
+    if _is_bare_container(ann):
+        return True
+    if isinstance(origin, type):
+        return False
+    return not isinstance(ann, type) or getattr(ann, "_is_protocol", False)
+
+
 class SerializationTransform(DashTransform):
     def apply_serverside(self, callbacks):
         for callback in callbacks:
@@ -1088,49 +1356,245 @@ class SerializationTransform(DashTransform):
     def _try_dump(self, obj: Any):
         raise NotImplementedError
 
-    def _unpack_pack_callback(self, callback):  # noqa: C901
-        full_arg_spec = inspect.getfullargspec(callback.f)
+    def _try_load_many(self, items: list[tuple[Any, Any]]) -> list[Any]:
+        """
+        Load a batch of (data, annotation) pairs. Override to enable bulk operations.
+        """
+        return [self._try_load(data, ann) for data, ann in items]
+
+    def _try_dump_many(self, objs: list[Any]) -> list[Any]:
+        """
+        Dump a batch of objects. Override to enable bulk operations.
+        """
+        return [self._try_dump(obj) for obj in objs]
+
+    def _finalize_load(self, values: list[Any]):
+        """
+        Called with the loaded values after the callback has been evaluated (also if it raised an exception).
+        """
+
+    def _load_required(self, ann) -> bool:
+        """
+        Whether arguments with the annotation must be passed through _try_load. Override to skip arguments that the
+        transform never modifies, e.g. arguments that are not annotated with a model type.
+        """
+        return True
+
+    def _dump_required(self, ann) -> bool:
+        """
+        Whether the outputs of a callback with the (return) annotation must be passed through _try_dump. The
+        annotation is None, if the callback has no return annotation.
+        """
+        return True
+
+    def _compile_plan(self, callback) -> _SerializationPlan:
+        full_arg_spec = _full_arg_spec(callback.f)
+        annotations = full_arg_spec.annotations
+        inputs = callback.inputs
+        # Keyword arguments are described by a dict structure (flexible signature), positional arguments by a list.
+        structure = inputs.structure if isinstance(inputs.structure, dict) else {}
+        positional = [] if isinstance(inputs.structure, dict) else inputs.structure
+        positional = [None if isinstance(dep, DummyDependency) else dep for dep in positional]
+        # Arguments not covered by the structure (e.g. if the function is invoked directly) follow the annotations.
+        n_positional = max(len(positional), len(full_arg_spec.args))
+        positional += [None] * (n_positional - len(positional))
+        names = full_arg_spec.args + full_arg_spec.kwonlyargs
+        keywords = {}
+        for name in list(dict.fromkeys(names + list(structure.keys()))):
+            ann = annotations.get(name, annotations.get(full_arg_spec.varkw))
+            node = _compile_node(structure.get(name), ann, self._load_required)
+            if node is not None:
+                keywords[name] = node
+        return _SerializationPlan(
+            positional=[
+                _compile_node(
+                    dep,
+                    annotations.get(full_arg_spec.args[i] if i < len(full_arg_spec.args) else full_arg_spec.varargs),
+                    self._load_required,
+                )
+                for i, dep in enumerate(positional)
+            ],
+            rest_positional=_compile_node(None, annotations.get(full_arg_spec.varargs), self._load_required),
+            keywords=keywords,
+            rest_keyword=_compile_node(None, annotations.get(full_arg_spec.varkw), self._load_required),
+            output=_compile_node(self._output_structure(callback), annotations.get("return"), self._dump_required),
+        )
+
+    @staticmethod
+    def _output_structure(callback):
+        # Mirrors CallbackBlueprint.register, where single element lists are unpacked.
+        structure = callback.outputs.structure
+        return structure[0] if isinstance(structure, list) and len(structure) == 1 else structure
+
+    def _unpack_pack_callback(self, callback):
+        plan = self._compile_plan(callback)
+        # The plan is fixed, i.e. the properties are evaluated once (not per call).
+        load, dump = plan.load, plan.dump
+        descends = dump and plan.output.descends
+        leaves = plan.leaves() if load else None
 
         def unpack_pack_args(f):
+            # Callbacks that need no (un)packing are not wrapped.
+            if not load and not dump:
+                return f
+
             @functools.wraps(f)
             def decorated_function(*args, **kwargs):
-                args = list(args)
-                # Replace args and kwargs. # TODO: Is recursion needed?
-                for i, arg in enumerate(args):
-                    an = full_arg_spec.annotations.get(full_arg_spec.args[i])
-                    value = [self._try_load(a, an) for a in arg] if isinstance(arg, list) else self._try_load(arg, an)
-                    args[i] = value
-                for key in kwargs:
-                    arg = kwargs[key]
-                    an = full_arg_spec.annotations.get(key)
-                    value = [self._try_load(a, an) for a in arg] if isinstance(arg, list) else self._try_load(arg, an)
-                    kwargs[key] = value
+                loaded = None
+                items = _leaf_items(leaves, args, kwargs) if load else None
+                # Single valued arguments are loaded directly, i.e. without the walk.
+                if items is not None:
+                    args = loaded = self._try_load_many(items)
+                elif load:
+                    args, kwargs = list(args), dict(kwargs)
+                    # Collect the values to load (guided by the plan), and load them in a single batch.
+                    locations, tuples = [], []
+                    plan.collect(args, kwargs, locations, tuples)
+                    loaded = self._try_load_many([(container[key], ann) for container, key, ann in locations])
+                    for (container, key, _), value in zip(locations, loaded):
+                        container[key] = value
+                    _restore_tuples(tuples)
                 # Evaluate function.
-                data = f(*args, **kwargs)
+                try:
+                    data = f(*args, **kwargs)
+                finally:
+                    if loaded is not None:
+                        self._finalize_load(loaded)
+                if not dump:
+                    return data
+                # Fast path for single outputs that are not descended into.
+                if not descends:
+                    ann = plan.output.ann
+                    if isinstance(data, tuple):
+                        return tuple(self._dump_batch(list(data), [ann] * len(data)))
+                    if isinstance(data, list):
+                        return self._dump_batch(data, [ann] * len(data))
+                    # Only dicts are (possibly) dumped one level deep.
+                    if not isinstance(data, dict):
+                        return self._try_dump(data)
+                    return self._dump_batch([data], [ann])[0]
                 # Capture outputs.
-                data = self._try_dump(data)
-                if isinstance(data, list):
-                    data = [self._try_dump(element) for element in data]
-                if isinstance(data, tuple):
-                    data = tuple([self._try_dump(element) for element in data])
-                if isinstance(data, dict):
-                    data = {key: self._try_dump(data[key]) for key in data}
-                return data
+                root, locations, tuples = [data], [], []
+                plan.output.collect(root, 0, locations, tuples)
+                dumped = self._dump_batch(
+                    [container[key] for container, key, _ in locations], [ann for _, _, ann in locations]
+                )
+                for (container, key, _), value in zip(locations, dumped):
+                    container[key] = value
+                _restore_tuples(tuples)
+                return root[0]
 
             return decorated_function
 
         return unpack_pack_args
 
+    def _dump_batch(self, objs: list[Any], anns: list[Any]) -> list[Any]:
+        """
+        Dump a batch of objects. Dicts with unknown items (e.g. if the callback is not annotated) are dumped one level
+        deep, i.e. their values are dumped too.
+        """
+        dumped = self._try_dump_many(objs)
+        # A plain loop, as the batches are small (typically a single output), i.e. the call overhead dominates.
+        nested = []
+        for i, obj in enumerate(dumped):
+            if isinstance(obj, dict) and _items_unknown(anns[i]):
+                nested.append(i)
+        if len(nested) == 0:
+            return dumped
+        # The dicts are copied (not modified), as they may be shared with the caller.
+        items = [(i, key) for i in nested for key in dumped[i]]
+        values = self._try_dump_many([dumped[i][key] for i, key in items])
+        for i in nested:
+            dumped[i] = dict(dumped[i])
+        for (i, key), value in zip(items, values):
+            dumped[i][key] = value
+        return dumped
+
     def sort_key(self):
         return 0
 
 
+def _full_arg_spec(f) -> inspect.FullArgSpec:
+    """
+    Like inspect.getfullargspec, but wrappers (functools.wraps) are followed, i.e. the arguments and annotations of
+    callbacks wrapped by other transforms (e.g. the DownsampleTransform) are those of the original function.
+    """
+    signature = inspect.signature(f)
+    args, varargs, varkw, kwonlyargs, annotations = [], None, None, [], {}
+    defaults, kwonlydefaults = [], {}
+    for name, parameter in signature.parameters.items():
+        if parameter.annotation is not parameter.empty:
+            annotations[name] = parameter.annotation
+        if parameter.kind in (parameter.POSITIONAL_ONLY, parameter.POSITIONAL_OR_KEYWORD):
+            args.append(name)
+            if parameter.default is not parameter.empty:
+                defaults.append(parameter.default)
+        elif parameter.kind is parameter.VAR_POSITIONAL:
+            varargs = name
+        elif parameter.kind is parameter.KEYWORD_ONLY:
+            kwonlyargs.append(name)
+            if parameter.default is not parameter.empty:
+                kwonlydefaults[name] = parameter.default
+        else:
+            varkw = name
+    if signature.return_annotation is not signature.empty:
+        annotations["return"] = signature.return_annotation
+    return inspect.FullArgSpec(
+        args, varargs, varkw, tuple(defaults) or None, kwonlyargs, kwonlydefaults or None, annotations
+    )
+
+
+def _items_unknown(ann) -> bool:
+    # Missing, non-concrete and unparameterized container annotations (e.g. dict) say nothing about the items.
+    ann = _strip_optional(ann)
+    if ann is None or ann is Any or ann is object or isinstance(ann, (str, ForwardRef, TypeVar)):
+        return True
+    return _is_bare_container(ann)
+
+
+def _is_bare_container(ann) -> bool:
+    # E.g. dict, List or collections.abc.Mapping, but not Dict[str, int].
+    if len(get_args(ann)) > 0:
+        return False
+    ann = get_origin(ann) or ann
+    return ann in (dict, list, tuple, set, frozenset) or getattr(ann, "__module__", None) == "collections.abc"
+
+
 # endregion
 
 # region DataclassTransform
 
 
 class DataclassTransform(SerializationTransform):
+    """
+    Serializes dataclasses returned by callbacks, and constructs arguments annotated with a dataclass type. A loader
+    and a dumper are compiled per dataclass type (when the callbacks are registered).
+
+    Args:
+        validate: If True, values are loaded via dataclass_wizard, which validates (and coerces) the field values. If
+            False, the dataclasses are constructed directly from the compiled field types, i.e. nested dataclasses,
+            containers, datetimes, enums, decimals and UUIDs are converted, while other values are passed as-is.
+    """
+
+    def __init__(self, validate: bool = True):
+        super().__init__()
+        self.validate = validate
+        self._loaders: dict[type, Callable[[dict], Any]] = {}
+        self._dumpers: dict[type, Callable[[Any], dict]] = {}
+
+    def _load_required(self, ann) -> bool:
+        return dataclasses.is_dataclass(extract_non_optional(ann))
+
+    def _dump_required(self, ann) -> bool:
+        return _annotation_may_contain(ann, dataclasses.is_dataclass)
+
+    def _compile_plan(self, callback) -> _SerializationPlan:
+        # Compile the loaders/dumpers of the annotated types up front.
+        for name, ann in _full_arg_spec(callback.f).annotations.items():
+            for tp in _dataclass_types(ann):
+                _ = self._dumper(tp) if name == "return" else self._loader(tp)
+        return super()._compile_plan(callback)
+
     def _try_load(self, data: Any, ann=None) -> Any:
         ann = extract_non_optional(ann)
         if not dataclasses.is_dataclass(ann):
@@ -1138,15 +1602,159 @@ class DataclassTransform(SerializationTransform):
         if data is None:
             return None
         if isinstance(data, str):
-            data = json.loads(data)
+            return self._loader(ann)(json.loads(data))
         if isinstance(data, dict):
-            return fromdict(ann, data)
+            return self._loader(ann)(data)
         raise ValueError(f"Unsupported data type for dataclass: {type(data)}")
 
     def _try_dump(self, obj: Any) -> Any:
-        if not dataclasses.is_dataclass(obj):
+        if not dataclasses.is_dataclass(obj) or isinstance(obj, type):
             return obj
-        return asdict(obj)
+        return self._dumper(type(obj))(obj)
+
+    def _loader(self, cls: type) -> Callable[[dict], Any]:
+        loader = self._loaders.get(cls)
+        if loader is None:
+            loader = functools.partial(fromdict, cls) if self.validate else _compile_loader(cls, {})
+            self._loaders[cls] = loader
+        return loader
+
+    def _dumper(self, cls: type) -> Callable[[Any], dict]:
+        dumper = self._dumpers.get(cls)
+        if dumper is None:
+            # The keys match those of dataclass_wizard (camel case), so the formats are interchangeable.
+            dumper = asdict if self.validate else _compile_dumper(cls, {})
+            self._dumpers[cls] = dumper
+        return dumper
+
+
+def _dataclass_types(ann) -> list[type]:
+    if ann is None or isinstance(ann, (str, ForwardRef)):
+        return []
+    if dataclasses.is_dataclass(ann) and isinstance(ann, type):
+        return [ann]
+    return [tp for arg in get_args(ann) for tp in _dataclass_types(arg)]
+
+
+def _compile_loader(ann, memo: dict[type, list]) -> Callable[[Any], Any] | None:
+    """
+    Compile a function constructing a value of the (resolved) annotation from its JSON representation. Returns None,
+    if the value is used as-is. The memo holds the loaders of the dataclasses compiled so far (recursive types).
+    """
+    ann = _strip_optional(ann)
+    if dataclasses.is_dataclass(ann) and isinstance(ann, type):
+        if ann not in memo:
+            memo[ann] = cell = []
+            hints = get_type_hints(ann)
+            fields = [
+                (f.name, _camel_case(f.name), _compile_loader(hints.get(f.name), memo))
+                for f in dataclasses.fields(ann)
+                if f.init
+            ]
+
+            def load_dataclass(data: dict, cls=ann):
+                kwargs = {}
+                for name, key, loader in fields:
+                    # Both the camel case (dataclass_wizard) and the field name are accepted.
+                    if key in data:
+                        value = data[key]
+                    elif name in data:
+                        value = data[name]
+                    else:
+                        continue
+                    kwargs[name] = value if loader is None or value is None else loader(value)
+                return cls(**kwargs)
+
+            cell.append(load_dataclass)
+        cell = memo[ann]
+        # Recursive references are resolved on call, as the loader is not yet compiled.
+        return cell[0] if len(cell) > 0 else lambda data: cell[0](data)
+    if ann is datetime or ann is date:
+        return ann.fromisoformat
+    if isinstance(ann, type) and issubclass(ann, (enum.Enum, uuid.UUID, decimal.Decimal)):
+        return ann
+    origin, args = get_origin(ann), get_args(ann)
+    if not isinstance(origin, type) or len(args) == 0:
+        return None
+    if issubclass(origin, collections.abc.Mapping):
+        value_loader = _compile_loader(args[-1], memo)
+        if value_loader is None:
+            return None
+        return lambda data: {k: v if v is None else value_loader(v) for k, v in data.items()}
+    if issubclass(origin, (list, tuple, collections.abc.Set)) or origin is collections.abc.Sequence:
+        if origin is tuple and not (len(args) == 2 and args[1] is Ellipsis):
+            loaders = [_compile_loader(arg, memo) for arg in args]
+            return lambda data: tuple(v if f is None or v is None else f(v) for f, v in zip(loaders, data))
+        item_loader = _compile_loader(args[0], memo)
+        container = list if origin is collections.abc.Sequence else origin
+        if item_loader is None:
+            return None if container is list else container
+        return lambda data: container([v if v is None else item_loader(v) for v in data])
+    return None
+
+
+def _camel_case(name: str) -> str:
+    # The key transform of dataclass_wizard, e.g. "device_type" -> "deviceType".
+    name = re.sub("_+", "_", name.replace("-", "_").replace(" ", "_"))
+    return name[0].lower() + re.sub("_(.)", lambda m: m.group(1).upper(), name[1:])
+
+
+def _compile_dumper(ann, memo: dict[type, list]) -> Callable[[Any], Any] | None:
+    """
+    Compile a function converting a value of the (resolved) annotation into its JSON representation (matching that of
+    dataclass_wizard.asdict). Returns None, if the value is used as-is.
+    """
+    ann = _strip_optional(ann)
+    if dataclasses.is_dataclass(ann) and isinstance(ann, type):
+        if ann not in memo:
+            memo[ann] = cell = []
+            hints = get_type_hints(ann)
+            fields = [
+                (f.name, _camel_case(f.name), _compile_dumper(hints.get(f.name), memo)) for f in dataclasses.fields(ann)
+            ]
+
+            def dump_dataclass(obj) -> dict:
+                result = {}
+                for name, key, dumper in fields:
+                    value = getattr(obj, name)
+                    result[key] = value if dumper is None or value is None else dumper(value)
+                return result
+
+            cell.append(dump_dataclass)
+        cell = memo[ann]
+        return cell[0] if len(cell) > 0 else lambda obj: cell[0](obj)
+    # Values of unknown type might hold anything, so they are converted dynamically.
+    if ann is None or ann is Any or isinstance(ann, (str, ForwardRef, TypeVar)):
+        return _dump_dynamic
+    if ann is datetime or ann is date:
+        return ann.isoformat
+    if isinstance(ann, type) and issubclass(ann, enum.Enum):
+        return lambda value: value.value
+    if isinstance(ann, type) and issubclass(ann, uuid.UUID):
+        return lambda value: value.hex
+    if isinstance(ann, type) and issubclass(ann, decimal.Decimal):
+        return str
+    origin, args = get_origin(ann), get_args(ann)
+    if not isinstance(origin, type):
+        return None if origin is None else _dump_dynamic
+    if issubclass(origin, collections.abc.Mapping):
+        value_dumper = _compile_dumper(args[-1], memo) if len(args) > 0 else _dump_dynamic
+        if value_dumper is None:
+            return None
+        return lambda data: {k: v if v is None else value_dumper(v) for k, v in data.items()}
+    if issubclass(origin, (list, tuple, collections.abc.Set)) or origin is collections.abc.Sequence:
+        if origin is tuple and len(args) > 0 and not (len(args) == 2 and args[1] is Ellipsis):
+            dumpers = [_compile_dumper(arg, memo) for arg in args]
+            return lambda data: [v if f is None or v is None else f(v) for f, v in zip(dumpers, data)]
+        item_dumper = _compile_dumper(args[0], memo) if len(args) > 0 else _dump_dynamic
+        if item_dumper is None:
+            return None if origin is list else list
+        return lambda data: [v if v is None else item_dumper(v) for v in data]
+    return None
+
+
+def _dump_dynamic(value: Any) -> Any:
+    return asdict(value) if dataclasses.is_dataclass(value) and not isinstance(value, type) else value
 
 
 # endregion
@@ -1156,204 +1764,3302 @@ class DataclassTransform(SerializationTransform):
 
 
 class BaseModelTransform(SerializationTransform):
+    """
+    Serializes Pydantic models returned by callbacks, and validates arguments annotated with a model type.
+
+    Args:
+        wire_format: The format of the serialized models. Either "json" (a JSON string) or "dict" (a plain dict,
+            which avoids double encoding of the callback response). Both formats are accepted on load.
+        cache_size: The number of recent models kept (per worker). If a (JSON string) argument has the same content as
+            a model recently returned or validated by this worker, that model is returned instead of validating the
+            payload again. Only frozen models (model_config frozen=True) are cached, as the cached instances are shared,
+            i.e. they must not be modified in-place. Disabled (0) by default.
+    """
+
+    def __init__(self, wire_format: str = "json", cache_size: int = 0):
+        super().__init__()
+        if wire_format not in ("json", "dict"):
+            raise ValueError(f"Unsupported wire format: {wire_format}")
+        self.wire_format = wire_format
+        self._cache = _LruCache(cache_size) if cache_size > 0 else None
+
+    def _load_required(self, ann) -> bool:
+        return isinstance(extract_non_optional(ann), type(BaseModel))
+
+    def _dump_required(self, ann) -> bool:
+        return _annotation_may_contain(ann, lambda a: isinstance(a, type(BaseModel)))
+
     def _try_load(self, data: Any, ann=None) -> Any:
         ann = extract_non_optional(ann)
         if not isinstance(ann, type(BaseModel)):
             return data
         if data is None:
             return None
-        if isinstance(data, str):
-            return ann.model_validate_json(data)
-        if isinstance(data, dict):
-            return ann.model_validate(data)
-        raise ValueError(f"Unsupported data type for Pydantic model: {type(data)}")
+        if not isinstance(data, (str, dict)):
+            raise ValueError(f"Unsupported data type for Pydantic model: {type(data)}")  # noqa: TRY004 (kept for compatibility)
+        # If the content is unchanged, the validation is skipped.
+        key = self._cache_key(ann, data)
+        if key is not None:
+            model = self._cache.get(key)
+            if model is not None:
+                return model
+        adapter = _type_adapter(ann)
+        model = adapter.validate_json(data) if isinstance(data, str) else adapter.validate_python(data)
+        if key is not None:
+            self._cache.put(key, model)
+        return model
 
     def _try_dump(self, obj: Any) -> Any:
         if not isinstance(obj, BaseModel):
             return obj
-        return obj.model_dump_json()
+        adapter = _type_adapter(type(obj))
+        if self.wire_format == "dict":
+            return adapter.dump_python(obj, mode="json")
+        data = adapter.dump_json(obj).decode()
+        # Models returned by this worker are reused, when the client sends them back unchanged.
+        key = self._cache_key(type(obj), data)
+        if key is not None:
+            self._cache.put(key, obj)
+        return data
+
+    def _cache_key(self, ann, data) -> tuple | None:
+        # Only JSON strings are cached, as hashing a dict costs about as much as validating it.
+        if self._cache is None or not isinstance(data, str) or not ann.model_config.get("frozen", False):
+            return None
+        return ann, _wire_digest(data)
+
+
+@functools.lru_cache(maxsize=256)
+def _type_adapter(ann) -> TypeAdapter:
+    # Building the validator/serializer is expensive, so it is done once per annotation.
+    return TypeAdapter(ann)
+
+
+def _wire_digest(data: str) -> bytes:
+    return hashlib.blake2b(data.encode(), digest_size=16).digest()
 
 
 # endregion
 
-# region Server side output transform
+# region ArrowTransform
 
 
-class ServersideBackend:
-    def get(self, key, ignore_expired=False):
-        raise NotImplementedError()
+class ArrowTransform(SerializationTransform):
+    """
+    Serializes pandas DataFrames and numpy arrays returned by callbacks in a binary (base64 encoded) columnar format,
+    and decodes arguments annotated with a DataFrame/ndarray type. Arrays are serialized as Plotly-style typed arrays,
+    i.e. {dtype, bdata, shape}. On load, numeric data is NOT copied by default, but backed by the decoded buffer, i.e.
+    it is read-only, and in-place modification (e.g. df.loc[i, c] = v) raises an error. Set copy=True to receive
+    writable copies instead. Plain data (e.g. records produced by DataFrame.to_dict) is still accepted on load.
+
+    Args:
+        wire_format: The format of serialized DataFrames. Either "arrow" (an Arrow IPC stream, requires pyarrow) or
+            "bdata" (a typed array per column, columns that are not numeric, boolean or datetime are sent as lists).
+            Both formats are accepted on load.
+        copy: If True, decoded DataFrames/arrays are copied, i.e. they are writable (at the cost of a copy).
+    """
 
-    def set(self, key, value):
-        raise NotImplementedError()
+    def __init__(self, wire_format: str = "arrow", copy: bool = False):
+        super().__init__()
+        if wire_format not in ("arrow", "bdata"):
+            raise ValueError(f"Unsupported wire format: {wire_format}")
+        if wire_format == "arrow" and not _is_installed("pyarrow"):
+            raise ValueError("The arrow wire format requires pyarrow")
+        self.wire_format = wire_format
+        self.copy = copy
 
-    def has(self, key):
-        raise NotImplementedError()
+    def _load_required(self, ann) -> bool:
+        return _is_columnar_type(_strip_optional(ann))
 
-    @property
-    def uid(self) -> str:
-        """
-        Backend identifier. Must be unique across the backend registry. Defaults to class name.
-        """
-        return self.__class__.__name__
+    def _dump_required(self, ann) -> bool:
+        return _annotation_may_contain(ann, _is_columnar_type)
 
+    def _try_load(self, data: Any, ann=None) -> Any:
+        ann = _strip_optional(ann)
+        if not _is_columnar_type(ann) or data is None:
+            return data
+        value = data
+        if isinstance(data, dict) and "bdata" in data:
+            value = _decode_arrow(data["bdata"]) if data.get("type") == "arrow" else _decode_typed_array(data)
+        elif isinstance(data, dict) and data.get("type") == "frame":
+            value = _decode_frame(data)
+        # Decoded values are backed by the (read-only) buffer.
+        if self.copy and value is not data:
+            value = value.copy()
+        # Conversion of plain data, or of payloads of another type than the annotation (e.g. an array for a frame).
+        pd, np = sys.modules.get("pandas"), sys.modules.get("numpy")
+        if pd is not None and issubclass(get_origin(ann) or ann, pd.DataFrame):
+            return value if isinstance(value, pd.DataFrame) else pd.DataFrame(value)
+        return value if isinstance(value, np.ndarray) else np.asarray(value)
 
-class FileSystemBackend(FileSystemCache, ServersideBackend):
-    def __init__(self, cache_dir="file_system_backend", **kwargs):
-        super().__init__(cache_dir, **kwargs)
+    def _try_dump(self, obj: Any) -> Any:
+        np = sys.modules.get("numpy")
+        if np is not None and isinstance(obj, np.ndarray):
+            return _encode_typed_array(obj)
+        pd = sys.modules.get("pandas")
+        if pd is None or not isinstance(obj, pd.DataFrame):
+            return obj
+        # Only (unique) string column names survive the round trip.
+        if not obj.columns.is_unique or not all(isinstance(column, str) for column in obj.columns):
+            return obj
+        if self.wire_format == "arrow":
+            return {"type": "arrow", "bdata": _encode_arrow(obj)}
+        return _encode_frame(obj)
 
-    def get(self, key: str, ignore_expired=False):
-        if key is None:
-            return None
-        if not ignore_expired:
-            return super().get(key)
-        # TODO: This part must be implemented for each type of cache.
-        filename = self._get_filename(key)
-        try:
-            with self._safe_stream_open(filename, "rb") as f:
-                _ = struct.unpack("I", f.read(4))[0]
-                return self.serializer.load(f)
-        except FileNotFoundError:
-            pass
-        except (OSError, EOFError, struct.error):
-            logging.warning(
-                "Exception raised while handling cache file '%s'",
-                filename,
-                exc_info=True,
-            )
-        return None
 
-    @property
-    def uid(self) -> str:
-        """
-        Backend identifier. Must be unique across the backend registry.
-        """
-        return f"{self.__class__.__name__}:{self._path}"
+def _is_columnar_type(ann) -> bool:
+    # Generic aliases (e.g. numpy.typing.NDArray[numpy.float64]) are matched by their origin.
+    ann = get_origin(ann) or ann
+    if not isinstance(ann, type):
+        return False
+    # If pandas/numpy have not been imported, the annotation cannot be one of their types.
+    pd, np = sys.modules.get("pandas"), sys.modules.get("numpy")
+    return (pd is not None and issubclass(ann, pd.DataFrame)) or (np is not None and issubclass(ann, np.ndarray))
 
 
-class RedisBackend(RedisCache, ServersideBackend):
-    """
-    Store that uses Redis as backend. Note, that the timeout must be large enough that a (k,v) pair NEVER expires
-    during a user session. If it does, the user experience for those sessions will be degraded.
-    """
+def _encode_typed_array(array) -> Any:
+    # Only fixed size types (numbers, booleans, datetimes) are binary encoded, other arrays are sent as lists.
+    if array.dtype.kind not in "biufcmM":
+        return array.tolist()
+    return _typed_array_spec(array, array.dtype.str.lstrip("<>|"))
 
-    def __init__(self, default_timeout=24 * 3600, **kwargs):
-        super().__init__(default_timeout=default_timeout, **kwargs)
 
-    def get(self, key, ignore_expired=False):
-        # TODO: Is there any way to honor ignore_expired for redis? I don't think so
-        return super().get(key)
+def _typed_array_spec(array, dtype: str) -> dict:
+    import numpy as np
 
+    if array.dtype.byteorder == ">":
+        array = array.astype(array.dtype.newbyteorder("<"))
+    # The bytes are encoded via an uint8 view (no intermediate copy for contiguous arrays), as e.g. datetimes do not
+    # support the buffer protocol.
+    data = np.ascontiguousarray(array).reshape(-1).view(np.uint8)
+    spec = {"dtype": dtype, "bdata": base64.b64encode(data).decode()}
+    if array.ndim != 1:
+        spec["shape"] = str(array.shape)[1:-1]
+    return spec
 
-class EnrichedOutput(Output):
-    """
-    Like a normal Output, includes additional properties related to storing the data.
-    """
 
-    def __init__(
-        self,
-        component_id,
-        component_property,
-        allow_duplicate=False,
-        backend=None,
-        session_check=None,
-        arg_check=True,
-    ):
-        super().__init__(component_id, component_property, allow_duplicate)
-        self.backend = backend
-        self.session_check = session_check
-        self.arg_check = arg_check
+def _decode_typed_array(spec: dict) -> Any:
+    import numpy as np
 
+    array = np.frombuffer(base64.b64decode(spec["bdata"]), dtype=np.dtype("<" + spec["dtype"]))
+    if "shape" not in spec:
+        return array
+    return array.reshape(tuple(int(n) for n in spec["shape"].split(",") if n.strip()))
 
-class ServersideOutputTransform(SerializationTransform):
-    prefix: str = "SERVERSIDE_"
 
-    def __init__(
-        self,
-        backends: Optional[List[ServersideBackend]] = None,
-        default_backend: Optional[ServersideBackend] = None,
-    ):
-        super().__init__()
-        # Per default, use file system backend.
-        if backends is None:
-            backends = [FileSystemBackend()]
-        self._default_backend: ServersideBackend = backends[0] if default_backend is None else default_backend
-        # Setup registry for easy/fast access.
-        self._backend_registry: Dict[str, ServersideBackend] = {backend.uid: backend for backend in backends}
+def _encode_frame(df) -> dict:
+    import pandas as pd
 
-    def _try_load(self, data: Any, ann=None) -> Any:
-        if not isinstance(data, str):
-            return data
-        if not data.startswith(self.prefix):
-            return data
-        obj = json.loads(data[len(self.prefix) :])
-        backend = self._backend_registry[obj["backend_uid"]]
-        value = backend.get(obj["key"], ignore_expired=True)
-        return value
+    data = {
+        "type": "frame",
+        "columns": list(df.columns),
+        "data": [_encode_column(df.iloc[:, i]) for i in range(df.shape[1])],
+    }
+    # The default index (0, 1, 2, ...) is not sent.
+    index = df.index
+    if not (isinstance(index, pd.RangeIndex) and index.start == 0 and index.step == 1):
+        data["index"] = _encode_column(index)
+        data["index_name"] = index.name
+    return data
 
-    def _try_dump(self, obj: Any) -> Any:
-        if not isinstance(obj, Serverside):
-            return obj
-        backend_uid = obj.backend_uid
-        # If not backend it set, use the default.
-        if backend_uid is None:
-            backend_uid = self._default_backend.uid
-        # Dump the data.
-        backend = self._backend_registry[backend_uid]
-        backend.set(obj.key, obj.value)
-        # Return lookup structure.
-        data = dict(backend_uid=backend_uid, key=obj.key)
-        return f"{self.prefix}{json.dumps(data)}"
 
+def _encode_column(values) -> Any:
+    return _encode_typed_array(values.to_numpy())
 
-class Serverside(Generic[T]):
-    def __init__(
-        self,
-        value: T,
-        key: str = None,
-        backend: Union[ServersideBackend, str, None] = None,
-    ):
-        self.value = value
-        self.key: str = str(uuid.uuid4()) if key is None else key
-        self.backend_uid: str = backend.uid if isinstance(backend, ServersideBackend) else backend
 
+def _decode_frame(data: dict) -> Any:
+    import pandas as pd
 
-# endregion
+    columns = [_decode_typed_array(c) if isinstance(c, dict) else c for c in data["data"]]
+    index = data.get("index")
+    index = _decode_typed_array(index) if isinstance(index, dict) else index
+    index = None if index is None else pd.Index(index, name=data.get("index_name"), copy=False)
+    # Without copy=False, columns of the same type would be consolidated (i.e. copied) into a 2D block.
+    return pd.DataFrame(dict(zip(data["columns"], columns)), index=index, columns=data["columns"], copy=False)
 
 
-# region Batteries included dash proxy object
+def _encode_arrow(df) -> str:
+    import pyarrow as pa
 
+    table = pa.Table.from_pandas(df)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return base64.b64encode(memoryview(sink.getvalue())).decode()
 
-class Dash(DashProxy):
-    def __init__(self, *args, **kwargs):
-        transforms = [
-            TriggerTransform(),
-            MultiplexerTransform(),
-            CycleBreakerTransform(),
-            BlockingCallbackTransform(),
-            ServersideOutputTransform(),
-        ]
-        super().__init__(*args, transforms=transforms, **kwargs)
 
+def _decode_arrow(bdata: str) -> Any:
+    import pyarrow as pa
 
-# endregion
+    table = pa.ipc.open_stream(pa.py_buffer(base64.b64decode(bdata))).read_all()
+    return table.to_pandas(split_blocks=True)
 
-# region Utils
 
+# endregion
 
-def _skip_inputs(args, kwargs, keys: List[Any]):
-    fltr = []
-    str_keys = [key for key in keys if isinstance(key, str)]
-    int_keys = [key for key in keys if isinstance(key, int)]
-    # Drop str keys.
-    for key in str_keys:
-        fltr.append(kwargs.pop(key))
-    # Filter the other ones.
-    if any(int_keys):
-        args = list(args)
-        fltr.extend([arg for i, arg in enumerate(args) if i in keys])
-        args = [arg for i, arg in enumerate(args) if i not in keys]
-    # TODO: Do we need to handle None?
-    return args, kwargs, fltr
+# region FigureTransform
+
+
+class FigureTransform(SerializationTransform):
+    """
+    Encodes the numpy arrays (and pandas Series) in the traces of Plotly figures returned by callbacks, i.e. go.Figure
+    objects and figure dicts, as Plotly.js typed arrays ({dtype, bdata, shape}). The arrays are base64 encoded directly
+    from their buffers in a single walk of the traces, i.e. no intermediate lists are created. 64-bit integers are
+    narrowed to the smallest integer type holding their values. Other arrays (e.g. strings or datetimes) are left for
+    the JSON encoder. Only outputs targeting a "figure" property are encoded, i.e. other values shaped like figures
+    (e.g. the data of a dcc.Store) are passed on as-is.
+    """
+
+    def _load_required(self, ann) -> bool:
+        return False
+
+    def _dump_required(self, ann) -> bool:
+        return _annotation_may_contain(ann, _may_be_figure)
+
+    def _compile_plan(self, callback) -> _SerializationPlan:
+        plan = super()._compile_plan(callback)
+        return dataclasses.replace(plan, output=_prune_figure_node(self._output_structure(callback), plan.output))
+
+    def _try_load(self, data: Any, ann=None) -> Any:
+        return data
+
+    def _try_dump(self, obj: Any) -> Any:
+        figure = _as_figure_dict(obj)
+        if figure is None:
+            return obj
+        # Containers are copied (not modified), as they may be shared with the figure object.
+        encoded = dict(figure, data=[_encode_figure_value(trace) for trace in figure["data"]])
+        if isinstance(figure.get("frames"), (list, tuple)):
+            encoded["frames"] = [_encode_figure_value(frame) for frame in figure["frames"]]
+        return encoded
+
+
+def _prune_figure_node(structure, node: _SerializationNode | None) -> _SerializationNode | None:
+    """
+    Prune the (output) node to the dependencies (in the structure) targeting a figure property.
+    """
+    if node is None:
+        return None
+    if isinstance(structure, DashDependency):
+        return node if structure.component_property == "figure" else None
+    if not isinstance(structure, (list, dict)):
+        return node
+    # If the node applies to the structure as a whole, it applies to each of its items.
+    keys = structure.keys() if isinstance(structure, dict) else range(len(structure))
+    children = {}
+    for k in keys:
+        child = node.children.get(k, node.each) if node.descends else _SerializationNode(node.ann, apply=node.apply)
+        child = _prune_figure_node(structure[k], child)
+        if child is not None:
+            children[k] = child
+    return _SerializationNode(children=children) if len(children) > 0 else None
+
+
+def _as_figure_dict(value) -> dict | None:
+    # If plotly.graph_objects has not been imported, the value cannot be a figure object.
+    basedatatypes = sys.modules.get("plotly.basedatatypes")
+    if basedatatypes is not None and isinstance(value, basedatatypes.BaseFigure):
+        return value.to_plotly_json()
+    return value if _is_figure_dict(value) else None
+
+
+def _is_figure_dict(obj) -> bool:
+    data = obj.get("data") if isinstance(obj, dict) else None
+    return isinstance(data, (list, tuple)) and all(isinstance(trace, dict) for trace in data)
+
+
+def _may_be_figure(ann) -> bool:
+    ann = get_origin(ann) or ann
+    if not isinstance(ann, type):
+        return False
+    basedatatypes = sys.modules.get("plotly.basedatatypes")
+    return issubclass(ann, collections.abc.Mapping) or (
+        basedatatypes is not None and issubclass(ann, basedatatypes.BaseFigure)
+    )
+
+
+# The typed arrays supported by Plotly.js.
+_plotly_dtypes = {
+    "int8": "i1",
+    "uint8": "u1",
+    "int16": "i2",
+    "uint16": "u2",
+    "int32": "i4",
+    "uint32": "u4",
+    "float32": "f4",
+    "float64": "f8",
+}
+
+
+def _encode_figure_value(value) -> Any:
+    if isinstance(value, dict):
+        return {key: _encode_figure_value(item) for key, item in value.items()}
+    # Lists are only descended into if they hold objects (e.g. the dimensions of a splom trace), not values.
+    if isinstance(value, (list, tuple)) and len(value) > 0 and isinstance(value[0], dict):
+        return [_encode_figure_value(item) for item in value]
+    np = sys.modules.get("numpy")
+    if np is None:
+        return value
+    pd = sys.modules.get("pandas")
+    if pd is not None and isinstance(value, (pd.Series, pd.Index)):
+        array = value.to_numpy()
+    elif isinstance(value, np.ndarray):
+        array = value
+    else:
+        return value
+    spec = _plotly_typed_array(array)
+    return value if spec is None else spec
+
+
+def _plotly_typed_array(array) -> dict | None:
+    import numpy as np
+
+    if array.ndim == 0 or array.size == 0:
+        return None
+    # Plotly.js has no 64-bit integer arrays.
+    if array.dtype.kind in "iu" and array.dtype.itemsize == 8:
+        low, high = array.min(), array.max()
+        candidates = (np.int8, np.int16, np.int32) if array.dtype.kind == "i" else (np.uint8, np.uint16, np.uint32)
+        dtype = next((d for d in candidates if np.iinfo(d).min <= low and high <= np.iinfo(d).max), None)
+        if dtype is None:
+            return None
+        array = array.astype(dtype)
+    dtype = _plotly_dtypes.get(array.dtype.name)
+    return None if dtype is None else _typed_array_spec(array, dtype)
+
+
+# endregion
+
+# region Serverside serializers
+
+
+class ServersideSerializer:
+    """
+    Serializer for (a certain type of) serverside values. The tag identifies the serializer in the stored header.
+    """
+
+    tag: str = ""
+
+    def accepts(self, value: Any) -> bool:
+        raise NotImplementedError()
+
+    def dump(self, value: Any, f: BinaryIO):
+        raise NotImplementedError()
+
+    def load(self, buffer: memoryview) -> Any:
+        """
+        Load a value from a buffer. For file based backends, the buffer is memory-mapped.
+        """
+        raise NotImplementedError()
+
+
+class PickleSerializer(ServersideSerializer):
+    tag = "pickle"
+
+    def accepts(self, value: Any) -> bool:
+        return True
+
+    def dump(self, value: Any, f: BinaryIO):
+        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def load(self, buffer: memoryview) -> Any:
+        return pickle.loads(buffer)
+
+
+class ArrowSerializer(ServersideSerializer):
+    """
+    Serializes pandas DataFrames (and pyarrow Tables) in the Arrow IPC file format, split into record batches of (at
+    most) chunk_size rows. On load, numeric columns without nulls are NOT copied, but backed by the (memory-mapped)
+    buffer, i.e. they are read-only. Requires pyarrow.
+    """
+
+    tag = "arrow"
+
+    def __init__(self, chunk_size: int | None = 65536):
+        self.chunk_size = chunk_size
+
+    def accepts(self, value: Any) -> bool:
+        if not _is_installed("pyarrow"):
+            return False
+        pa = sys.modules.get("pyarrow")
+        if pa is not None and isinstance(value, pa.Table):
+            return True
+        # If pandas has not been imported, the value cannot be a DataFrame.
+        pd = sys.modules.get("pandas")
+        if pd is None or not isinstance(value, pd.DataFrame):
+            return False
+        # Only string column names survive the round trip.
+        return all(isinstance(column, str) for column in value.columns)
+
+    def dump(self, value: Any, f: BinaryIO):
+        import pyarrow as pa
+
+        table = value if isinstance(value, pa.Table) else pa.Table.from_pandas(value)
+        with pa.ipc.new_file(f, table.schema) as writer:
+            writer.write_table(table, max_chunksize=self.chunk_size)
+
+    def load_table(self, buffer: memoryview) -> Any:
+        """
+        Load the value as a pyarrow Table. No data is read (from a memory-mapped buffer), until it is accessed.
+        """
+        import pyarrow as pa
+
+        return pa.ipc.open_file(pa.py_buffer(buffer)).read_all()
+
+    def load(self, buffer: memoryview) -> Any:
+        table = self.load_table(buffer)
+        if table.schema.pandas_metadata is None:
+            return table
+        return table.to_pandas(split_blocks=True)
+
+
+class NumpySerializer(ServersideSerializer):
+    """
+    Serializes numpy arrays in the .npy format. On load, the array is NOT copied, but backed by the (memory-mapped)
+    buffer, i.e. it is read-only. Object arrays are not supported.
+    """
+
+    tag = "npy"
+
+    def accepts(self, value: Any) -> bool:
+        # If numpy has not been imported, the value cannot be an array.
+        np = sys.modules.get("numpy")
+        return np is not None and type(value) is np.ndarray and not value.dtype.hasobject
+
+    def dump(self, value: Any, f: BinaryIO):
+        import numpy as np
+
+        np.lib.format.write_array(f, value, allow_pickle=False)
+
+    def load(self, buffer: memoryview) -> Any:
+        import numpy as np
+
+        f = io.BytesIO(buffer[:65536])  # the header is (much) smaller than 64 kB
+        version = np.lib.format.read_magic(f)
+        read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+        shape, fortran_order, dtype = read_header(f)
+        array = np.frombuffer(buffer, dtype=dtype, count=math.prod(shape), offset=f.tell())
+        return array.reshape(shape, order="F" if fortran_order else "C")
+
+
+class ServersideCodec:
+    """
+    Compression codec for serverside payloads. The tag identifies the codec in the stored header.
+    """
+
+    tag: str = ""
+
+    def compress(self, data: memoryview) -> bytes:
+        raise NotImplementedError()
+
+    def decompress(self, data: memoryview) -> bytes:
+        raise NotImplementedError()
+
+
+class ZlibCodec(ServersideCodec):
+    tag = "zlib"
+
+    def __init__(self, level: int = 1):
+        self.level = level
+
+    def compress(self, data: memoryview) -> bytes:
+        import zlib
+
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data: memoryview) -> bytes:
+        import zlib
+
+        return zlib.decompress(data)
+
+
+class Lz4Codec(ServersideCodec):
+    """
+    LZ4 (frame format) codec. Requires the lz4 package.
+    """
+
+    tag = "lz4"
+
+    def __init__(self, level: int = 0):
+        self.level = level
+
+    def compress(self, data: memoryview) -> bytes:
+        import lz4.frame
+
+        return lz4.frame.compress(data, compression_level=self.level)
+
+    def decompress(self, data: memoryview) -> bytes:
+        import lz4.frame
+
+        return lz4.frame.decompress(data)
+
+
+class ZstdCodec(ServersideCodec):
+    """
+    Zstandard codec. Requires the zstandard package.
+    """
+
+    tag = "zstd"
+
+    def __init__(self, level: int = 3):
+        self.level = level
+
+    def compress(self, data: memoryview) -> bytes:
+        import zstandard
+
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def decompress(self, data: memoryview) -> bytes:
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompress(data)
+
+
+def _get_codec(codec: ServersideCodec | str | None) -> ServersideCodec | None:
+    """
+    Resolve a codec (or codec tag). For "auto", the fastest codec installed is used, falling back to zlib.
+    """
+    if codec is None or isinstance(codec, ServersideCodec):
+        return codec
+    if codec == "auto":
+        codec = next((tag for tag, module in [("lz4", "lz4"), ("zstd", "zstandard")] if _is_installed(module)), "zlib")
+    codecs = {c.tag: c for c in [ZlibCodec, Lz4Codec, ZstdCodec]}
+    if codec not in codecs:
+        raise ValueError(f"Unknown codec '{codec}', must be one of {list(codecs)} or 'auto'")
+    return codecs[codec]()
+
+
+class ServersideSerializerRegistry:
+    """
+    Serializer for the serverside backends that picks a format based on the type of the value. The first serializer
+    that accepts the value is used, falling back to pickle. The format is recorded in a small header, which is padded
+    so that the payload is aligned in the file (enabling zero-copy reads). Entries written without a header (i.e.
+    plain pickle) can still be read.
+
+    If a codec is set, payloads of at least compression_threshold bytes are compressed, and the codec is recorded in
+    the header. Compressed payloads are decompressed on read, i.e. they are NOT zero-copy. Entries are readable
+    regardless of the codec setting (provided that the codec package is installed).
+    """
+
+    magic = b"DXS\x01"
+    magic_compressed = b"DXS\x02"
+
+    def __init__(
+        self,
+        serializers: list[ServersideSerializer] | None = None,
+        fallback: ServersideSerializer | None = None,
+        alignment: int = 64,
+        codec: ServersideCodec | str | None = None,
+        compression_threshold: int = 4096,
+    ):
+        self.serializers = [ArrowSerializer(), NumpySerializer()] if serializers is None else serializers
+        self.fallback = PickleSerializer() if fallback is None else fallback
+        self.alignment = alignment
+        self.codec = _get_codec(codec)
+        self.compression_threshold = compression_threshold
+        self._serializers = {s.tag: s for s in [self.fallback] + self.serializers}
+        self._codecs: dict[str, ServersideCodec] = {} if self.codec is None else {self.codec.tag: self.codec}
+
+    def dump(self, value: Any, f: BinaryIO):
+        if self.codec is None:
+            return self._dump(value, f)
+        # The payload size is known only after serialization, so the value is serialized to memory first.
+        buffer = io.BytesIO()
+        self._dump(value, buffer)
+        data = buffer.getbuffer()
+        if len(data) < self.compression_threshold:
+            f.write(data)
+            return
+        # The uncompressed entry (including its header) is compressed as a whole.
+        codec_tag = self.codec.tag.encode()
+        f.write(self.magic_compressed + bytes([len(codec_tag)]) + codec_tag)
+        f.write(self.codec.compress(data))
+
+    def _dump(self, value: Any, f: BinaryIO):
+        for serializer in self.serializers:
+            if not serializer.accepts(value):
+                continue
+            start = f.tell()
+            try:
+                self._write_header(f, serializer.tag)
+                serializer.dump(value, f)
+                return
+            except (TypeError, ValueError, NotImplementedError):
+                logger.debug("Serializer '%s' failed, falling back", serializer.tag, exc_info=True)
+                f.seek(start)
+                f.truncate()
+        self._write_header(f, self.fallback.tag)
+        self.fallback.dump(value, f)
+
+    def load(self, f: BinaryIO, table: bool = False) -> Any:
+        """
+        Load a value. If table is True, Arrow payloads are returned as pyarrow Tables (see ServersideTable).
+        """
+        start = f.tell()
+        magic = f.read(len(self.magic))
+        if magic == self.magic_compressed:
+            codec = self._get_codec(f.read(f.read(1)[0]).decode())
+            return self.loads(codec.decompress(_read_buffer(f)), table=table)
+        f.seek(start)
+        tag = self.read_header(f)
+        if tag is None:
+            return pickle.load(f)
+        return self._load_payload(tag, _read_buffer(f), table)
+
+    def read_header(self, f: BinaryIO) -> str | None:
+        """
+        Read the header of an uncompressed entry, leaving f positioned at the start of the payload. Returns the tag of
+        the serializer, or None (with f rewound) for compressed and legacy (pickle) entries.
+        """
+        start = f.tell()
+        if f.read(len(self.magic)) != self.magic:
+            f.seek(start)
+            return None
+        tag_length = f.read(1)[0]
+        tag = f.read(tag_length).decode()
+        f.seek(f.read(1)[0], os.SEEK_CUR)
+        return tag
+
+    def dumps(self, value: Any) -> bytes:
+        f = io.BytesIO()
+        self.dump(value, f)
+        return f.getvalue()
+
+    def loads(self, data: bytes | None, table: bool = False) -> Any:
+        if data is None:
+            return None
+        view = memoryview(data)
+        if view[: len(self.magic_compressed)] == self.magic_compressed:
+            offset = len(self.magic_compressed)
+            codec = self._get_codec(bytes(view[offset + 1 : offset + 1 + view[offset]]).decode())
+            return self.loads(codec.decompress(view[offset + 1 + view[offset] :]), table=table)
+        if view[: len(self.magic)] != self.magic:
+            return self._loads_legacy(data)
+        offset = len(self.magic)
+        tag_length = view[offset]
+        tag = bytes(view[offset + 1 : offset + 1 + tag_length]).decode()
+        offset += 1 + tag_length
+        offset += 1 + view[offset]
+        return self._load_payload(tag, view[offset:], table)
+
+    def _load_payload(self, tag: str, buffer: memoryview, table: bool) -> Any:
+        serializer = self._serializers[tag]
+        if table and isinstance(serializer, ArrowSerializer):
+            return serializer.load_table(buffer)
+        return serializer.load(buffer)
+
+    def _get_codec(self, tag: str) -> ServersideCodec:
+        # Entries might have been written with another codec than the current one.
+        if tag not in self._codecs:
+            self._codecs[tag] = _get_codec(tag)
+        return self._codecs[tag]
+
+    def _write_header(self, f: BinaryIO, tag: str):
+        tag_bytes = tag.encode()
+        header_length = len(self.magic) + 1 + len(tag_bytes) + 1
+        padding = -(f.tell() + header_length) % self.alignment
+        f.write(self.magic + bytes([len(tag_bytes)]) + tag_bytes + bytes([padding]) + b"\0" * padding)
+
+    @staticmethod
+    def _loads_legacy(data: bytes) -> Any:
+        # Values written by the RedisSerializer of cachelib, i.e. pickled data prefixed with "!", or integers.
+        if data.startswith(b"!"):
+            return pickle.loads(data[1:])
+        try:
+            return int(data)
+        except ValueError:
+            return data
+
+
+def _compressing_serializer(
+    serializer: ServersideSerializerRegistry | None,
+    codec: ServersideCodec | str | None,
+    compression_threshold: int,
+) -> ServersideSerializerRegistry | None:
+    if codec is None:
+        return serializer
+    if serializer is not None:
+        raise ValueError("If a serializer is passed, the codec must be set on the serializer.")
+    # Like the default serializers of the backends, values are pickled.
+    return ServersideSerializerRegistry(serializers=[], codec=codec, compression_threshold=compression_threshold)
+
+
+def _to_arrow_table(value: Any) -> Any:
+    if value is None:
+        return None
+    import pyarrow as pa
+
+    if isinstance(value, pa.Table):
+        return value
+    pd = sys.modules.get("pandas")
+    if pd is not None and isinstance(value, pd.DataFrame):
+        return pa.Table.from_pandas(value)
+    raise TypeError(f"Unsupported type for ServersideTable: {type(value)}")
+
+
+def _load_table_file(filename: str, serializer: ServersideSerializerRegistry) -> Any:
+    # The file based backends prefix the payload with the expiry (4 bytes), which is ignored.
+    try:
+        with open(filename, "rb") as f:
+            f.seek(4)
+            return _to_arrow_table(serializer.load(f, table=True))
+    except FileNotFoundError:
+        return None
+
+
+def _open_file(filename: str) -> BinaryIO | None:
+    # The file based backends prefix the payload with the expiry (4 bytes), which is skipped.
+    try:
+        f = open(filename, "rb")  # noqa: SIM115 (the file is closed by the caller)
+    except FileNotFoundError:
+        return None
+    f.seek(4)
+    return f
+
+
+def _read_buffer(f: BinaryIO) -> memoryview:
+    """
+    Zero-copy view of the remaining content of a (binary) file object. Real files are memory-mapped.
+    """
+    offset = f.tell()
+    try:
+        fileno = f.fileno()
+    except (AttributeError, OSError):
+        return memoryview(f.read())
+    if os.fstat(fileno).st_size <= offset:
+        return memoryview(b"")
+    return memoryview(mmap.mmap(fileno, 0, access=mmap.ACCESS_READ))[offset:]
+
+
+# endregion
+
+# region Server side output transform
+
+
+class ServersideBackend:
+    def get(self, key, ignore_expired=False):
+        raise NotImplementedError()
+
+    def set(self, key, value):
+        raise NotImplementedError()
+
+    def has(self, key):
+        raise NotImplementedError()
+
+    def delete(self, key):
+        raise NotImplementedError()
+
+    def delete_many(self, *keys):
+        """
+        Delete multiple values in one operation. Backends should override this method if they support bulk deletes.
+        """
+        return [key for key in keys if self.delete(key)]
+
+    def get_many(self, *keys, ignore_expired=False) -> list[Any]:
+        """
+        Get multiple values in one operation. Backends should override this method if they support bulk reads.
+        """
+        return [self.get(key, ignore_expired=ignore_expired) for key in keys]
+
+    def has_many(self, *keys) -> list[bool]:
+        """
+        Check the existence of multiple values in one operation. Backends should override this method if they support
+        bulk checks.
+        """
+        return [self.has(key) for key in keys]
+
+    def set_many(self, mapping: dict[str, Any]) -> list[str]:
+        """
+        Set multiple values in one operation. Returns the keys that were set successfully. Backends should override
+        this method if they support bulk writes.
+        """
+        return [key for key, value in mapping.items() if self.set(key, value)]
+
+    def size_of(self, key) -> int | None:
+        """
+        The (stored) size of a value in bytes, or None if unknown. Used for reporting only, so it should be cheap.
+        """
+        return None
+
+    def lock(self, key, timeout: float = 10) -> contextlib.AbstractContextManager:
+        """
+        Exclusive lock for read-modify-write updates of a key (e.g. the versions of a versioned value). Raises a
+        TimeoutError, if the lock is not acquired within timeout seconds. The default lock is process local, i.e.
+        backends shared between processes must override this method.
+        """
+        return _process_lock(f"{self.uid}/{key}", timeout)
+
+    def get_table(self, key) -> Any:
+        """
+        Get a tabular value as a pyarrow Table, or None if not found. Backends should override this method if they
+        support partial reads, i.e. reading only the rows/columns that are accessed (see ServersideTable).
+        """
+        return _to_arrow_table(self.get(key, ignore_expired=True))
+
+    def open(self, key) -> BinaryIO | None:
+        """
+        Open the stored (serialized) value for streaming, i.e. a binary file object positioned at the start of the
+        serializer entry, or None if not found. Backends that do not store serialized values return None.
+        """
+        return None
+
+    @property
+    def session_index(self) -> ServersideSessionIndex | None:
+        """
+        Index of the keys stored per session, used for session quotas and cleanup. None if not supported.
+        """
+        return None
+
+    @property
+    def uid(self) -> str:
+        """
+        Backend identifier. Must be unique across the backend registry. Defaults to class name.
+        """
+        return self.__class__.__name__
+
+
+class FileSystemBackend(FileSystemCache, ServersideBackend):
+    _session_index_file = "sessions.sqlite"
+
+    def __init__(
+        self,
+        cache_dir="file_system_backend",
+        max_workers: int = 8,
+        serializer: ServersideSerializerRegistry | None = None,
+        codec: ServersideCodec | str | None = None,
+        compression_threshold: int = 4096,
+        **kwargs,
+    ):
+        super().__init__(cache_dir, **kwargs)
+        self._executor = _LazyExecutor(max_workers)
+        self._session_index: ServersideSessionIndex | None = None
+        # Per default, values are pickled.
+        serializer = _compressing_serializer(serializer, codec, compression_threshold)
+        if serializer is not None:
+            self.serializer = serializer
+
+    def _is_mgmt(self, name: str) -> bool:
+        # The session index (including the SQLite WAL files) and lock files must not be pruned as cache entries.
+        return super()._is_mgmt(name) or name.startswith(self._session_index_file) or name.endswith(".lock")
+
+    def lock(self, key, timeout: float = 10) -> contextlib.AbstractContextManager:
+        return _file_lock(f"{self._get_filename(key)}.lock", timeout)
+
+    @property
+    def session_index(self) -> ServersideSessionIndex:
+        if self._session_index is None:
+            self._session_index = SqliteSessionIndex(os.path.join(self._path, self._session_index_file))
+        return self._session_index
+
+    def get_many(self, *keys, ignore_expired=False) -> list[Any]:
+        return self._executor.map(lambda key: self.get(key, ignore_expired=ignore_expired), keys)
+
+    def has_many(self, *keys) -> list[bool]:
+        return self._executor.map(self.has, keys)
+
+    def set_many(self, mapping: dict[str, Any], timeout: int | None = None) -> list[str]:
+        results = self._executor.map(lambda item: self.set(item[0], item[1], timeout), list(mapping.items()))
+        return [key for key, result in zip(mapping, results) if result]
+
+    def size_of(self, key) -> int | None:
+        try:
+            return os.path.getsize(self._get_filename(key))
+        except OSError:
+            return None
+
+    def get_table(self, key) -> Any:
+        if not isinstance(self.serializer, ServersideSerializerRegistry):
+            return super().get_table(key)
+        return _load_table_file(self._get_filename(key), self.serializer)
+
+    def open(self, key) -> BinaryIO | None:
+        return _open_file(self._get_filename(key))
+
+    def get(self, key: str, ignore_expired=False):
+        if key is None:
+            return None
+        if not ignore_expired:
+            return super().get(key)
+        # TODO: This part must be implemented for each type of cache.
+        filename = self._get_filename(key)
+        try:
+            with self._safe_stream_open(filename, "rb") as f:
+                _ = struct.unpack("I", f.read(4))[0]
+                return self.serializer.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, EOFError, struct.error):
+            logging.warning(
+                "Exception raised while handling cache file '%s'",
+                filename,
+                exc_info=True,
+            )
+        return None
+
+    @property
+    def uid(self) -> str:
+        """
+        Backend identifier. Must be unique across the backend registry.
+        """
+        return f"{self.__class__.__name__}:{self._path}"
+
+
+class ShardedFileSystemBackend(ServersideBackend):
+    """
+    Native file system store designed for a large number of entries. Values are stored in hash-sharded sub directories,
+    while the size, access time and expiry of each entry are tracked in a small SQLite index. When the total size
+    exceeds max_bytes, (expired and then) least recently used entries are evicted incrementally until the total size is
+    below low_watermark * max_bytes. The cache directory is never listed.
+    """
+
+    _index_file = "index.sqlite"
+    _header = struct.Struct("I")
+
+    def __init__(
+        self,
+        cache_dir="sharded_file_system_backend",
+        max_bytes: int | None = None,
+        low_watermark: float = 0.9,
+        default_timeout: int = 0,
+        shard_depth: int = 2,
+        atime_resolution: int = 60,
+        max_workers: int = 8,
+        serializer: ServersideSerializerRegistry | None = None,
+        codec: ServersideCodec | str | None = None,
+        compression_threshold: int = 4096,
+    ):
+        self._path = os.path.abspath(cache_dir)
+        # Per default, values are pickled.
+        serializer = _compressing_serializer(serializer, codec, compression_threshold)
+        self.serializer = ServersideSerializerRegistry(serializers=[]) if serializer is None else serializer
+        self.max_bytes = max_bytes
+        self.low_watermark = low_watermark
+        self.default_timeout = default_timeout
+        self.shard_depth = shard_depth
+        self.atime_resolution = atime_resolution
+        self._executor = _LazyExecutor(max_workers)
+        self._local = threading.local()
+        self._session_index: ServersideSessionIndex | None = None
+        os.makedirs(self._path, exist_ok=True)
+        self._init_index()
+
+    # region Index
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite connections must not be shared across threads (or processes).
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(os.path.join(self._path, self._index_file), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _init_index(self):
+        conn = self._connection()
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY, size INTEGER NOT NULL, atime REAL NOT NULL, expires REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS entries_atime ON entries (atime);
+            CREATE INDEX IF NOT EXISTS entries_expires ON entries (expires) WHERE expires > 0;
+            CREATE TABLE IF NOT EXISTS stats (id INTEGER PRIMARY KEY CHECK (id = 0), size INTEGER NOT NULL);
+            INSERT OR IGNORE INTO stats (id, size) VALUES (0, 0);
+            CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+                UPDATE stats SET size = size + new.size WHERE id = 0;
+            END;
+            CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size ON entries BEGIN
+                UPDATE stats SET size = size + new.size - old.size WHERE id = 0;
+            END;
+            CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+                UPDATE stats SET size = size - old.size WHERE id = 0;
+            END;
+            """
+        )
+
+    @property
+    def size(self) -> int:
+        """
+        Total size (in bytes) of the entries in the index.
+        """
+        return self._connection().execute("SELECT size FROM stats WHERE id = 0").fetchone()[0]
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    # endregion
+
+    def _get_filename(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        shards = [digest[2 * i : 2 * i + 2] for i in range(self.shard_depth)]
+        return os.path.join(self._path, *shards, digest)
+
+    def get(self, key, ignore_expired=False):
+        if key is None:
+            return None
+        filename = self._get_filename(key)
+        try:
+            with open(filename, "rb") as f:
+                expires = self._header.unpack(f.read(self._header.size))[0]
+                if not ignore_expired and expires != 0 and expires < time.time():
+                    return None
+                value = self.serializer.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, struct.error, pickle.PickleError):
+            logger.warning("Exception raised while handling cache file '%s'", filename, exc_info=True)
+            return None
+        self._touch(key)
+        return value
+
+    def _touch(self, key):
+        # To limit index writes, the access time is only updated with a resolution of atime_resolution seconds.
+        now = time.time()
+        self._connection().execute(
+            "UPDATE entries SET atime = ? WHERE key = ? AND atime < ?", (now, key, now - self.atime_resolution)
+        )
+
+    def set(self, key, value, timeout: int | None = None):
+        timeout = self.default_timeout if timeout is None else timeout
+        expires = int(time.time()) + timeout if timeout else 0
+        filename = self._get_filename(key)
+        try:
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(filename))
+            with os.fdopen(fd, "wb") as f:
+                f.write(self._header.pack(expires))
+                self.serializer.dump(value, f)
+                size = f.tell()
+            os.replace(tmp, filename)
+        except (OSError, pickle.PickleError):
+            logger.warning("Exception raised while handling cache file '%s'", filename, exc_info=True)
+            return False
+        self._connection().execute(
+            "INSERT INTO entries (key, size, atime, expires) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET size = excluded.size, atime = excluded.atime, expires = excluded.expires",
+            (key, size, time.time(), expires),
+        )
+        self._evict()
+        return True
+
+    def has(self, key):
+        try:
+            with open(self._get_filename(key), "rb") as f:
+                expires = self._header.unpack(f.read(self._header.size))[0]
+        except (OSError, struct.error):
+            return False
+        return expires == 0 or expires >= time.time()
+
+    def delete(self, key):
+        self._remove([key])
+        return True
+
+    def delete_many(self, *keys):
+        self._remove(list(keys))
+        return list(keys)
+
+    @property
+    def session_index(self) -> ServersideSessionIndex:
+        if self._session_index is None:
+            self._session_index = SqliteSessionIndex(os.path.join(self._path, "sessions.sqlite"))
+        return self._session_index
+
+    def get_many(self, *keys, ignore_expired=False) -> list[Any]:
+        return self._executor.map(lambda key: self.get(key, ignore_expired=ignore_expired), keys)
+
+    def has_many(self, *keys) -> list[bool]:
+        return self._executor.map(self.has, keys)
+
+    def set_many(self, mapping: dict[str, Any], timeout: int | None = None) -> list[str]:
+        results = self._executor.map(lambda item: self.set(item[0], item[1], timeout), list(mapping.items()))
+        return [key for key, result in zip(mapping, results) if result]
+
+    def size_of(self, key) -> int | None:
+        row = self._connection().execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def lock(self, key, timeout: float = 10) -> contextlib.AbstractContextManager:
+        return _file_lock(os.path.join(self._path, f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.lock"), timeout)
+
+    def get_table(self, key) -> Any:
+        table = _load_table_file(self._get_filename(key), self.serializer)
+        if table is not None:
+            self._touch(key)
+        return table
+
+    def open(self, key) -> BinaryIO | None:
+        f = _open_file(self._get_filename(key))
+        if f is not None:
+            self._touch(key)
+        return f
+
+    def _evict(self, batch_size: int = 64):
+        """
+        Evict entries if the total size exceeds max_bytes. Expired entries go first, then the least recently used.
+        """
+        if self.max_bytes is None or self.size <= self.max_bytes:
+            return
+        target = int(self.max_bytes * self.low_watermark)
+        conn = self._connection()
+        queries = [
+            # Remove expired entries first.
+            (
+                "SELECT key, size FROM entries WHERE expires > 0 AND expires < ? ORDER BY expires LIMIT ?",
+                (time.time(),),
+            ),
+            # Then the least recently used ones.
+            ("SELECT key, size FROM entries ORDER BY atime LIMIT ?", ()),
+        ]
+        for query, params in queries:
+            while (excess := self.size - target) > 0:
+                rows = conn.execute(query, params + (batch_size,)).fetchall()
+                if len(rows) == 0:
+                    break
+                # Only remove as many entries as needed.
+                keys = []
+                for key, size in rows:
+                    keys.append(key)
+                    excess -= size
+                    if excess <= 0:
+                        break
+                if self._remove(keys) == 0:
+                    break
+
+    def _remove(self, keys: list[str]) -> int:
+        removed = []
+        for key in keys:
+            try:
+                os.remove(self._get_filename(key))
+            except FileNotFoundError:
+                pass
+            except OSError:
+                logger.warning("Exception raised while removing cache entry '%s'", key, exc_info=True)
+                continue
+            removed.append(key)
+        if len(removed) > 0:
+            placeholders = ", ".join("?" * len(removed))
+            self._connection().execute(f"DELETE FROM entries WHERE key IN ({placeholders})", removed)
+        return len(removed)
+
+    @property
+    def uid(self) -> str:
+        """
+        Backend identifier. Must be unique across the backend registry.
+        """
+        return f"{self.__class__.__name__}:{self._path}"
+
+
+class RedisBackend(RedisCache, ServersideBackend):
+    """
+    Store that uses Redis as backend. Note, that the timeout must be large enough that a (k,v) pair NEVER expires
+    during a user session. If it does, the user experience for those sessions will be degraded. To keep values that
+    are in use alive, enable sliding expiry.
+
+    Args:
+        sliding_expiry: If True, the timeout of a value is refreshed whenever it is read.
+        timeout_by_size: List of (max_bytes, timeout) pairs. A value is assigned the timeout of the first pair with
+            max_bytes larger than or equal to the (serialized) size of the value, e.g. [(10**6, 24 * 3600),
+            (10**8, 3600)] keeps values below 1 MB for a day, and values below 100 MB for an hour. Larger values are
+            assigned the default timeout.
+        offload_backend: If set, large values are stored in this (cheaper) backend, while Redis holds a small pointer.
+            NB: The offload backend manages the expiry of the values on its own.
+        offload_threshold: Values with an (estimated) size above offload_threshold bytes are offloaded.
+        max_memory_ratio: If Redis is configured with maxmemory, values are also offloaded, if storing them would push
+            the memory usage above max_memory_ratio * maxmemory.
+        max_connections: The size of the connection pool. When all connections are in use, requests wait (up to
+            pool_timeout seconds) for a connection to become available. The wait time is reported in pool_stats.
+        pool_timeout: The maximum time (in seconds) to wait for a connection.
+        socket_timeout: The socket timeout (in seconds) for commands.
+        socket_connect_timeout: The socket timeout (in seconds) for establishing a connection.
+        health_check_interval: Idle connections are checked (PING) before use, if they have been idle for more than
+            health_check_interval seconds.
+        codec: The compression codec (see ServersideSerializerRegistry), e.g. "zlib", "lz4", "zstd" or "auto".
+        compression_threshold: Values with a (serialized) size below compression_threshold bytes are not compressed.
+
+    If host is a string, the connection pool is created lazily in each process, i.e. it is safe to create the backend
+    before the (gunicorn) workers are forked. Other keyword arguments are those of redis.Redis, e.g. port, password,
+    ssl or unix_socket_path. If host is a Redis client, it is used as-is.
+    """
+
+    _memory_info_ttl = 5
+    _pointer_max_bytes = 1024
+    # Deletes the lock only if it is (still) held by the token, atomically.
+    _release_lock_script = (
+        'if redis.call("get", KEYS[1]) == ARGV[1] then return redis.call("del", KEYS[1]) end return 0'
+    )
+
+    def __init__(
+        self,
+        default_timeout=24 * 3600,
+        serializer: ServersideSerializerRegistry | None = None,
+        sliding_expiry: bool = False,
+        timeout_by_size: list[tuple[int, int]] | None = None,
+        offload_backend: ServersideBackend | None = None,
+        offload_threshold: int | None = None,
+        max_memory_ratio: float = 0.9,
+        host: Any = "localhost",
+        max_connections: int = 50,
+        pool_timeout: float = 20,
+        socket_timeout: float | None = None,
+        socket_connect_timeout: float | None = None,
+        health_check_interval: int = 30,
+        key_prefix: str | Callable[[], str] | None = None,
+        codec: ServersideCodec | str | None = None,
+        compression_threshold: int = 4096,
+        **kwargs,
+    ):
+        self._static_client = None
+        self._client = None
+        self._client_pid: int | None = None
+        self._client_lock = threading.Lock()
+        self._pool_kwargs = dict(
+            host=host,
+            max_connections=max_connections,
+            timeout=pool_timeout,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=socket_connect_timeout,
+            health_check_interval=health_check_interval,
+            **kwargs,
+        )
+        self._pool_stats = {"connections_acquired": 0, "wait_time": 0.0, "max_wait_time": 0.0}
+        self._pool_stats_lock = threading.Lock()
+        # The client is created lazily, unless one is passed.
+        super().__init__(
+            host=_missing if isinstance(host, str) else host, default_timeout=default_timeout, key_prefix=key_prefix
+        )
+        # Per default, values are pickled.
+        serializer = _compressing_serializer(serializer, codec, compression_threshold)
+        if serializer is not None:
+            self.serializer = serializer
+        self.sliding_expiry = sliding_expiry
+        self.timeout_by_size = None if timeout_by_size is None else sorted(timeout_by_size)
+        self.offload_backend = offload_backend
+        self.offload_threshold = offload_threshold
+        self.max_memory_ratio = max_memory_ratio
+        self._memory_info: tuple[float, int, int] = (0, 0, 0)
+
+    @property
+    def _write_client(self):
+        if self._static_client is not None:
+            return self._static_client
+        # Connections must not be shared across processes, so a new pool is created after a fork.
+        if self._client_pid != os.getpid():
+            with self._client_lock:
+                if self._client_pid != os.getpid():
+                    import redis
+
+                    pool_kwargs = _connection_pool_kwargs(self._pool_kwargs)
+                    pool = _instrumented_pool_class()(on_wait=self._record_wait, **pool_kwargs)
+                    self._client = redis.Redis(connection_pool=pool)
+                    self._client_pid = os.getpid()
+        return self._client
+
+    @_write_client.setter
+    def _write_client(self, client):
+        self._static_client = None if client is _missing else client
+
+    _read_client = _write_client
+
+    def _record_wait(self, wait_time: float):
+        with self._pool_stats_lock:
+            self._pool_stats["connections_acquired"] += 1
+            self._pool_stats["wait_time"] += wait_time
+            self._pool_stats["max_wait_time"] = max(self._pool_stats["max_wait_time"], wait_time)
+
+    @property
+    def pool_stats(self) -> dict[str, Any]:
+        """
+        Connection pool statistics (for the current process). The wait_time is the total time (in seconds) spent
+        waiting for a connection. If it grows, consider increasing max_connections.
+        """
+        with self._pool_stats_lock:
+            stats = dict(self._pool_stats, max_connections=self._pool_kwargs["max_connections"])
+        if self._static_client is None and self._client is not None and self._client_pid == os.getpid():
+            stats["connections"] = len(self._client.connection_pool._connections)
+        return stats
+
+    def get(self, key, ignore_expired=False):
+        # Expired keys are removed by Redis, i.e. ignore_expired cannot be honored.
+        return self.get_many(key)[0]
+
+    def has_many(self, *keys) -> list[bool]:
+        if len(keys) == 0:
+            return []
+        pipe = self._read_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.exists(f"{self._get_prefix()}{key}")
+        return [bool(count) for count in pipe.execute()]
+
+    def get_many(self, *keys, ignore_expired=False) -> list[Any]:
+        if len(keys) == 0:
+            return []
+        names = [f"{self._get_prefix()}{key}" for key in keys]
+        timeout = self._normalize_timeout(None)
+        # If the timeout doesn't depend on the size, the timeouts are refreshed while reading (GETEX).
+        if self.sliding_expiry and self.timeout_by_size is None and timeout != -1:
+            pipe = self._write_client.pipeline(transaction=False)
+            for name in names:
+                pipe.getex(name, ex=timeout)
+            dumps = pipe.execute()
+        else:
+            # Fetches all values in a single round trip (MGET).
+            dumps = self._read_client.mget(names)
+        values = [self.serializer.loads(dump) for dump in dumps]
+        # Otherwise, the (size dependent) timeouts are refreshed in a single pipelined round trip (EXPIRE).
+        if self.sliding_expiry and self.timeout_by_size is not None:
+            hits = [(name, value, dump) for name, value, dump in zip(names, values, dumps) if dump is not None]
+            self._refresh(
+                {name: value.size if isinstance(value, _OffloadPointer) else len(dump) for name, value, dump in hits}
+            )
+        return self._resolve_pointers(values)
+
+    def open(self, key) -> BinaryIO | None:
+        dump = self._read_client.get(f"{self._get_prefix()}{key}")
+        if dump is None:
+            return None
+        # Pointers are tiny, so only small values need to be checked.
+        if len(dump) < self._pointer_max_bytes:
+            value = self.serializer.loads(dump)
+            if isinstance(value, _OffloadPointer):
+                return None if self.offload_backend is None else self.offload_backend.open(value.key)
+        return io.BytesIO(dump)
+
+    def _refresh(self, sizes: dict[str, int]):
+        if len(sizes) == 0:
+            return
+        pipe = self._write_client.pipeline(transaction=False)
+        for name, size in sizes.items():
+            timeout = self._timeout(size)
+            if timeout == -1:
+                pipe.persist(name)
+            else:
+                pipe.expire(name, timeout)
+        pipe.execute()
+
+    def _resolve_pointers(self, values: list[Any]) -> list[Any]:
+        pointers = [(i, value) for i, value in enumerate(values) if isinstance(value, _OffloadPointer)]
+        if len(pointers) == 0:
+            return values
+        if self.offload_backend is None:
+            logger.warning("Found offloaded serverside value(s), but no offload backend is configured")
+            return [None if isinstance(value, _OffloadPointer) else value for value in values]
+        offloaded = self.offload_backend.get_many(*[pointer.key for _, pointer in pointers], ignore_expired=True)
+        for (i, _), value in zip(pointers, offloaded):
+            values[i] = value
+        return values
+
+    def set(self, key, value, timeout: int | None = None):
+        return len(self.set_many({key: value}, timeout)) == 1
+
+    def set_many(self, mapping: dict[str, Any], timeout: int | None = None) -> list[str]:
+        # Large values are written to the offload backend first, so that a pointer always points to a value.
+        sizes = {key: _estimate_size(value) for key, value in mapping.items()} if self.offload_backend else {}
+        offloaded = {key: value for key, value in mapping.items() if key in sizes and self._offload(sizes[key])}
+        pointers = {}
+        if len(offloaded) > 0:
+            names = {f"{self._get_prefix()}{key}": key for key in offloaded}
+            stored = self.offload_backend.set_many({name: offloaded[key] for name, key in names.items()})
+            pointers = {names[name]: _OffloadPointer(name, sizes[names[name]]) for name in stored}
+        # Writes all values in a single round trip (pipeline).
+        pipe = self._write_client.pipeline(transaction=False)
+        keys = []
+        for key, value in mapping.items():
+            if key in offloaded and key not in pointers:
+                continue
+            dump = self.serializer.dumps(pointers.get(key, value))
+            name = f"{self._get_prefix()}{key}"
+            size_timeout = self._timeout(pointers[key].size if key in pointers else len(dump), timeout)
+            pipe.set(name, dump, ex=None if size_timeout == -1 else size_timeout)
+            keys.append(key)
+        results = pipe.execute()
+        return [key for key, was_set in zip(keys, results) if was_set]
+
+    def _timeout(self, size: int, timeout: int | None = None) -> int:
+        # An explicit timeout takes precedence over the size based ones.
+        if timeout is None and self.timeout_by_size is not None:
+            timeout = next((t for max_bytes, t in self.timeout_by_size if size <= max_bytes), None)
+        return self._normalize_timeout(timeout)
+
+    def _offload(self, size: int) -> bool:
+        if self.offload_threshold is not None and size > self.offload_threshold:
+            return True
+        max_memory, used_memory = self._get_memory_info()
+        return max_memory > 0 and used_memory + size > self.max_memory_ratio * max_memory
+
+    def _get_memory_info(self) -> tuple[int, int]:
+        # The memory info is cached to avoid a round trip per write.
+        checked, max_memory, used_memory = self._memory_info
+        if time.time() - checked > self._memory_info_ttl:
+            try:
+                info = self._read_client.info("memory")
+                max_memory, used_memory = int(info.get("maxmemory", 0)), int(info.get("used_memory", 0))
+            except Exception:
+                logger.debug("Unable to read the Redis memory info", exc_info=True)
+                max_memory, used_memory = 0, 0
+            self._memory_info = (time.time(), max_memory, used_memory)
+        return max_memory, used_memory
+
+    def delete(self, key):
+        return len(self.delete_many(key)) == 1
+
+    def delete_many(self, *keys):
+        if len(keys) == 0:
+            return []
+        names = [f"{self._get_prefix()}{key}" for key in keys]
+        if self.offload_backend is not None:
+            self.offload_backend.delete_many(*names)
+        self._write_client.delete(*names)
+        return list(keys)
+
+    def size_of(self, key) -> int | None:
+        return self._read_client.strlen(f"{self._get_prefix()}{key}") or None
+
+    @contextlib.contextmanager
+    def lock(self, key, timeout: float = 10) -> Iterator[None]:
+        name, token = f"{self._get_prefix()}{key}#lock", secrets.token_hex(16)
+        deadline = time.monotonic() + timeout
+        # The lock expires, in case the holder dies before releasing it.
+        while not self._write_client.set(name, token, nx=True, px=60_000):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Timeout while waiting for the lock of serverside value '{key}'")
+            time.sleep(0.005)
+        try:
+            yield
+        finally:
+            # The lock is only released by its holder (it might have expired, and been acquired by another process).
+            self._write_client.register_script(self._release_lock_script)(keys=[name], args=[token])
+
+    @property
+    def session_index(self) -> ServersideSessionIndex:
+        return RedisSessionIndex(self._write_client, f"{self._get_prefix()}__sessions__:")
+
+
+class SharedMemoryBackend(ServersideBackend):
+    """
+    Host-local store for multi-worker (single host) deployments. Each value is written once to a file in a shared
+    memory file system (/dev/shm, if available), which all worker processes memory-map read-only. Arrow tables (and
+    DataFrames) and numpy arrays are loaded without copying (see ServersideSerializerRegistry), i.e. the workers share
+    the same physical pages. Entries are removed by unlinking the file. As the kernel reference counts the mappings,
+    the memory is released when the last worker drops its views, so removing an entry never invalidates a value in use.
+    When the total size exceeds max_bytes, the least recently used entries are removed until the total size is below
+    low_watermark * max_bytes. The total size is tracked from the writes of the process, and the directory is scanned
+    at most every scan_interval seconds (or when the tracked size exceeds max_bytes) to account for other processes.
+    """
+
+    _header = struct.Struct("I")
+
+    def __init__(
+        self,
+        path: str | None = None,
+        max_bytes: int | None = None,
+        low_watermark: float = 0.9,
+        scan_interval: float = 1,
+        default_timeout: int = 0,
+        serializer: ServersideSerializerRegistry | None = None,
+    ):
+        if path is None:
+            root = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+            path = os.path.join(root, "dash_extensions")
+        self._path = os.path.abspath(path)
+        self.max_bytes = max_bytes
+        self.low_watermark = low_watermark
+        self.scan_interval = scan_interval
+        self.default_timeout = default_timeout
+        self.serializer = ServersideSerializerRegistry() if serializer is None else serializer
+        self._size: int | None = None
+        self._scanned = 0.0
+        self._evict_lock = threading.Lock()
+        os.makedirs(self._path, exist_ok=True)
+
+    def _get_filename(self, key: str) -> str:
+        return os.path.join(self._path, hashlib.sha256(key.encode("utf-8")).hexdigest())
+
+    def get(self, key, ignore_expired=False):
+        if key is None:
+            return None
+        filename = self._get_filename(key)
+        try:
+            with open(filename, "rb") as f:
+                expires = self._header.unpack(f.read(self._header.size))[0]
+                if not ignore_expired and expires != 0 and expires < time.time():
+                    return None
+                # The mapping outlives the file handle (and the file itself, if it is unlinked).
+                value = self.serializer.load(f)
+            # The modification time doubles as access time for the LRU eviction.
+            os.utime(filename)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, struct.error, pickle.PickleError):
+            logger.warning("Exception raised while handling shared memory file '%s'", filename, exc_info=True)
+            return None
+        return value
+
+    def set(self, key, value, timeout: int | None = None):
+        timeout = self.default_timeout if timeout is None else timeout
+        expires = int(time.time()) + timeout if timeout else 0
+        filename = self._get_filename(key)
+        try:
+            # Write to a temporary file, and move it into place, so that readers never see partial entries.
+            fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=self._path)
+            with os.fdopen(fd, "wb") as f:
+                f.write(self._header.pack(expires))
+                self.serializer.dump(value, f)
+                size = f.tell()
+            os.replace(tmp, filename)
+        except (OSError, pickle.PickleError):
+            logger.warning("Exception raised while handling shared memory file '%s'", filename, exc_info=True)
+            return False
+        self._evict(filename, size)
+        return True
+
+    def has(self, key):
+        try:
+            with open(self._get_filename(key), "rb") as f:
+                expires = self._header.unpack(f.read(self._header.size))[0]
+        except (OSError, struct.error):
+            return False
+        return expires == 0 or expires >= time.time()
+
+    def delete(self, key):
+        try:
+            os.remove(self._get_filename(key))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def size_of(self, key) -> int | None:
+        try:
+            return os.path.getsize(self._get_filename(key))
+        except OSError:
+            return None
+
+    def lock(self, key, timeout: float = 10) -> contextlib.AbstractContextManager:
+        return _file_lock(f"{self._get_filename(key)}.lock", timeout)
+
+    def get_table(self, key) -> Any:
+        if not isinstance(self.serializer, ServersideSerializerRegistry):
+            return super().get_table(key)
+        return _load_table_file(self._get_filename(key), self.serializer)
+
+    def open(self, key) -> BinaryIO | None:
+        return _open_file(self._get_filename(key))
+
+    @property
+    def size(self) -> int:
+        """
+        Total size (in bytes) of the entries.
+        """
+        return sum(entry.stat().st_size for entry in self._entries())
+
+    def _entries(self):
+        with os.scandir(self._path) as it:
+            return [entry for entry in it if entry.is_file() and not entry.name.endswith((".tmp", ".lock"))]
+
+    def _evict(self, protected: str, written: int):
+        if self.max_bytes is None:
+            return
+        with self._evict_lock:
+            # Between scans, the size is tracked from the writes of this process (overwrites and removals are ignored,
+            # i.e. the size is overestimated, if anything).
+            if self._size is not None and time.monotonic() - self._scanned < self.scan_interval:
+                self._size += written
+                if self._size <= self.max_bytes:
+                    return
+            entries = [(entry.stat(), entry.path) for entry in self._entries()]
+            self._scanned = time.monotonic()
+            size = sum(stat.st_size for stat, _ in entries)
+            # Remove the least recently used entries (but never the one just written) down to the low watermark, so
+            # that the cost of the scan is amortized over the subsequent writes.
+            if size > self.max_bytes:
+                target = int(self.max_bytes * self.low_watermark)
+                for stat, filename in sorted(entries, key=lambda item: item[0].st_mtime):
+                    if size <= target:
+                        break
+                    if filename == protected:
+                        continue
+                    try:
+                        os.remove(filename)
+                    except FileNotFoundError:
+                        pass
+                    size -= stat.st_size
+            self._size = size
+
+    @property
+    def uid(self) -> str:
+        """
+        Backend identifier. Must be unique across the backend registry.
+        """
+        return f"{self.__class__.__name__}:{self._path}"
+
+
+@dataclasses.dataclass(frozen=True)
+class _OffloadPointer:
+    """
+    Placeholder stored in Redis for a value that has been offloaded to another backend.
+    """
+
+    key: str
+    size: int
+
+
+class MemoryBackend(ServersideBackend):
+    """
+    In-process store that keeps (deserialized) values in memory, evicting the least recently used entries when the
+    total (estimated) size exceeds max_bytes. Note, that values are NOT copied, i.e. in-place modifications of a value
+    returned by the backend will be visible to subsequent reads. As the data lives in the worker process, it is
+    intended mainly as the first tier of a TieredBackend.
+    """
+
+    def __init__(self, max_bytes: int = 512 * 1024**2, default_timeout: int = 0):
+        self.max_bytes = max_bytes
+        self.default_timeout = default_timeout
+        self._entries: OrderedDict[str, tuple[Any, int, float]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, ignore_expired=False):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, _, expires = entry
+            if not ignore_expired and expires and expires < time.time():
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout=None):
+        size = _estimate_size(value)
+        # Values larger than the budget are never stored.
+        if size > self.max_bytes:
+            self.delete(key)
+            return False
+        timeout = self.default_timeout if timeout is None else timeout
+        expires = time.time() + timeout if timeout else 0
+        with self._lock:
+            self._pop(key)
+            while self._entries and self._size + size > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+            self._entries[key] = (value, size, expires)
+            self._size += size
+        return True
+
+    def has(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def delete(self, key):
+        with self._lock:
+            return self._pop(key)
+
+    def size_of(self, key) -> int | None:
+        entry = self._entries.get(key)
+        return None if entry is None else entry[1]
+
+    def _pop(self, key) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._size -= entry[1]
+        return True
+
+    @property
+    def size(self) -> int:
+        """
+        Estimated size (in bytes) of the values currently held in memory.
+        """
+        return self._size
+
+
+class TieredBackend(ServersideBackend):
+    """
+    Composite store that chains a number of backends, ordered from fastest (e.g. a MemoryBackend) to slowest (e.g. a
+    RedisBackend). Writes go through all tiers, while reads are served by the fastest tier holding the key. On a hit in
+    a slower tier, the value is promoted to the faster tiers.
+    """
+
+    def __init__(self, tiers: list[ServersideBackend]):
+        if len(tiers) == 0:
+            raise ValueError("A TieredBackend requires at least one tier.")
+        self.tiers = tiers
+
+    def get(self, key, ignore_expired=False):
+        for i, tier in enumerate(self.tiers):
+            value = tier.get(key, ignore_expired=ignore_expired)
+            if value is None:
+                continue
+            # Promote the value to the faster tiers.
+            for faster_tier in self.tiers[:i]:
+                faster_tier.set(key, value)
+            return value
+        return None
+
+    def set(self, key, value):
+        # Write the slowest (most durable) tier first, so that a key in a fast tier is always backed by the slow ones.
+        results = [tier.set(key, value) for tier in reversed(self.tiers)]
+        return all(results)
+
+    def has(self, key):
+        return any(tier.has(key) for tier in self.tiers)
+
+    def has_many(self, *keys) -> list[bool]:
+        found = [False] * len(keys)
+        for tier in self.tiers:
+            missing = [i for i, hit in enumerate(found) if not hit]
+            if len(missing) == 0:
+                break
+            for i, hit in zip(missing, tier.has_many(*[keys[i] for i in missing])):
+                found[i] = hit
+        return found
+
+    def delete(self, key):
+        results = [tier.delete(key) for tier in self.tiers]
+        return all(results)
+
+    def delete_many(self, *keys):
+        results = [set(tier.delete_many(*keys)) for tier in self.tiers]
+        return [key for key in keys if all(key in result for result in results)]
+
+    @property
+    def session_index(self) -> ServersideSessionIndex | None:
+        # The slowest tier is the most durable, so its index is authoritative.
+        return self.tiers[-1].session_index
+
+    def get_many(self, *keys, ignore_expired=False) -> list[Any]:
+        values: dict[str, Any] = {}
+        missing = list(dict.fromkeys(keys))
+        for i, tier in enumerate(self.tiers):
+            if len(missing) == 0:
+                break
+            tier_values = tier.get_many(*missing, ignore_expired=ignore_expired)
+            hits = {key: value for key, value in zip(missing, tier_values) if value is not None}
+            # Promote the values to the faster tiers.
+            for faster_tier in self.tiers[:i]:
+                faster_tier.set_many(hits)
+            values.update(hits)
+            missing = [key for key in missing if key not in hits]
+        return [values.get(key) for key in keys]
+
+    def size_of(self, key) -> int | None:
+        # The size of the slowest (i.e. serialized) tier is the most representative.
+        return self.tiers[-1].size_of(key)
+
+    def lock(self, key, timeout: float = 10) -> contextlib.AbstractContextManager:
+        # The slowest tier is the most durable (and most widely shared) one.
+        return self.tiers[-1].lock(key, timeout)
+
+    def open(self, key) -> BinaryIO | None:
+        # Only the slowest tier is guaranteed to hold serialized values.
+        return self.tiers[-1].open(key)
+
+    def set_many(self, mapping: dict[str, Any]) -> list[str]:
+        results = [set(tier.set_many(mapping)) for tier in reversed(self.tiers)]
+        return [key for key in mapping if all(key in result for result in results)]
+
+    @property
+    def uid(self) -> str:
+        """
+        Backend identifier. Must be unique across the backend registry.
+        """
+        return f"{self.__class__.__name__}:{'|'.join(tier.uid for tier in self.tiers)}"
+
+
+class ServersideSessionIndex:
+    """
+    Index of the serverside keys stored by each session, tracking size and access time per key as well as the last
+    activity per session. Used for enforcing per-session quotas (LRU) and for removing abandoned sessions in bulk.
+    """
+
+    def add(self, session_id: str, sizes: dict[str, int]):
+        raise NotImplementedError()
+
+    def touch(self, session_id: str, keys: list[str]):
+        raise NotImplementedError()
+
+    def evictable(self, session_id: str, max_bytes: int, protected=()) -> list[str]:
+        """
+        The least recently used keys that must be removed to bring the session below max_bytes.
+        """
+        raise NotImplementedError()
+
+    def remove(self, session_id: str, keys: list[str]):
+        raise NotImplementedError()
+
+    def stale_sessions(self, before: float) -> list[str]:
+        """
+        The sessions without any activity since the (unix) timestamp before.
+        """
+        raise NotImplementedError()
+
+    def keys(self, session_id: str) -> list[str]:
+        raise NotImplementedError()
+
+    def drop(self, session_id: str):
+        raise NotImplementedError()
+
+
+class SqliteSessionIndex(ServersideSessionIndex):
+    """
+    Session index stored in a SQLite database, intended for file system backends.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._connection().executescript(
+            """
+            CREATE TABLE IF NOT EXISTS sessions (
+                session TEXT PRIMARY KEY, size INTEGER NOT NULL DEFAULT 0, last_seen REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS sessions_last_seen ON sessions (last_seen);
+            CREATE TABLE IF NOT EXISTS entries (
+                session TEXT NOT NULL, key TEXT NOT NULL, size INTEGER NOT NULL, atime REAL NOT NULL,
+                PRIMARY KEY (session, key)
+            );
+            CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+                UPDATE sessions SET size = size + new.size WHERE session = new.session;
+            END;
+            CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size ON entries BEGIN
+                UPDATE sessions SET size = size + new.size - old.size WHERE session = new.session;
+            END;
+            CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+                UPDATE sessions SET size = size - old.size WHERE session = old.session;
+            END;
+            """
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite connections must not be shared across threads (or processes).
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _seen(self, conn: sqlite3.Connection, session_id: str, now: float):
+        conn.execute(
+            "INSERT INTO sessions (session, last_seen) VALUES (?, ?) "
+            "ON CONFLICT (session) DO UPDATE SET last_seen = excluded.last_seen",
+            (session_id, now),
+        )
+
+    def add(self, session_id: str, sizes: dict[str, int]):
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN")
+            self._seen(conn, session_id, now)
+            conn.executemany(
+                "INSERT INTO entries (session, key, size, atime) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (session, key) DO UPDATE SET size = excluded.size, atime = excluded.atime",
+                [(session_id, key, size, now) for key, size in sizes.items()],
+            )
+
+    def touch(self, session_id: str, keys: list[str]):
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN")
+            self._seen(conn, session_id, now)
+            conn.executemany(
+                "UPDATE entries SET atime = ? WHERE session = ? AND key = ?", [(now, session_id, key) for key in keys]
+            )
+
+    def evictable(self, session_id: str, max_bytes: int, protected=()) -> list[str]:
+        conn = self._connection()
+        row = conn.execute("SELECT size FROM sessions WHERE session = ?", (session_id,)).fetchone()
+        excess = 0 if row is None else row[0] - max_bytes
+        keys = []
+        if excess <= 0:
+            return keys
+        for key, size in conn.execute("SELECT key, size FROM entries WHERE session = ? ORDER BY atime", (session_id,)):
+            if key in protected:
+                continue
+            keys.append(key)
+            excess -= size
+            if excess <= 0:
+                break
+        return keys
+
+    def remove(self, session_id: str, keys: list[str]):
+        self._connection().executemany(
+            "DELETE FROM entries WHERE session = ? AND key = ?", [(session_id, key) for key in keys]
+        )
+
+    def stale_sessions(self, before: float) -> list[str]:
+        rows = self._connection().execute("SELECT session FROM sessions WHERE last_seen < ?", (before,))
+        return [row[0] for row in rows]
+
+    def keys(self, session_id: str) -> list[str]:
+        rows = self._connection().execute("SELECT key FROM entries WHERE session = ?", (session_id,))
+        return [row[0] for row in rows]
+
+    def drop(self, session_id: str):
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN")
+            conn.execute("DELETE FROM entries WHERE session = ?", (session_id,))
+            conn.execute("DELETE FROM sessions WHERE session = ?", (session_id,))
+
+
+class RedisSessionIndex(ServersideSessionIndex):
+    """
+    Session index stored in Redis. The last activity of all sessions is kept in a sorted set, while the access times
+    (sorted set) and sizes (hash) of the keys are kept per session.
+    """
+
+    def __init__(self, client, prefix: str):
+        self.client = client
+        self.prefix = prefix
+
+    def _sessions(self) -> str:
+        return f"{self.prefix}last_seen"
+
+    def _atimes(self, session_id: str) -> str:
+        return f"{self.prefix}{session_id}:atime"
+
+    def _sizes(self, session_id: str) -> str:
+        return f"{self.prefix}{session_id}:size"
+
+    def add(self, session_id: str, sizes: dict[str, int]):
+        now = time.time()
+        pipe = self.client.pipeline()
+        pipe.zadd(self._sessions(), {session_id: now})
+        pipe.zadd(self._atimes(session_id), {key: now for key in sizes})
+        pipe.hset(self._sizes(session_id), mapping=sizes)
+        pipe.execute()
+
+    def touch(self, session_id: str, keys: list[str]):
+        now = time.time()
+        pipe = self.client.pipeline()
+        pipe.zadd(self._sessions(), {session_id: now})
+        if len(keys) > 0:
+            pipe.zadd(self._atimes(session_id), {key: now for key in keys}, xx=True)
+        pipe.execute()
+
+    def evictable(self, session_id: str, max_bytes: int, protected=()) -> list[str]:
+        sizes = {_to_str(key): int(size) for key, size in self.client.hgetall(self._sizes(session_id)).items()}
+        excess = sum(sizes.values()) - max_bytes
+        keys = []
+        if excess <= 0:
+            return keys
+        for key in map(_to_str, self.client.zrange(self._atimes(session_id), 0, -1)):
+            if key in protected:
+                continue
+            keys.append(key)
+            excess -= sizes.get(key, 0)
+            if excess <= 0:
+                break
+        return keys
+
+    def remove(self, session_id: str, keys: list[str]):
+        if len(keys) == 0:
+            return
+        pipe = self.client.pipeline()
+        pipe.zrem(self._atimes(session_id), *keys)
+        pipe.hdel(self._sizes(session_id), *keys)
+        pipe.execute()
+
+    def stale_sessions(self, before: float) -> list[str]:
+        return [_to_str(session_id) for session_id in self.client.zrangebyscore(self._sessions(), "-inf", f"({before}")]
+
+    def keys(self, session_id: str) -> list[str]:
+        return [_to_str(key) for key in self.client.hkeys(self._sizes(session_id))]
+
+    def drop(self, session_id: str):
+        pipe = self.client.pipeline()
+        pipe.delete(self._atimes(session_id), self._sizes(session_id))
+        pipe.zrem(self._sessions(), session_id)
+        pipe.execute()
+
+
+@dataclasses.dataclass
+class ServersideRoute:
+    """
+    Rule of a ServersideRoutingPolicy. A value matches the rule, if it meets all the conditions that are set.
+
+    Args:
+        backend: The backend (or backend uid) used for storing the matching values.
+        types: The value must be an instance of one of these types.
+        min_bytes: The (estimated) size of the value must be at least min_bytes.
+        max_bytes: The (estimated) size of the value must be less than max_bytes.
+        hint: The hint of the value (see Serverside and EnrichedOutput) must be equal to hint.
+    """
+
+    backend: ServersideBackend | str
+    types: tuple[type, ...] | None = None
+    min_bytes: int | None = None
+    max_bytes: int | None = None
+    hint: str | None = None
+
+    def matches(self, value: Any, size: Callable[[], int], hint: str | None) -> bool:
+        if self.hint is not None and self.hint != hint:
+            return False
+        if self.types is not None and not isinstance(value, self.types):
+            return False
+        if self.min_bytes is not None and size() < self.min_bytes:
+            return False
+        return not (self.max_bytes is not None and size() >= self.max_bytes)
+
+
+class ServersideRoutingPolicy:
+    """
+    Policy for picking the backend of a serverside value (unless set explicitly), e.g.
+
+        ServersideRoutingPolicy([
+            ServersideRoute(shared_memory, types=(np.ndarray,)),
+            ServersideRoute(redis, max_bytes=64 * 1024),
+            ServersideRoute(sharded_disk),
+        ])
+
+    The first matching route wins. If no route matches, the default backend is used. Override the route method for
+    custom logic.
+    """
+
+    def __init__(self, routes: list[ServersideRoute]):
+        self.routes = routes
+
+    def route(self, value: Any, hint: str | None = None) -> ServersideBackend | str | None:
+        """
+        Returns the backend (or backend uid) for storing the value, or None to use the default backend. The backend
+        must be known to the transform up front, i.e. be passed to it (backends) or be part of a route.
+        """
+        # The size is estimated (at most once) only if a route depends on it.
+        size = functools.lru_cache(maxsize=None)(lambda: _estimate_size(value))
+        for route in self.routes:
+            if route.matches(value, size, hint):
+                return route.backend
+        return None
+
+    @property
+    def backends(self) -> list[ServersideBackend]:
+        return [route.backend for route in self.routes if isinstance(route.backend, ServersideBackend)]
+
+
+class EnrichedOutput(Output):
+    """
+    Like a normal Output, includes additional properties related to storing the data. The backend and hint properties
+    apply to the Serverside values returned for the output (unless set on the Serverside object), while the remaining
+    properties are used for memoization, which is enabled per callback via the memoize keyword argument,
+
+        @app.callback(EnrichedOutput("store", "data", session_check=True), Input("dd", "value"), memoize=True)
+
+    Args:
+        backend: The backend (or backend uid) used for storing the values. Defaults to the backend picked by the
+            routing policy (if any), or the default backend. Memoized values are not routed.
+        hint: Hint passed to the routing policy (see ServersideRoutingPolicy).
+        session_check: If True, memoized values are scoped to the (user) session.
+        arg_check: If True, memoized values are keyed by the callback arguments. If False, the callback is evaluated
+            only once (per session, if session_check is True).
+        offload: If True (False), values above the offload_threshold of the transform are (never) offloaded
+            automatically, regardless of the component type. Defaults to matching the component in the layout.
+    """
+
+    def __init__(
+        self,
+        component_id,
+        component_property,
+        allow_duplicate=False,
+        backend=None,
+        session_check=None,
+        arg_check=True,
+        hint=None,
+        offload=None,
+    ):
+        super().__init__(component_id, component_property, allow_duplicate)
+        self.backend = backend
+        self.session_check = session_check
+        self.arg_check = arg_check
+        self.hint = hint
+        self.offload = offload
+
+
+class ServersideOutputTransform(SerializationTransform):
+    prefix: str = "SERVERSIDE_"
+    # Accesses of a (session scoped) key are recorded at most once per interval (in seconds) per process.
+    _touch_interval = 60
+
+    def __init__(
+        self,
+        backends: Optional[List[ServersideBackend]] = None,
+        default_backend: Optional[ServersideBackend] = None,
+        content_addressed: bool = False,
+        write_behind: bool = False,
+        write_behind_workers: int = 4,
+        max_pending_writes: int = 64,
+        session_scoped: bool = False,
+        session_max_bytes: int | None = None,
+        session_timeout: int = 24 * 3600,
+        reap_interval: int | None = 600,
+        max_segments: int = 16,
+        offload_threshold: int | None = None,
+        offload_props: list[tuple[type, str]] | None = None,
+        routing_policy: ServersideRoutingPolicy | None = None,
+    ):
+        """
+        Args:
+            backends: The backends available for storing serverside values. Defaults to a FileSystemBackend.
+            default_backend: The backend used, if no backend is specified on the Serverside object. Defaults to the
+                first backend.
+            content_addressed: If True, the key of a Serverside object (unless set explicitly) is derived from a hash
+                of its value, and writes are skipped if the key already exists. Can be overridden per Serverside object.
+            write_behind: If True, values are written asynchronously, i.e. the callback returns without waiting for the
+                backend write. Reads of pending values (in the same process) are served from memory. NB: In a
+                multi-process deployment, another process might read a reference before the value has been written.
+            write_behind_workers: The number of threads writing values (write-behind mode only).
+            max_pending_writes: The maximum number of pending writes (write-behind mode only). When the limit is
+                reached, the callback blocks until a write has completed.
+            session_scoped: If True, keys are namespaced by the (user) session id, and the keys of each session are
+                tracked in the session index of the backend (if supported), enabling quotas and cleanup. References
+                to values of other sessions are rejected, i.e. loaded as None.
+            session_max_bytes: The maximum number of bytes stored per session (session scoped mode only). When
+                exceeded, the least recently used values of the session are evicted.
+            session_timeout: The values of sessions that have been inactive for longer than session_timeout seconds
+                are removed by the reaper (session scoped mode only).
+            reap_interval: The interval (in seconds) between runs of the background reaper. If None, no reaper is
+                started, and the reap method must be invoked manually (e.g. from a cron job).
+            max_segments: The maximum number of segments of a versioned value (see Serverside.append). When exceeded,
+                the segments are compacted in the background.
+            offload_threshold: If set, outputs targeting a store-like property (see offload_props) with an (estimated)
+                size above offload_threshold bytes are stored serverside automatically, i.e. as if they were wrapped
+                in a Serverside object. NB: Clientside callbacks will receive the reference, not the value.
+            offload_props: The (component type, property) pairs eligible for automatic offloading. Defaults to
+                [(dcc.Store, "data")]. The components are located via their ids in the layout, as served by the
+                process. Components of dynamic layouts (layout functions, pages, or components returned by callbacks)
+                might not be found, so their outputs should be marked explicitly, i.e. EnrichedOutput(offload=True),
+                which is resolved when the callback is registered.
+            routing_policy: Policy for picking the backend of a Serverside value from its size, type and hint, if no
+                backend is set explicitly. The backend is recorded in the reference. Versioned values are not routed.
+        """
+        super().__init__()
+        # Per default, use file system backend.
+        if backends is None:
+            backends = [FileSystemBackend()]
+        self._default_backend: ServersideBackend = backends[0] if default_backend is None else default_backend
+        self.content_addressed = content_addressed
+        self._write_queue = _WriteBehindQueue(write_behind_workers, max_pending_writes) if write_behind else None
+        self.session_scoped = session_scoped
+        self.session_max_bytes = session_max_bytes
+        self.session_timeout = session_timeout
+        self.reap_interval = reap_interval
+        self._reaper_pid: int | None = None
+        self._reaper_lock = threading.Lock()
+        self.max_segments = max_segments
+        self._compactor = _LazyExecutor(1)
+        self._compactions: dict[tuple[str, str], Future] = {}
+        self._compactions_lock = threading.Lock()
+        self.offload_threshold = offload_threshold
+        self.offload_props = [(dcc.Store, "data")] if offload_props is None else offload_props
+        self._offload_targets: dict[str, tuple[Any, str]] = {}
+        self._dynamic_layout_warned = False
+        self._touched = _LruCache(10_000)
+        self._sizes = _LruCache(10_000)
+        # The sizes of the dumped values are recorded only if a callback takes LazyServerside arguments.
+        self._lazy_arguments = False
+        # Statistics for arguments annotated as LazyServerside.
+        self.lazy_stats = {"deferred": 0, "loaded": 0, "bytes_avoided": 0}
+        self._lazy_stats_lock = threading.Lock()
+        # Setup registry for easy/fast access.
+        self._backend_registry: Dict[str, ServersideBackend] = {backend.uid: backend for backend in backends}
+        self._backend_registry.setdefault(self._default_backend.uid, self._default_backend)
+        self.routing_policy = routing_policy
+        if routing_policy is not None:
+            for backend in routing_policy.backends:
+                self._backend_registry.setdefault(backend.uid, backend)
+
+    def layout(self, layout, layout_is_function):
+        if layout_is_function and self.offload_threshold is not None and not self._dynamic_layout_warned:
+            self._dynamic_layout_warned = True
+            logger.warning(
+                "Automatic offloading locates its targets in the layout as served by each process, i.e. for a dynamic "
+                "layout, outputs might not be offloaded consistently. Mark them via EnrichedOutput(offload=True)."
+            )
+        return super().layout(layout, layout_is_function)
+
+    def transform_layout(self, layout):
+        if self.offload_threshold is None or not isinstance(layout, Component):
+            return
+        # Collect the ids of the components eligible for automatic offloading.
+        for component in [layout, *layout._traverse()]:
+            component_id = getattr(component, "id", None)
+            if component_id is None:
+                continue
+            for component_type, prop in self.offload_props:
+                if isinstance(component, component_type):
+                    key = json.dumps([component_id, prop], sort_keys=True)
+                    self._offload_targets[key] = (component_id, prop)
+
+    def apply_serverside(self, callbacks):
+        for callback in callbacks:
+            # Backends set on outputs are registered up front, i.e. in every process serving the callbacks.
+            for output in callback.outputs:
+                if isinstance(output, EnrichedOutput) and isinstance(output.backend, ServersideBackend):
+                    self._backend_registry.setdefault(output.backend.uid, output.backend)
+            if any(_is_lazy_annotation(ann) for ann in _full_arg_spec(callback.f).annotations.values()):
+                self._lazy_arguments = True
+            f = callback.f
+            if self.offload_threshold is not None:
+                f = self._auto_offload(callback, f)
+            if any(isinstance(o, EnrichedOutput) for o in callback.outputs):
+                f = self._assign_output_options(callback, f)
+            if not callback.kwargs.get("memoize", False):
+                callback.f = self._unpack_pack_callback(callback)(f)
+                continue
+            # The memoization check wraps the (un)packing, so that cache hits skip loading of the arguments.
+            f = self._unpack_pack_callback(callback)(self._assign_memo_keys(callback, f))
+            callback.f = self._memoize_callback(callback, f)
+        return callbacks
+
+    def _dump_required(self, ann) -> bool:
+        # Automatic offloading wraps outputs in Serverside objects, regardless of the annotation.
+        if self.offload_threshold is not None:
+            return True
+        return _annotation_may_contain(ann, lambda a: a is Serverside or get_origin(a) is Serverside)
+
+    def _memoize_callback(self, callback: CallbackBlueprint, f: Callable) -> Callable:
+        uid = callback.uid
+        outputs = list(callback.outputs)
+        # Plain outputs are memoized using the EnrichedOutput defaults.
+        options = [
+            o if isinstance(o, EnrichedOutput) else EnrichedOutput(o.component_id, o.component_property)
+            for o in outputs
+        ]
+        backends = [self._resolve_backend(o.backend) for o in options]
+        single_output = _is_single_output(callback)
+
+        @functools.wraps(f)
+        def decorated_function(*args, **kwargs):
+            output_ids = _resolve_output_ids(outputs)
+            # Memoization is not supported for outputs matched via ALL/ALLSMALLER wildcards.
+            if output_ids is None:
+                return f(*args, **kwargs)
+            session_id = self._session_id()
+            keys = []
+            for output_id, option in zip(output_ids, options):
+                entry = [uid, output_id]
+                if option.arg_check:
+                    entry += [args, kwargs]
+                if option.session_check:
+                    entry.append(_get_session_id())
+                key = hashlib.md5(json.dumps(entry, sort_keys=True, default=str).encode()).hexdigest()
+                keys.append(self._scoped_key(key, session_id))
+            # If all values are stored, return the references without evaluating the function.
+            if all(self._is_stored(backend, key) for backend, key in zip(backends, keys)):
+                references = [self._reference(backend.uid, key) for backend, key in zip(backends, keys)]
+                if single_output:
+                    return references[0]
+                return _replace_leaves(callback.outputs.structure, iter(references))
+            token = _memo_keys.set(list(zip(keys, backends)))
+            try:
+                return f(*args, **kwargs)
+            finally:
+                _memo_keys.reset(token)
+
+        return decorated_function
+
+    def _assign_memo_keys(self, callback: CallbackBlueprint, f: Callable) -> Callable:
+        paths = [[]] if _is_single_output(callback) else callback.outputs._index
+
+        @functools.wraps(f)
+        def decorated_function(*args, **kwargs):
+            data = f(*args, **kwargs)
+            memo_keys = _memo_keys.get()
+            if memo_keys is None:
+                return data
+            # Store the Serverside values under the memoization keys.
+            for path, (key, backend) in zip(paths, memo_keys):
+                obj = _get_in(data, path)
+                if not isinstance(obj, Serverside):
+                    continue
+                obj.key = key
+                obj.explicit_key = True
+                obj.backend_uid = backend.uid
+            return data
+
+        return decorated_function
+
+    def _auto_offload(self, callback: CallbackBlueprint, f: Callable) -> Callable:
+        paths = [[]] if _is_single_output(callback) else callback.outputs._index
+        outputs = list(callback.outputs)
+        # Outputs marked explicitly are resolved up front, while the others are matched against the layout.
+        explicit = [o.offload if isinstance(o, EnrichedOutput) else None for o in outputs]
+        if all(offload is False for offload in explicit):
+            return f
+
+        @functools.wraps(f)
+        def decorated_function(*args, **kwargs):
+            data = f(*args, **kwargs)
+            for path, output, offload in zip(paths, outputs, explicit):
+                if offload is False:
+                    continue
+                value = _get_in(data, path)
+                if value is None or isinstance(value, Serverside):
+                    continue
+                # The (cheap) size estimate goes first, as most outputs are small.
+                size = _estimate_size(value)
+                if size <= self.offload_threshold or not (offload or self._is_offload_target(output)):
+                    continue
+                logger.debug(f"Offloading output {output} [~{size} bytes] serverside")
+                data = _set_in(data, path, Serverside(value))
+            return data
+
+        return decorated_function
+
+    def _assign_output_options(self, callback: CallbackBlueprint, f: Callable) -> Callable:
+        paths = [[]] if _is_single_output(callback) else callback.outputs._index
+        outputs = list(callback.outputs)
+        backend_uids = [
+            self._resolve_backend(o.backend).uid if isinstance(o, EnrichedOutput) and o.backend is not None else None
+            for o in outputs
+        ]
+
+        @functools.wraps(f)
+        def decorated_function(*args, **kwargs):
+            data = f(*args, **kwargs)
+            for path, output, backend_uid in zip(paths, outputs, backend_uids):
+                obj = _get_in(data, path)
+                if not isinstance(obj, Serverside) or not isinstance(output, EnrichedOutput):
+                    continue
+                # Options set on the Serverside object take precedence.
+                if obj.backend_uid is None:
+                    obj.backend_uid = backend_uid
+                if obj.hint is None:
+                    obj.hint = output.hint
+            return data
+
+        return decorated_function
+
+    def _route(self, obj: Serverside) -> str:
+        if obj.backend_uid is not None:
+            return obj.backend_uid
+        if self.routing_policy is None or obj.delta is not None:
+            return self._default_backend.uid
+        return self._resolve_backend(self.routing_policy.route(obj.value, obj.hint)).uid
+
+    def _is_offload_target(self, output: Output) -> bool:
+        for component_id, prop in self._offload_targets.values():
+            if prop == output.component_property and _match_id(output.component_id, component_id):
+                return True
+        return False
+
+    def _resolve_backend(self, backend: ServersideBackend | str | None) -> ServersideBackend:
+        if backend is None:
+            return self._default_backend
+        return self._backend(backend.uid if isinstance(backend, ServersideBackend) else backend)
+
+    def _backend(self, backend_uid: str) -> ServersideBackend:
+        # Backends are registered up front, as the value might be loaded by another process than the one storing it.
+        backend = self._backend_registry.get(backend_uid)
+        if backend is None:
+            raise ValueError(
+                f"Unknown serverside backend '{backend_uid}'. Backends must be passed to the transform (backends), "
+                "set on an EnrichedOutput, or be part of a route of the routing policy."
+            )
+        return backend
+
+    def _is_stored(self, backend: ServersideBackend, key: str) -> bool:
+        if self._write_queue is not None and self._write_queue.get(backend.uid, key)[0]:
+            return True
+        return backend.has(key)
+
+    def _reference(self, backend_uid: str, key: str, **kwargs) -> str:
+        return f"{self.prefix}{json.dumps(dict(backend_uid=backend_uid, key=key, **kwargs))}"
+
+    def _try_load(self, data: Any, ann=None) -> Any:
+        return self._try_load_many([(data, ann)])[0]
+
+    def _try_dump(self, obj: Any) -> Any:
+        return self._try_dump_many([obj])[0]
+
+    def _try_load_many(self, items: list[tuple[Any, Any]]) -> list[Any]:
+        # Fast path for the (common) case of no references. A plain loop, as the batches are small.
+        for data, _ in items:
+            if isinstance(data, str) and data.startswith(self.prefix):
+                break
+        else:
+            return [data for data, _ in items]
+        session_id = self._session_id()
+        values = [data for data, _ in items]
+        # Group the references by backend.
+        requests: dict[str, dict[str, list[int]]] = defaultdict(lambda: defaultdict(list))
+        versioned: dict[str, dict[str, list[int]]] = defaultdict(lambda: defaultdict(list))
+        for i, (data, ann) in enumerate(items):
+            if not isinstance(data, str) or not data.startswith(self.prefix):
+                continue
+            # Lazy arguments are loaded on first access.
+            if _is_lazy_annotation(ann):
+                values[i] = LazyServerside(self, data)
+                self._update_lazy_stats(deferred=1)
+                continue
+            # Tables are read partially, i.e. only the rows/columns selected.
+            if extract_non_optional(ann) is ServersideTable:
+                values[i] = ServersideTable(functools.partial(self._load_table, data))
+                continue
+            obj = json.loads(data[len(self.prefix) :])
+            # In session scoped mode, values of other sessions are rejected.
+            if not self._in_session(obj["key"], session_id):
+                values[i] = None
+                continue
+            if obj.get("versioned", False):
+                versioned[obj["backend_uid"]][obj["key"]].append(i)
+                continue
+            requests[obj["backend_uid"]][obj["key"]].append(i)
+        # Versioned values are assembled from their segments.
+        for backend_uid, positions in versioned.items():
+            backend = self._backend(backend_uid)
+            for key, value in zip(positions, self._load_versioned(backend, list(positions))):
+                for i in positions[key]:
+                    values[i] = value
+        # Resolve the references using (at most) one bulk read per backend.
+        for backend_uid, positions in requests.items():
+            backend = self._backend(backend_uid)
+            keys = list(positions.keys())
+            # Values that have not yet been written are served from the write queue.
+            if self._write_queue is not None:
+                for key in list(keys):
+                    pending, value = self._write_queue.get(backend_uid, key)
+                    if not pending:
+                        continue
+                    for i in positions[key]:
+                        values[i] = value
+                    keys.remove(key)
+            for key, value in zip(keys, backend.get_many(*keys, ignore_expired=True)):
+                for i in positions[key]:
+                    values[i] = value
+            # Mark the values of the session as recently used.
+            if session_id is not None and backend.session_index is not None:
+                self._touch(session_id, backend, list(positions))
+        return values
+
+    def _in_session(self, key: str, session_id: str | None) -> bool:
+        if session_id is None or key.startswith(f"{session_id}/"):
+            return True
+        logger.warning(f"Rejected serverside value '{key}', as it belongs to another session")
+        return False
+
+    def _touch(self, session_id: str, backend: ServersideBackend, keys: list[str]):
+        # Recent accesses are not recorded again, i.e. the access times are (at most) touch_interval seconds behind.
+        now = time.monotonic()
+        stale = []
+        for key in keys:
+            touched = self._touched.get((backend.uid, key))
+            if touched is None or now - touched > self._touch_interval:
+                self._touched.put((backend.uid, key), now)
+                stale.append(key)
+        if len(stale) > 0:
+            backend.session_index.touch(session_id, stale)
+
+    def _try_dump_many(self, objs: list[Any]) -> list[Any]:
+        # Fast path for the (common) case of no Serverside values.
+        for obj in objs:
+            if isinstance(obj, Serverside):
+                break
+        else:
+            return list(objs)
+        session_id = self._session_id()
+        results = list(objs)
+        # Group the values by backend.
+        mappings: dict[str, dict[str, Any]] = defaultdict(dict)
+        sizes: dict[str, dict[str, int]] = defaultdict(dict)
+        content_keys: dict[str, set] = defaultdict(set)
+        for i, obj in enumerate(objs):
+            if not isinstance(obj, Serverside):
+                continue
+            # If no backend is set, it is picked by the routing policy (if any), or the default is used.
+            backend_uid = self._route(obj)
+            if obj.delta is not None:
+                key = self._scoped_key(obj.key, session_id)
+                results[i] = self._dump_versioned(self._backend(backend_uid), key, obj.delta, obj.value)
+                continue
+            content_addressed = self.content_addressed if obj.content_addressed is None else obj.content_addressed
+            if content_addressed and not obj.explicit_key:
+                obj.key = _content_hash(obj.value)
+                content_keys[backend_uid].add(self._scoped_key(obj.key, session_id))
+            obj.key = self._scoped_key(obj.key, session_id)
+            mappings[backend_uid][obj.key] = obj.value
+            # Return lookup structure.
+            results[i] = self._reference(backend_uid, obj.key)
+            # The size estimate is O(n) for e.g. object columns, so it is computed only when it is used, i.e. for the
+            # session quota and the statistics of lazy arguments (which saves a round trip if they are not accessed).
+            if session_id is None and not self._lazy_arguments:
+                continue
+            sizes[backend_uid][obj.key] = _estimate_size(obj.value)
+            if self._lazy_arguments:
+                self._sizes.put(results[i], sizes[backend_uid][obj.key])
+        # Dump the data using (at most) one bulk write per backend.
+        for backend_uid, mapping in mappings.items():
+            backend = self._backend(backend_uid)
+            # Content addressed values that are already stored need not be written again.
+            candidates = list(content_keys[backend_uid])
+            stored = set(compress(candidates, backend.has_many(*candidates))) if len(candidates) > 0 else set()
+            pending = {key: value for key, value in mapping.items() if key not in stored}
+            if self._write_queue is not None:
+                for key, value in pending.items():
+                    self._write_queue.put(backend, key, value)
+            elif len(pending) > 0:
+                backend.set_many(pending)
+            if session_id is not None:
+                self._track_session(session_id, backend, sizes[backend_uid])
+        return results
+
+    def _session_id(self) -> str | None:
+        if not self.session_scoped or not has_request_context():
+            return None
+        return _get_session_id()
+
+    @staticmethod
+    def _scoped_key(key: str, session_id: str | None) -> str:
+        if session_id is None or key.startswith(f"{session_id}/"):
+            return key
+        return f"{session_id}/{key}"
+
+    def _track_session(self, session_id: str, backend: ServersideBackend, sizes: dict[str, int]):
+        index = backend.session_index
+        if index is None:
+            return
+        # The values are accounted by their (in-memory) estimated size, which saves a round trip per value.
+        index.add(session_id, sizes)
+        # Enforce the session quota, but never evict the values just written.
+        if self.session_max_bytes is not None:
+            keys = index.evictable(session_id, self.session_max_bytes, protected=sizes.keys())
+            if len(keys) > 0:
+                backend.delete_many(*keys)
+                index.remove(session_id, keys)
+                logger.debug(f"Evicted {len(keys)} serverside value(s) of session {session_id}")
+        self._start_reaper()
+
+    def reap(self) -> int:
+        """
+        Remove the values of sessions that have been inactive for longer than session_timeout seconds. Returns the
+        number of sessions removed.
+        """
+        before = time.time() - self.session_timeout
+        count = 0
+        for backend in self._backend_registry.values():
+            index = backend.session_index
+            if index is None:
+                continue
+            for session_id in index.stale_sessions(before):
+                keys = index.keys(session_id)
+                if len(keys) > 0:
+                    backend.delete_many(*keys)
+                index.drop(session_id)
+                count += 1
+        return count
+
+    def _start_reaper(self):
+        # The reaper thread is started on first use, and re-started after a fork (threads do not survive forking).
+        if self.reap_interval is None or self._reaper_pid == os.getpid():
+            return
+        with self._reaper_lock:
+            if self._reaper_pid == os.getpid():
+                return
+            threading.Thread(target=self._reap_periodically, daemon=True).start()
+            self._reaper_pid = os.getpid()
+
+    def _reap_periodically(self):
+        while True:
+            time.sleep(self.reap_interval)
+            try:
+                count = self.reap()
+                logger.debug(f"Reaped {count} inactive serverside session(s)")
+            except Exception:
+                logger.exception("Exception raised while reaping serverside sessions")
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Wait for pending writes (write-behind mode only) and compactions (of versioned values) to complete.
+        """
+        with self._compactions_lock:
+            compactions = list(self._compactions.values())
+        wait(compactions, timeout)
+        if not all(compaction.done() for compaction in compactions):
+            return False
+        return True if self._write_queue is None else self._write_queue.flush(timeout)
+
+    # region Versioned values
+
+    def _dump_versioned(self, backend: ServersideBackend, key: str, op: str, value: Any) -> str:
+        """
+        Write a new version of a versioned value, i.e. a segment holding the delta, and a (small) manifest listing the
+        segments of the version. Segments and manifests are immutable, so a reference (to a manifest) always resolves
+        to the same snapshot. Concurrent updates of a key are serialized via the lock of the backend.
+        """
+        with backend.lock(key):
+            version = (backend.get(f"{key}#head", ignore_expired=True) or 0) + 1
+            segment_key = f"{key}#s{version}"
+            segments = [] if op == "set" or version == 1 else backend.get(f"{key}#v{version - 1}", ignore_expired=True)
+            if segments is None:
+                raise ValueError(f"Version {version - 1} of serverside value '{key}' not found.")
+            segments = segments + [segment_key]
+            # The head is moved last, so that it never points to a version that has not been written.
+            backend.set_many({segment_key: (op, value), f"{key}#v{version}": segments})
+            backend.set(f"{key}#head", version)
+        if len(segments) > self.max_segments:
+            self._schedule_compaction(backend, key, version)
+        return self._reference(backend.uid, f"{key}#v{version}", versioned=True)
+
+    def _load_versioned(self, backend: ServersideBackend, manifest_keys: list[str]) -> list[Any]:
+        manifests = backend.get_many(*manifest_keys, ignore_expired=True)
+        segment_keys = list(dict.fromkeys(key for manifest in manifests if manifest is not None for key in manifest))
+        segments = dict(zip(segment_keys, backend.get_many(*segment_keys, ignore_expired=True)))
+        values = []
+        for manifest_key, manifest in zip(manifest_keys, manifests):
+            if manifest is None or any(segments[key] is None for key in manifest):
+                logger.warning(f"Serverside value '{manifest_key}' not found (or removed after compaction)")
+                values.append(None)
+                continue
+            values.append(_apply_deltas([segments[key] for key in manifest]))
+        return values
+
+    def _schedule_compaction(self, backend: ServersideBackend, key: str, version: int):
+        with self._compactions_lock:
+            compaction = self._compactions.get((backend.uid, key))
+            if compaction is not None and not compaction.done():
+                return
+            self._compactions[(backend.uid, key)] = self._compactor.submit(self._compact, backend, key, version)
+
+    def _compact(self, backend: ServersideBackend, key: str, version: int):
+        """
+        Merge the segments of a version into a single segment. The manifest of the version is replaced (by one
+        representing the same snapshot), while the superseded segments and manifests are removed at the next
+        compaction, so that concurrent readers of older versions are not affected.
+        """
+        try:
+            manifest_key = f"{key}#v{version}"
+            value = self._load_versioned(backend, [manifest_key])[0]
+            if value is None:
+                return
+            compacted_key = f"{key}#c{version}"
+            backend.set(compacted_key, ("set", value))
+            backend.set(manifest_key, [compacted_key])
+            with backend.lock(key):
+                # Remove the garbage of the previous compaction, and register the garbage of this one, i.e. the
+                # segments and manifests written since the previous compaction (including its compacted version).
+                garbage = backend.get(f"{key}#gc", ignore_expired=True) or {"version": 0, "keys": []}
+                if len(garbage["keys"]) > 0:
+                    backend.delete_many(*garbage["keys"])
+                previous = garbage["version"]
+                keys = [f"{key}#s{v}" for v in range(previous + 1, version + 1)]
+                keys += [f"{key}#v{v}" for v in range(max(previous, 1), version)]
+                if previous > 0:
+                    keys.append(f"{key}#c{previous}")
+                backend.set(f"{key}#gc", {"version": version, "keys": keys})
+        except Exception:
+            logger.exception(f"Exception raised while compacting serverside value '{key}'")
+
+    # endregion
+
+    # region HTTP streaming
+
+    _streamable_mimetypes: ClassVar[dict[str, str]] = {
+        "arrow": "application/vnd.apache.arrow.file",
+        "npy": "application/octet-stream",
+    }
+
+    def serve(self, reference: str) -> Response:
+        """
+        Serve a serverside value over HTTP (see DashProxy). Arrow/npy entries are streamed as stored, in chunks and
+        supporting Range requests, while other values are served as JSON. In session scoped mode, values of other
+        sessions are rejected.
+        """
+        if not reference.startswith(self.prefix):
+            abort(400)
+        try:
+            obj = json.loads(reference[len(self.prefix) :])
+            backend = self._backend(obj["backend_uid"])
+            key = obj["key"]
+        except (ValueError, KeyError, TypeError):
+            abort(404)
+        if self.session_scoped and not key.startswith(f"{_get_session_id()}/"):
+            abort(403)
+        # Pending (write-behind) and versioned values are not stored as a single entry.
+        pending = self._write_queue is not None and self._write_queue.get(backend.uid, key)[0]
+        f = None if pending or obj.get("versioned", False) else backend.open(key)
+        serializer = getattr(backend, "serializer", None)
+        tag = serializer.read_header(f) if isinstance(serializer, ServersideSerializerRegistry) and f else None
+        if tag in self._streamable_mimetypes:
+            offset = f.tell()
+            length = f.seek(0, os.SEEK_END) - offset
+            response = _stream_response(f, offset, length, _file_etag(f), self._streamable_mimetypes[tag])
+            response.headers["X-Serverside-Format"] = tag
+            return response
+        if f is not None:
+            f.close()
+        # Otherwise, fall back to loading the value.
+        value = self._try_load(reference)
+        if value is None:
+            abort(404)
+        data = _to_json_bytes(value)
+        return _stream_response(io.BytesIO(data), 0, len(data), hashlib.md5(data).hexdigest(), "application/json")
+
+    # endregion
+
+    def _load_table(self, data: str) -> Any:
+        obj = json.loads(data[len(self.prefix) :])
+        if not self._in_session(obj["key"], self._session_id()):
+            return None
+        if obj.get("versioned", False):
+            return _to_arrow_table(self._try_load_many([(data, None)])[0])
+        if self._write_queue is not None:
+            pending, value = self._write_queue.get(obj["backend_uid"], obj["key"])
+            if pending:
+                return _to_arrow_table(value)
+        return self._backend(obj["backend_uid"]).get_table(obj["key"])
+
+    def _load_lazy(self, data: str) -> Any:
+        self._update_lazy_stats(loaded=1)
+        return self._try_load_many([(data, None)])[0]
+
+    def _finalize_load(self, values: list[Any]):
+        if not self._lazy_arguments:
+            return
+        # Account for the lazy arguments that were never accessed.
+        skipped = [value for value in values if isinstance(value, LazyServerside) and not value.loaded]
+        if len(skipped) == 0:
+            return
+        # The sizes are recorded on dump (values dumped by another process, or evicted from the record, count as zero).
+        bytes_avoided = sum(self._sizes.get(value.reference) or 0 for value in skipped)
+        self._update_lazy_stats(bytes_avoided=bytes_avoided)
+        logger.debug(f"Skipped loading of {len(skipped)} lazy serverside argument(s) [{bytes_avoided} bytes]")
+
+    def _update_lazy_stats(self, **kwargs):
+        with self._lazy_stats_lock:
+            for key, value in kwargs.items():
+                self.lazy_stats[key] += value
+
+
+class LazyServerside(Generic[T]):  # noqa: UP046 (type parameter syntax requires Python 3.12)
+    """
+    Lazy serverside argument. If an argument is annotated as LazyServerside (e.g. LazyServerside[pd.DataFrame]), the
+    callback receives a LazyServerside object instead of the value. The value is loaded on first access, i.e. via the
+    value property or attribute/item access, and cached for the rest of the invocation.
+    """
+
+    _own_attributes = ("_transform", "reference", "_value")
+
+    def __init__(self, transform: ServersideOutputTransform, reference: str):
+        self._transform = transform
+        self.reference = reference
+        self._value = _missing
+
+    @property
+    def loaded(self) -> bool:
+        return self._value is not _missing
+
+    @property
+    def value(self) -> T:
+        if self._value is _missing:
+            self._value = self._transform._load_lazy(self.reference)
+        return self._value
+
+    def __getattr__(self, name):
+        # Guard against recursion, if the object is not (yet) initialized.
+        if name in self._own_attributes:
+            raise AttributeError(name)
+        return getattr(self.value, name)
+
+    def __getitem__(self, item):
+        return self.value[item]
+
+    def __len__(self):
+        return len(self.value)
+
+    def __iter__(self):
+        return iter(self.value)
+
+    def __contains__(self, item):
+        return item in self.value
+
+    def __repr__(self):
+        return f"LazyServerside({self.reference})"
+
+
+class ServersideTable:
+    """
+    Accessor for tabular serverside values (pandas DataFrames or pyarrow Tables). If an argument is annotated as
+    ServersideTable, the callback receives an accessor instead of the value. Rows and columns are selected via slice,
+    columns and filter, and the selection is materialized via to_pandas (or to_arrow), e.g.
+
+        def show_page(page: int, data: ServersideTable):
+            return data.slice(page * 10, (page + 1) * 10).columns(["name", "value"]).to_pandas().to_dict("records")
+
+    For file based backends using the ServersideSerializerRegistry, tables are stored in the (chunked) Arrow IPC format
+    and memory-mapped, so only the bytes of the selected rows/columns are read. Other backends load the full value.
+    Requires pyarrow.
+    """
+
+    def __init__(self, load: Callable[[], Any]):
+        self._load = load
+        self._table = _missing
+
+    def to_arrow(self) -> Any:
+        if self._table is _missing:
+            self._table = self._load()
+            if self._table is None:
+                raise ValueError("The serverside table was not found.")
+        return self._table
+
+    def to_pandas(self, **kwargs) -> Any:
+        return self.to_arrow().to_pandas(**{"split_blocks": True, **kwargs})
+
+    def slice(self, start: int | None = 0, stop: int | None = None) -> ServersideTable:
+        """
+        Select the rows from start to stop (exclusive). Negative indices are supported, like for Python slices.
+        """
+        start, stop, _ = slice(start, stop).indices(len(self))
+        return ServersideTable(lambda: self.to_arrow().slice(start, max(stop - start, 0)))
+
+    def columns(self, columns: list[str]) -> ServersideTable:
+        return ServersideTable(lambda: self.to_arrow().select(columns))
+
+    def filter(self, expression) -> ServersideTable:
+        """
+        Select the rows matching a pyarrow compute expression (e.g. pc.field("value") > 0) or a boolean mask. Only the
+        columns referenced by the expression are read to evaluate it.
+        """
+        return ServersideTable(lambda: self.to_arrow().filter(expression))
+
+    @property
+    def column_names(self) -> list[str]:
+        return self.to_arrow().column_names
+
+    @property
+    def num_rows(self) -> int:
+        return self.to_arrow().num_rows
+
+    def __len__(self):
+        return self.num_rows
+
+    def __repr__(self):
+        return "ServersideTable(<not loaded>)" if self._table is _missing else f"ServersideTable({self._table.schema})"
+
+
+_missing = object()
+# Memoization keys (and backends) for the outputs of the callback being evaluated.
+_memo_keys: ContextVar[list[tuple[str, ServersideBackend]] | None] = ContextVar("_memo_keys", default=None)
+
+
+def _is_lazy_annotation(ann) -> bool:
+    ann = extract_non_optional(ann)
+    return ann is LazyServerside or get_origin(ann) is LazyServerside
+
+
+class Serverside(Generic[T]):
+    def __init__(
+        self,
+        value: T,
+        key: str = None,
+        backend: Union[ServersideBackend, str, None] = None,
+        content_addressed: bool | None = None,
+        hint: str | None = None,
+    ):
+        self.value = value
+        self.key: str = str(uuid.uuid4()) if key is None else key
+        self.explicit_key = key is not None
+        self.backend_uid: str = backend.uid if isinstance(backend, ServersideBackend) else backend
+        self.content_addressed = content_addressed
+        self.hint = hint
+        self.delta: str | None = None
+
+    @classmethod
+    def append(cls, key: str, rows: T, backend: ServersideBackend | str | None = None) -> Serverside[T]:
+        """
+        Append rows (a DataFrame, list or numpy array) to the versioned value stored under key, creating it if it
+        doesn't exist. Only the rows are written, i.e. the cost is proportional to the size of the delta.
+        """
+        return cls._versioned(key, "append", rows, backend)
+
+    @classmethod
+    def patch(cls, key: str, delta: T, backend: ServersideBackend | str | None = None) -> Serverside[T]:
+        """
+        Patch the versioned value stored under key. Dicts are updated, while for DataFrames, the (index aligned) values
+        of the delta take precedence.
+        """
+        return cls._versioned(key, "patch", delta, backend)
+
+    @classmethod
+    def replace(cls, key: str, value: T, backend: ServersideBackend | str | None = None) -> Serverside[T]:
+        """
+        Replace the versioned value stored under key, i.e. write a new base segment.
+        """
+        return cls._versioned(key, "set", value, backend)
+
+    @classmethod
+    def _versioned(cls, key: str, op: str, value: Any, backend: ServersideBackend | str | None) -> Serverside:
+        obj = cls(value, key=key, backend=backend)
+        obj.delta = op
+        return obj
+
+
+# endregion
+
+
+# region Downsample transform
+
+
+class DownsampleTransform(StatefulDashTransform):
+    """
+    Downsamples large (time series) traces in the figures returned by callbacks marked with the 'downsample' keyword,
+    i.e. downsample=True (or downsample=<points per trace>). The full resolution data is stored in a serverside
+    backend, and a callback bound to the relayoutData of the graph re-samples the visible x-range on zoom/pan (via a
+    Patch, i.e. only the trace data is sent). Only scatter(gl) traces with numeric y values and increasing numeric (or
+    datetime) x values are downsampled. Returning figure dicts rather than go.Figure objects avoids the validation (and
+    encoding) of the full resolution data by plotly.
+
+    The keys of the stored data are generated server side (a new key per figure), and keys passed in by the client are
+    only used to look up (or delete) entries created by the transform. The backend should not be shared with other
+    transforms, e.g. the ServersideOutputTransform. If the data of a figure is no longer available (e.g. evicted by the
+    backend), the figure is annotated accordingly on zoom/pan.
+
+    Args:
+        backend: The backend storing the full resolution data. Defaults to a FileSystemBackend (in a dedicated
+            directory), in which entries never expire (the data of a figure is deleted, when the figure is replaced).
+            For traces of millions of points, a (TieredBackend with a) MemoryBackend avoids reading the
+            data on each relayout.
+        max_points: The (maximum) number of points per trace after downsampling.
+        method: The downsampling method. Either "lttb" (Largest-Triangle-Three-Buckets applied to min/max
+            preselected candidates, visually most faithful) or "minmax" (the min and max of each bucket, fastest).
+    """
+
+    def __init__(self, backend: ServersideBackend | None = None, max_points: int = 1000, method: str = "lttb"):
+        super().__init__()
+        if method not in _downsample_methods:
+            raise ValueError(f"Unsupported downsampling method: {method}")
+        if max_points < 4:
+            raise ValueError("At least 4 points per trace are required.")
+        if backend is None:
+            backend = FileSystemBackend("downsample_backend", threshold=0, default_timeout=0)
+        self.backend = backend
+        self.max_points = max_points
+        self.method = method
+        self._graphs: dict[str, str] = {}
+
+    def transform_layout(self, layout):
+        children = as_list(layout.children) + self.components
+        layout.children = children
+
+    def apply(self, callbacks, clientside_callbacks):
+        callbacks = self.apply_serverside(callbacks)
+        return callbacks + self.blueprint.callbacks, clientside_callbacks
+
+    def apply_serverside(self, callbacks):
+        for callback in callbacks:
+            downsample = callback.kwargs.get("downsample", None)
+            if not downsample:
+                continue
+            max_points = self.max_points if downsample is True else int(downsample)
+            single_output = _is_single_output(callback)
+            # Figures are located in the return value by their (multi) index in the output structure.
+            paths = [
+                [] if single_output else callback.outputs._index[i]
+                for i, o in enumerate(callback.outputs)
+                if o.component_property == "figure" and not _is_wildcard_id(o.component_id)
+            ]
+            graph_ids = [callback.outputs.get(path or [0]).component_id for path in paths]
+            store_outputs = [self._bind_graph(graph_id) for graph_id in graph_ids]
+            # The keys of the stored data are passed in (to delete the replaced data), and the new keys are returned.
+            out_keys = [callback.outputs.append(o) for o in store_outputs]
+            in_keys = [callback.inputs.append(State(o.component_id, "data")) for o in store_outputs]
+            flex = callback.outputs.keyword is not None
+            wrapper = self._downsample_callback(paths, out_keys, in_keys, single_output, flex, max_points)
+            callback.f = wrapper(callback.f)
+        return callbacks
+
+    def _bind_graph(self, graph_id) -> Output:
+        """
+        The output holding the key of the stored data of a graph. On first use, the store and the relayout callback of
+        the graph are created.
+        """
+        key = json.dumps(graph_id, sort_keys=True)
+        # Subsequent callbacks targeting the same graph share the store.
+        if key in self._graphs:
+            return Output(self._graphs[key], "data", allow_duplicate=True)
+        store_id = f"{hashlib.md5(key.encode()).hexdigest()}_downsample"
+        self._graphs[key] = store_id
+        self.components.append(dcc.Store(id=store_id))
+        self.blueprint.callback(
+            Output(graph_id, "figure", allow_duplicate=True),
+            Output(store_id, "data", allow_duplicate=True),
+            Input(graph_id, "relayoutData"),
+            State(store_id, "data"),
+            prevent_initial_call=True,
+        )(self._resample)
+        return Output(store_id, "data")
+
+    def _downsample_callback(self, paths, out_keys, in_keys, single_output, flex, max_points):
+        def wrapper(f):
+            @functools.wraps(f)
+            def decorated_function(*args, **kwargs):
+                args, kwargs, keys = _skip_inputs(args, kwargs, in_keys)
+                outputs = f(*args, **kwargs)
+                new_keys = []
+                for path, key in zip(paths, keys):
+                    figure = _as_figure_dict(_get_in(outputs, path))
+                    # Other values (e.g. no_update or a Patch) leave the stored data as-is.
+                    if figure is None:
+                        new_keys.append(no_update)
+                        continue
+                    # The data of the previous figure is replaced, i.e. no longer needed.
+                    if _is_downsample_key(key):
+                        self.backend.delete(key)
+                    figure, data = self._downsample_figure(figure, max_points)
+                    if data is None:
+                        new_keys.append(None)
+                        continue
+                    key = f"downsample_{uuid.uuid4().hex}"
+                    self.backend.set(key, data)
+                    outputs = _set_in(outputs, path, figure)
+                    new_keys.append(key)
+                # The outputs are appended explicitly, as figures are dicts too (i.e. cannot be told from flex outputs).
+                if flex:
+                    return {**outputs, **dict(zip(out_keys, new_keys))}
+                return ([outputs] if single_output else as_list(outputs)) + new_keys
+
+            return decorated_function
+
+        return wrapper
+
+    def _downsample_figure(self, figure: dict, max_points: int) -> tuple[dict, dict | None]:
+        traces, stored = list(figure["data"]), []
+        for i, trace in enumerate(traces):
+            xy = _trace_xy(trace, max_points)
+            if xy is None:
+                continue
+            x, y = xy
+            indices = _downsample_methods[self.method](x, y, max_points)
+            traces[i] = dict(trace, x=_figure_data(x[indices]), y=_figure_data(y[indices]))
+            stored.append({"index": i, "xaxis": trace.get("xaxis", "x"), "x": x, "y": y})
+        if len(stored) == 0:
+            return figure, None
+        return dict(figure, data=traces), {"traces": stored, "max_points": max_points, "method": self.method}
+
+    def _resample(self, relayout_data, key):
+        import numpy as np
+
+        # The key is passed by the client, i.e. only keys (and values) as created by the transform are accepted.
+        if relayout_data is None or not _is_downsample_key(key):
+            raise PreventUpdate
+        data = self.backend.get(key, ignore_expired=True)
+        # If the data is gone (e.g. evicted), the figure is annotated (once, as the key is reset).
+        if data is None:
+            logger.warning(f"The full resolution data of a downsampled figure [{key}] is no longer available")
+            patch = Patch()
+            patch["layout"]["annotations"].append(_downsample_unavailable)
+            return patch, None
+        if not _is_downsample_data(data):
+            raise PreventUpdate
+        patch, updated = Patch(), False
+        for trace in data["traces"]:
+            changed, bounds = _relayout_range(relayout_data, "xaxis" + trace["xaxis"][1:])
+            if not changed:
+                continue
+            x, y = trace["x"], trace["y"]
+            start, end = 0, len(x)
+            if bounds is not None:
+                # Reversed axes report the range in descending order.
+                low, high = sorted(_axis_value(bound, x) for bound in bounds)
+                # One point beyond the visible range is included on each side, so that lines extend to the edges.
+                start = max(int(np.searchsorted(x, low, side="left")) - 1, 0)
+                end = min(int(np.searchsorted(x, high, side="right")) + 1, len(x))
+            x, y = x[start:end], y[start:end]
+            if len(x) > data["max_points"]:
+                indices = _downsample_methods[data["method"]](x, y, data["max_points"])
+                x, y = x[indices], y[indices]
+            patch["data"][trace["index"]]["x"] = _figure_data(x)
+            patch["data"][trace["index"]]["y"] = _figure_data(y)
+            updated = True
+        if not updated:
+            raise PreventUpdate
+        return patch, no_update
+
+    def sort_key(self):
+        # Applied before the serialization transforms, i.e. these process the downsampled figures. The wrapped callback
+        # keeps the signature of the original function (functools.wraps), which the serialization transforms follow.
+        return -1
+
+
+_downsample_unavailable = {
+    "text": "Full resolution data unavailable, showing downsampled data",
+    "xref": "paper",
+    "yref": "paper",
+    "x": 1,
+    "y": 1,
+    "xanchor": "right",
+    "yanchor": "bottom",
+    "showarrow": False,
+}
+
+
+def _is_downsample_key(key) -> bool:
+    return isinstance(key, str) and re.fullmatch("downsample_[0-9a-f]{32}", key) is not None
+
+
+def _is_downsample_data(data) -> bool:
+    if not isinstance(data, dict) or data.get("method") not in _downsample_methods:
+        return False
+    if not isinstance(data.get("max_points"), int) or not isinstance(data.get("traces"), list):
+        return False
+    return all(isinstance(trace, dict) and trace.keys() >= {"index", "xaxis", "x", "y"} for trace in data["traces"])
+
+
+def _is_wildcard_id(component_id) -> bool:
+    return isinstance(component_id, dict) and any(isinstance(v, _Wildcard) for v in component_id.values())
+
+
+def _figure_array(value) -> Any:
+    import numpy as np
+
+    if value is None:
+        return None
+    pd = sys.modules.get("pandas")
+    if pd is not None and isinstance(value, (pd.Series, pd.Index)):
+        return value.to_numpy()
+    # Figure objects hold typed array specs (plotly >= 6).
+    if isinstance(value, dict) and "bdata" in value:
+        return _decode_typed_array(value)
+    return np.asarray(value)
+
+
+def _figure_data(array) -> Any:
+    spec = _plotly_typed_array(array)
+    return array if spec is None else spec
+
+
+def _trace_xy(trace: dict, max_points: int) -> tuple[Any, Any] | None:
+    """
+    The (x, y) arrays of a trace to downsample, or None if the trace should be left as-is.
+    """
+    import numpy as np
+
+    if trace.get("type", "scatter") not in ("scatter", "scattergl") or "x0" in trace or "dx" in trace:
+        return None
+    y = _figure_array(trace.get("y"))
+    if y is None or y.ndim != 1 or len(y) <= max_points or y.dtype.kind not in "biuf":
+        return None
+    x = _figure_array(trace.get("x"))
+    x = np.arange(len(y)) if x is None else x
+    if x.shape != y.shape or x.dtype.kind not in "iufM":
+        return None
+    # The visible range is located by bisection, i.e. x must be increasing.
+    if not np.all(x[1:] >= x[:-1]):
+        return None
+    return x, y
+
+
+def _relayout_range(relayout_data: dict, axis: str) -> tuple[bool, tuple | None]:
+    """
+    Whether the range of the axis was changed, and the new range (None for the full range, i.e. autorange).
+    """
+    if f"{axis}.range[0]" in relayout_data and f"{axis}.range[1]" in relayout_data:
+        return True, (relayout_data[f"{axis}.range[0]"], relayout_data[f"{axis}.range[1]"])
+    if f"{axis}.range" in relayout_data:
+        return True, tuple(relayout_data[f"{axis}.range"])
+    if relayout_data.get(f"{axis}.autorange") or relayout_data.get("autosize"):
+        return True, None
+    return False, None
+
+
+def _axis_value(value, x):
+    import numpy as np
+
+    if x.dtype.kind != "M":
+        return float(value)
+    # Date axes report the range as strings (e.g. "2020-01-01 12:30:00.5"), or as milliseconds.
+    return np.datetime64(int(value), "ms") if isinstance(value, (int, float)) else np.datetime64(value)
+
+
+def _minmax_indices(x, y, n_out: int):
+    """
+    Indices of the first and last point, and of the min and max of each of (n_out - 2) / 2 buckets of equal size.
+    """
+    import numpy as np
+
+    n, n_buckets = len(y), (n_out - 2) // 2
+    size = -(-(n - 2) // n_buckets)
+    # The buckets are reduced as the rows of a (strided) 2D view, i.e. without copying the data.
+    n_full = min((n - 2) // size, n_buckets)
+    body = y[1 : 1 + n_full * size].reshape(n_full, size)
+    offsets = np.arange(n_full) * size + 1
+    parts = [[0], body.argmin(axis=1) + offsets, body.argmax(axis=1) + offsets]
+    tail = y[1 + n_full * size : n - 1]
+    if len(tail) > 0:
+        parts += [[1 + n_full * size + tail.argmin(), 1 + n_full * size + tail.argmax()]]
+    return np.unique(np.concatenate(parts + [[n - 1]]))
+
+
+def _lttb_indices(x, y, n_out: int):
+    """
+    Indices selected by the Largest-Triangle-Three-Buckets algorithm. For large traces, the candidates are preselected
+    via min/max bucketing (MinMaxLTTB), i.e. the (inherently sequential) selection loops over few points per bucket.
+    """
+    import numpy as np
+
+    candidates = _minmax_indices(x, y, 4 * n_out) if len(y) > 8 * n_out else np.arange(len(y))
+    x, y = x[candidates], y[candidates]
+    x = (x.view("i8") if x.dtype.kind == "M" else x).astype(np.float64)
+    y = y.astype(np.float64)
+    # The first and last points are kept, the others are split into n_out - 2 buckets.
+    edges = np.linspace(1, len(x) - 1, n_out - 1).astype(np.intp)
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[: edges[-1]], edges[:-1]) / counts
+    mean_y = np.add.reduceat(y[: edges[-1]], edges[:-1]) / counts
+    # The third point of the triangle is the mean of the next bucket (or the last point).
+    next_x, next_y = np.append(mean_x[1:], x[-1]), np.append(mean_y[1:], y[-1])
+    selected = np.empty(n_out, dtype=np.intp)
+    selected[0], selected[-1] = 0, len(x) - 1
+    a = 0
+    for i in range(n_out - 2):
+        xs, ys = x[edges[i] : edges[i + 1]], y[edges[i] : edges[i + 1]]
+        area = np.abs((x[a] - next_x[i]) * (ys - y[a]) - (x[a] - xs) * (next_y[i] - y[a]))
+        a = edges[i] + int(area.argmax())
+        selected[i + 1] = a
+    return candidates[selected]
+
+
+_downsample_methods = {"lttb": _lttb_indices, "minmax": _minmax_indices}
+
+
+# endregion
+
+
+# region Batteries included dash proxy object
+
+
+class Dash(DashProxy):
+    def __init__(self, *args, **kwargs):
+        transforms = [
+            TriggerTransform(),
+            MultiplexerTransform(),
+            CycleBreakerTransform(),
+            BlockingCallbackTransform(),
+            ServersideOutputTransform(),
+        ]
+        super().__init__(*args, transforms=transforms, **kwargs)
+
+
+# endregion
+
+# region Utils
+
+
+def _skip_inputs(args, kwargs, keys: List[Any]):
+    fltr = []
+    str_keys = [key for key in keys if isinstance(key, str)]
+    int_keys = [key for key in keys if isinstance(key, int)]
+    # Drop str keys.
+    for key in str_keys:
+        fltr.append(kwargs.pop(key))
+    # Filter the other ones.
+    if any(int_keys):
+        args = list(args)
+        fltr.extend([arg for i, arg in enumerate(args) if i in keys])
+        args = [arg for i, arg in enumerate(args) if i not in keys]
+    # TODO: Do we need to handle None?
+    return args, kwargs, fltr
 
 
 def _append_output(outputs, value, single_output, out_idx):
@@ -1368,8 +5074,435 @@ def _append_output(outputs, value, single_output, out_idx):
     return as_list(outputs) + [value]
 
 
+def _is_single_output(callback: CallbackBlueprint) -> bool:
+    # Mirrors CallbackBlueprint.register, where single element lists are unpacked.
+    structure = callback.outputs.structure
+    return isinstance(structure, list) and len(structure) == 1
+
+
+def _resolve_output_ids(outputs: list[Output]) -> list[str] | None:
+    context = context_value.get(None)
+    specs = getattr(context, "outputs_list", None) if context else None
+    # Outside a request (e.g. if the function is invoked directly), fall back to the static ids.
+    if specs is None:
+        return [str(o) for o in outputs]
+    specs = [specs] if len(outputs) == 1 else specs
+    if any(not isinstance(spec, dict) for spec in specs):
+        return None
+    return [json.dumps(spec, sort_keys=True) for spec in specs]
+
+
+def _replace_leaves(structure, values: Iterator):
+    # Traversal order matches build_index.
+    if isinstance(structure, list):
+        return [_replace_leaves(s, values) for s in structure]
+    if isinstance(structure, dict):
+        return {k: _replace_leaves(v, values) for k, v in structure.items()}
+    return next(values)
+
+
+def _set_in(data, path: list[Any], value: Any):
+    if len(path) == 0:
+        return value
+    container = list(data) if isinstance(data, tuple) else data
+    container[path[0]] = _set_in(container[path[0]], path[1:], value)
+    return tuple(container) if isinstance(data, tuple) else container
+
+
+def _match_id(pattern: Any, component_id: Any) -> bool:
+    # Wildcards (pattern matching callbacks) match any value.
+    if not isinstance(pattern, dict) or not isinstance(component_id, dict):
+        return pattern == component_id
+    if pattern.keys() != component_id.keys():
+        return False
+    return all(isinstance(v, _Wildcard) or component_id[k] == v for k, v in pattern.items())
+
+
+def _get_in(data, path: list[Any]):
+    for j in path:
+        try:
+            data = data[j]
+        except (IndexError, KeyError, TypeError):
+            return None
+    return data
+
+
+@functools.cache
+def _instrumented_pool_class():
+    # Redis is an optional dependency, so the class is created on first use.
+    import redis
+
+    class InstrumentedBlockingConnectionPool(redis.BlockingConnectionPool):
+        """
+        Blocking connection pool that reports the time spent waiting for a connection.
+        """
+
+        def __init__(self, on_wait: Callable[[float], None], **kwargs):
+            super().__init__(**kwargs)
+            self.on_wait = on_wait
+
+        def get_connection(self, *args, **kwargs):
+            start = time.perf_counter()
+            connection = super().get_connection(*args, **kwargs)
+            self.on_wait(time.perf_counter() - start)
+            return connection
+
+    return InstrumentedBlockingConnectionPool
+
+
+@contextlib.contextmanager
+def _file_lock(path: str, timeout: float, stale: float = 60) -> Iterator[None]:
+    """
+    Inter-process lock, held while the (exclusively created) lock file exists. Lock files older than stale seconds are
+    considered abandoned (e.g. by a crashed process), and removed.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except FileExistsError:
+            pass
+        try:
+            if time.time() - os.path.getmtime(path) > stale:
+                os.remove(path)
+                continue
+        except FileNotFoundError:
+            continue
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Timeout while waiting for lock file '{path}'")
+        time.sleep(0.005)
+    try:
+        yield
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+
+
+_process_locks = [threading.Lock() for _ in range(64)]
+
+
+@contextlib.contextmanager
+def _process_lock(name: str, timeout: float) -> Iterator[None]:
+    # Striped locks, i.e. unrelated names might share a lock, but the number of locks is bounded.
+    lock = _process_locks[hash(name) % len(_process_locks)]
+    if not lock.acquire(timeout=timeout):
+        raise TimeoutError(f"Timeout while waiting for lock '{name}'")
+    try:
+        yield
+    finally:
+        lock.release()
+
+
+def _connection_pool_kwargs(kwargs: dict[str, Any]) -> dict[str, Any]:
+    """
+    Map the keyword arguments of a Redis client (e.g. ssl=True or unix_socket_path) to those of a connection pool, as
+    done by redis.Redis. Other keyword arguments are passed to the connection (class) as-is.
+    """
+    import redis
+
+    kwargs = dict(kwargs)
+    unix_socket_path = kwargs.pop("unix_socket_path", None)
+    if unix_socket_path is not None:
+        for key in ["host", "port", "socket_connect_timeout", "socket_keepalive", "socket_keepalive_options"]:
+            kwargs.pop(key, None)
+        kwargs = {k: v for k, v in kwargs.items() if k != "ssl" and not k.startswith("ssl_")}
+        return dict(kwargs, path=unix_socket_path, connection_class=redis.UnixDomainSocketConnection)
+    if kwargs.pop("ssl", False):
+        kwargs.setdefault("connection_class", redis.SSLConnection)
+    return kwargs
+
+
+def _apply_deltas(segments: list[tuple[str, Any]]) -> Any:
+    value = None
+    appended: list[Any] = []
+    # Consecutive appends are concatenated in one go.
+    for op, delta in segments + [("end", None)]:
+        if op == "append":
+            appended.append(delta)
+            continue
+        if len(appended) > 0:
+            value = _concat(appended if value is None else [value] + appended)
+            appended = []
+        if op == "set":
+            value = delta
+        elif op == "patch":
+            value = _patch(value, delta)
+    return value
+
+
+def _concat(values: list[Any]) -> Any:
+    pd, np = sys.modules.get("pandas"), sys.modules.get("numpy")
+    if pd is not None and isinstance(values[0], pd.DataFrame):
+        return pd.concat(values)
+    if np is not None and isinstance(values[0], np.ndarray):
+        return np.concatenate(values)
+    if isinstance(values[0], list):
+        return [row for value in values for row in value]
+    raise TypeError(f"Unsupported type for append: {type(values[0])}")
+
+
+def _patch(value: Any, delta: Any) -> Any:
+    if value is None:
+        return delta
+    pd = sys.modules.get("pandas")
+    if pd is not None and isinstance(value, pd.DataFrame):
+        return delta.combine_first(value)
+    if isinstance(value, dict):
+        return {**value, **delta}
+    raise TypeError(f"Unsupported type for patch: {type(value)}")
+
+
+def _to_str(value: str | bytes) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _to_json_bytes(value: Any) -> bytes:
+    pd = sys.modules.get("pandas")
+    if pd is not None and isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.to_json(orient="records", date_format="iso").encode()
+    return json.dumps(value, cls=plotly.utils.PlotlyJSONEncoder).encode()
+
+
+def _file_etag(f: BinaryIO) -> str:
+    try:
+        stat = os.fstat(f.fileno())
+    except (AttributeError, OSError):
+        return hashlib.md5(f.getbuffer()).hexdigest()
+    return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+
+def _stream_response(f: BinaryIO, offset: int, length: int, etag: str, mimetype: str) -> Response:
+    """
+    Stream length bytes (starting at offset) of f, honoring If-None-Match and (single) Range requests.
+    """
+    headers = {"ETag": f'"{etag}"', "Accept-Ranges": "bytes", "Cache-Control": "private, no-cache"}
+    if request.if_none_match.contains(etag):
+        f.close()
+        return Response(status=304, headers=headers)
+    start, stop, status = 0, length, 200
+    # Multipart (i.e. multiple) ranges are not supported, so the full content is sent instead.
+    if request.range is not None and len(request.range.ranges) == 1:
+        window = request.range.range_for_length(length)
+        if window is None:
+            f.close()
+            return Response(status=416, headers={**headers, "Content-Range": f"bytes */{length}"})
+        start, stop = window
+        headers["Content-Range"] = request.range.to_content_range_header(length)
+        status = 206
+    headers["Content-Length"] = str(stop - start)
+    body = _read_chunks(f, offset + start, stop - start)
+    return Response(body, status=status, mimetype=mimetype, headers=headers, direct_passthrough=True)
+
+
+def _read_chunks(f: BinaryIO, offset: int, length: int, chunk_size: int = 256 * 1024) -> Iterator[bytes]:
+    try:
+        f.seek(offset)
+        while length > 0:
+            chunk = f.read(min(chunk_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        f.close()
+
+
 def plotly_jsonify(data):
     return json.loads(json.dumps(data, cls=plotly.utils.PlotlyJSONEncoder))
 
 
+@functools.cache
+def _is_installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+class _LruCache:
+    """
+    Thread safe mapping holding (at most) max_size entries, evicting the least recently used.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[Any, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Any:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+class _LazyExecutor:
+    """
+    Thread pool that is created on first use, and re-created after a fork (threads do not survive forking).
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._pid: int | None = None
+
+    def map(self, fn: Callable, items) -> list[Any]:
+        items = list(items)
+        # Don't pay the thread overhead for a single item.
+        if len(items) <= 1:
+            return [fn(item) for item in items]
+        return list(self._get().map(fn, items))
+
+    def submit(self, fn: Callable, *args) -> Future:
+        return self._get().submit(fn, *args)
+
+    def _get(self) -> ThreadPoolExecutor:
+        if self._executor is None or self._pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            self._pid = os.getpid()
+        return self._executor
+
+
+class _WriteBehindQueue:
+    """
+    Bounded queue of pending (asynchronous) backend writes. Repeated writes to a pending key are collapsed into one,
+    and pending values can be read back until they have been written. When max_pending writes are in flight, put
+    blocks until a slot is available.
+    """
+
+    def __init__(self, max_workers: int = 4, max_pending: int = 64):
+        self._executor = _LazyExecutor(max_workers)
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending: dict[tuple[str, str], Any] = {}
+        self._done = threading.Condition()
+
+    def put(self, backend: ServersideBackend, key: str, value: Any):
+        entry = (backend.uid, key)
+        with self._done:
+            if entry in self._pending:
+                self._pending[entry] = value
+                return
+        self._slots.acquire()
+        with self._done:
+            # Another thread might have queued the key while we were waiting.
+            if entry in self._pending:
+                self._pending[entry] = value
+                self._slots.release()
+                return
+            self._pending[entry] = value
+        self._executor.submit(self._write, backend, key)
+
+    def get(self, backend_uid: str, key: str) -> tuple[bool, Any]:
+        """
+        Returns a (pending, value) tuple.
+        """
+        with self._done:
+            entry = (backend_uid, key)
+            return entry in self._pending, self._pending.get(entry)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Wait for all pending writes to complete.
+        """
+        with self._done:
+            return self._done.wait_for(lambda: len(self._pending) == 0, timeout)
+
+    def _write(self, backend: ServersideBackend, key: str):
+        entry = (backend.uid, key)
+        while True:
+            with self._done:
+                value = self._pending[entry]
+            try:
+                backend.set(key, value)
+            except Exception:
+                logger.exception(f"Exception raised while writing serverside value [{key}]")
+            with self._done:
+                # If the value was updated during the write, write again.
+                if self._pending[entry] is not value:
+                    continue
+                del self._pending[entry]
+                self._slots.release()
+                self._done.notify_all()
+                return
+
+
+def _content_hash(value: Any) -> str:
+    """
+    Fast hash of the (pickled) value. Out-of-band buffers (e.g. the data of numpy arrays) are hashed without copying.
+    The iteration order of sets depends on the hash seed of the process, so values holding sets are hashed again with
+    the sets encoded canonically (see _CanonicalPickler), i.e. the hash is the same in every process.
+    """
+    hasher = hashlib.blake2b(digest_size=20)
+    has_sets = False
+
+    def write(data):
+        nonlocal has_sets
+        hasher.update(data)
+        # The set opcodes (EMPTY_SET, FROZENSET) might also be part of the data, which merely costs the second pass.
+        has_sets = has_sets or b"\x8f" in data or b"\x91" in data
+
+    pickle.dump(
+        value, SimpleNamespace(write=write), protocol=5, buffer_callback=lambda buffer: hasher.update(buffer.raw())
+    )
+    if not has_sets:
+        return hasher.hexdigest()
+    canonical = hashlib.blake2b(digest_size=20)
+    writer = SimpleNamespace(write=canonical.update)
+    _CanonicalPickler(writer, protocol=5, buffer_callback=lambda buffer: canonical.update(buffer.raw())).dump(value)
+    return canonical.hexdigest()
+
+
+class _CanonicalPickler(pickle.Pickler):
+    """
+    Pickler encoding sets (and frozensets) by the sorted hashes of their elements, i.e. independent of their iteration
+    order. Other values are encoded as by pickle.dumps, so values without sets hash the same in either pass.
+    """
+
+    def persistent_id(self, obj):
+        if isinstance(obj, (set, frozenset)):
+            return type(obj).__name__, sorted(_content_hash(item) for item in obj)
+        return None
+
+
+def _estimate_size(value: Any, sample: int = 100) -> int:
+    """
+    Cheap estimate of the in-memory size (in bytes) of a value. Large containers are estimated from a sample.
+    """
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, memoryview):
+        return value.nbytes
+    # Pandas objects (DataFrame, Series, Index).
+    memory_usage = getattr(value, "memory_usage", None)
+    if callable(memory_usage):
+        try:
+            usage = memory_usage(deep=True)
+            return int(usage.sum() if hasattr(usage, "sum") else usage)
+        except TypeError:
+            pass
+    # Numpy arrays (and other buffer-like objects).
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    if isinstance(value, dict):
+        items = list(islice(value.items(), sample))
+        if len(items) == 0:
+            return sys.getsizeof(value)
+        partial = sum(_estimate_size(k, sample) + _estimate_size(v, sample) for k, v in items)
+        return sys.getsizeof(value) + partial * len(value) // len(items)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = list(islice(value, sample))
+        if len(items) == 0:
+            return sys.getsizeof(value)
+        partial = sum(_estimate_size(item, sample) for item in items)
+        return sys.getsizeof(value) + partial * len(value) // len(items)
+    return sys.getsizeof(value)
+
+
 # endregion
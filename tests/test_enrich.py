@@ -1,21 +1,32 @@
+import base64
 import decimal
+import functools
 import json
 import os
 import re
+import subprocess
+import sys
+import threading
 import time
+from collections import defaultdict
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Any, TypedDict, TypeVar
 
 import dash
+import flask
 import pandas as pd
 import pytest
 from dash.exceptions import PreventUpdate
-from pydantic import BaseModel
+from dataclass_wizard import asdict
+from pydantic import BaseModel, ConfigDict, field_validator
+from werkzeug.exceptions import HTTPException
 
 import dash_extensions.enrich
 from dash_extensions.enrich import (
     ALL,
     MATCH,
+    ArrowTransform,
     BaseModelTransform,
     BlockingCallbackTransform,
     CallbackBlueprint,
@@ -25,19 +36,34 @@ from dash_extensions.enrich import (
     DashProxy,
     DataclassTransform,
     DependencyCollection,
+    DownsampleTransform,
+    EnrichedOutput,
+    FigureTransform,
+    FileSystemBackend,
     Input,
+    LazyServerside,
+    MemoryBackend,
     MultiplexerTransform,
     Output,
     PrefixIdTransform,
+    RedisBackend,
     Serverside,
     ServersideOutputTransform,
+    ServersideRoute,
+    ServersideRoutingPolicy,
+    ServersideSerializerRegistry,
+    ServersideTable,
+    ShardedFileSystemBackend,
+    SharedMemoryBackend,
     State,
+    TieredBackend,
     Trigger,
     TriggerTransform,
     callback,
     clientside_callback,
     dcc,
     html,
+    no_update,
 )
 
 # region Test utils/stubs
@@ -875,3 +901,1047 @@ def test_cycle_breaker_transform(dash_duo, c_args, c_kwargs, f_args, f_kwargs):
     c = dash_duo.find_element("#celsius")
     c.send_keys("100")
     dash_duo.wait_for_text_to_equal("#fahrenheit", "212", timeout=1)
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryBackend(max_bytes=300)
+    backend.set("a", b"a" * 100)
+    backend.set("b", b"b" * 100)
+    backend.set("c", b"c" * 100)
+    # Touch "a", making "b" the least recently used entry.
+    assert backend.get("a") == b"a" * 100
+    backend.set("d", b"d" * 100)
+    assert not backend.has("b")
+    assert all(backend.has(key) for key in ["a", "c", "d"])
+    assert backend.size == 300
+    # Values larger than the budget are not stored.
+    assert not backend.set("e", b"e" * 301)
+    assert not backend.has("e")
+
+
+def test_tiered_backend(tmp_path):
+    memory = MemoryBackend()
+    disk = FileSystemBackend(cache_dir=str(tmp_path))
+    backend = TieredBackend([memory, disk])
+    transform = ServersideOutputTransform(backends=[backend])
+    # Writes go through all tiers.
+    data = transform._try_dump(Serverside(pd.DataFrame(columns=["A"], data=[1])))
+    key = json.loads(data[len(ServersideOutputTransform.prefix) :])["key"]
+    assert memory.has(key) and disk.has(key)
+    # Reads are served from the memory tier.
+    assert transform._try_load(data) is memory.get(key)
+    # Hits in slower tiers are promoted.
+    memory.delete(key)
+    assert transform._try_load(data).to_json() == '{"A":{"0":1}}'
+    assert memory.has(key)
+
+
+def test_serverside_output_transform_bulk_operations():
+    class CountingBackend(MemoryBackend):
+        def __init__(self):
+            super().__init__()
+            self.calls = defaultdict(int)
+
+        def get_many(self, *keys, ignore_expired=False):
+            self.calls["get_many"] += 1
+            return super().get_many(*keys, ignore_expired=ignore_expired)
+
+        def set_many(self, mapping):
+            self.calls["set_many"] += 1
+            return super().set_many(mapping)
+
+    backend = CountingBackend()
+    transform = ServersideOutputTransform(backends=[backend])
+    cbp = CallbackBlueprint(
+        Output({"type": "store", "index": ALL}, "data"), Input({"type": "store", "index": ALL}, "data")
+    )
+    cbp.f = lambda values: [Serverside(value + 1) for value in values]
+    transform.apply_serverside([cbp])
+    # All outputs should be written in a single operation.
+    refs = cbp.f([0, 1, 2])
+    assert backend.calls["set_many"] == 1
+    # And all inputs should be read in a single operation.
+    refs = cbp.f(refs)
+    assert backend.calls["get_many"] == 1
+    assert transform._try_load_many([(ref, None) for ref in refs]) == [2, 3, 4]
+
+
+def test_redis_backend_bulk_operations():
+    fakeredis = pytest.importorskip("fakeredis")
+    backend = RedisBackend(host=fakeredis.FakeRedis())
+    assert backend.set_many({"a": 1, "b": [2]}) == ["a", "b"]
+    assert backend.get_many("a", "b", "c", ignore_expired=True) == [1, [2], None]
+
+
+def test_sharded_file_system_backend(tmp_path):
+    backend = ShardedFileSystemBackend(cache_dir=str(tmp_path), max_bytes=10_000)
+    backend.set("a", b"a" * 4000)
+    backend.set("b", b"b" * 4000)
+    # Entries are stored in sharded sub directories.
+    assert os.path.isfile(backend._get_filename("a"))
+    assert os.path.dirname(backend._get_filename("a")) != str(tmp_path)
+    # Touch "a" (bypassing the access time resolution), making "b" the least recently used entry.
+    backend.atime_resolution = -1
+    assert backend.get("a") == b"a" * 4000
+    backend.set("c", b"c" * 4000)
+    assert not backend.has("b") and not os.path.isfile(backend._get_filename("b"))
+    assert backend.has("a") and backend.has("c")
+    assert len(backend) == 2 and backend.size <= 10_000
+    # Expired entries are only returned when expiry is ignored.
+    backend.set("d", 42, timeout=-1)
+    assert backend.get("d") is None
+    assert backend.get("d", ignore_expired=True) == 42
+
+
+def test_serializer_registry(tmp_path):
+    np = pytest.importorskip("numpy")
+    pytest.importorskip("pyarrow")
+    df = pd.DataFrame({"a": np.arange(100, dtype=float), "b": ["x"] * 100})
+    arr = np.arange(12).reshape(3, 4)
+    # Write a legacy (pickled) entry.
+    FileSystemBackend(cache_dir=str(tmp_path)).set("legacy", [1, 2, 3])
+    backend = FileSystemBackend(cache_dir=str(tmp_path), serializer=ServersideSerializerRegistry())
+    for key, value in {"df": df, "arr": arr, "obj": {"a": 1}}.items():
+        backend.set(key, value)
+    # Frames and arrays are memory-mapped on read (hence read-only).
+    loaded_df = backend.get("df", ignore_expired=True)
+    assert loaded_df.equals(df)
+    assert not loaded_df["a"].to_numpy().flags.writeable
+    loaded_arr = backend.get("arr", ignore_expired=True)
+    assert np.array_equal(loaded_arr, arr) and not loaded_arr.flags.writeable
+    # Other types (and legacy entries) are pickled.
+    assert backend.get("obj") == {"a": 1}
+    assert backend.get("legacy") == [1, 2, 3]
+
+
+def test_serializer_registry_redis():
+    np = pytest.importorskip("numpy")
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeRedis()
+    RedisBackend(host=client).set("legacy", [1, 2, 3])
+    backend = RedisBackend(host=client, serializer=ServersideSerializerRegistry())
+    backend.set("arr", np.asfortranarray(np.arange(6).reshape(2, 3)))
+    assert np.array_equal(backend.get("arr"), np.arange(6).reshape(2, 3))
+    assert backend.get("legacy") == [1, 2, 3]
+
+
+def test_serverside_output_transform_content_addressed():
+    backend = MemoryBackend()
+    transform = ServersideOutputTransform(backends=[backend], content_addressed=True)
+    df = pd.DataFrame(columns=["A"], data=[1])
+    # Identical values yield identical references, and are stored only once.
+    ref = transform._try_dump(Serverside(df))
+    stored = backend.get(json.loads(ref[len(transform.prefix) :])["key"])
+    assert transform._try_dump(Serverside(df.copy())) == ref
+    assert transform._try_load(ref) is stored
+    # Explicit keys, and objects opting out, are not content addressed.
+    refs = transform._try_dump_many([Serverside(df, content_addressed=False), Serverside(df, key="df")])
+    assert ref not in refs
+    assert len(backend._entries) == 3
+    # The existence of the content addressed values is checked in one operation.
+    checks = []
+    backend.has_many = lambda *keys: checks.append(keys) or MemoryBackend.has_many(backend, *keys)
+    transform._try_dump_many([Serverside(df), Serverside([1, 2]), Serverside([3])])
+    assert len(checks) == 1 and len(checks[0]) == 3
+
+
+def test_serverside_output_transform_content_addressed_sets():
+    # The iteration order of sets depends on the hash seed (i.e. the process), but the content key must not.
+    code = (
+        "from dash_extensions.enrich import MemoryBackend, Serverside, ServersideOutputTransform;"
+        "transform = ServersideOutputTransform(backends=[MemoryBackend()], content_addressed=True);"
+        "print(transform._try_dump(Serverside([{'a', 'b', 'c'}, frozenset('xyz')])))"
+    )
+    env = dict(os.environ)
+    refs = {
+        subprocess.run(
+            [sys.executable, "-c", code], check=True, env=dict(env, PYTHONHASHSEED=seed), capture_output=True
+        ).stdout
+        for seed in ["1", "2", "3"]
+    }
+    transform = ServersideOutputTransform(backends=[MemoryBackend()], content_addressed=True)
+    assert len(refs) == 1 and refs.pop().startswith(transform.prefix.encode())
+    assert transform._try_dump(Serverside({"a", "b"})) != transform._try_dump(Serverside({"a", "c"}))
+
+
+def test_serverside_output_transform_write_behind():
+    class SlowBackend(MemoryBackend):
+        def __init__(self):
+            super().__init__()
+            self.release = threading.Event()
+            self.writes = 0
+
+        def set(self, key, value, timeout=None):
+            self.release.wait()
+            self.writes += 1
+            return super().set(key, value, timeout)
+
+    backend = SlowBackend()
+    transform = ServersideOutputTransform(backends=[backend], write_behind=True)
+    # The dump returns immediately, and the pending value can be read back.
+    ref = transform._try_dump(Serverside(1, key="key"))
+    assert not backend.has("key")
+    assert transform._try_load(ref) == 1
+    # Repeated writes to a pending key are collapsed.
+    for i in range(2, 5):
+        assert transform._try_dump(Serverside(i, key="key")) == ref
+    assert transform._try_load(ref) == 4
+    backend.release.set()
+    assert transform.flush(timeout=5)
+    assert backend.get("key") == 4
+    assert backend.writes <= 2
+
+
+def test_serverside_output_transform_lazy_arguments():
+    backend = MemoryBackend()
+    transform = ServersideOutputTransform(backends=[backend])
+    df = pd.DataFrame(columns=["A"], data=[1, 2])
+    # The sizes of the dumped values are not recorded, unless a callback takes lazy arguments.
+    assert transform._sizes.get(transform._try_dump(Serverside(df))) is None
+    cbp = CallbackBlueprint(Output("log", "children"), Input("btn", "n_clicks"), State("store", "data"))
+
+    def update_log(n_clicks, data: LazyServerside[pd.DataFrame]):
+        if not n_clicks:
+            raise PreventUpdate
+        return len(data), data.columns[0], data["A"].sum()
+
+    cbp.f = update_log
+    transform.apply_serverside([cbp])
+    ref = transform._try_dump(Serverside(df))
+    # If the argument is not accessed, it is not loaded.
+    with pytest.raises(PreventUpdate):
+        cbp.f(None, ref)
+    assert transform.lazy_stats == {"deferred": 1, "loaded": 0, "bytes_avoided": df.memory_usage(deep=True).sum()}
+    # Otherwise, it is loaded (once).
+    assert cbp.f(1, ref) == (2, "A", 3)
+    assert transform.lazy_stats["deferred"] == 2 and transform.lazy_stats["loaded"] == 1
+
+
+def test_serverside_output_transform_memoize():
+    import flask
+
+    backend = MemoryBackend()
+    transform = ServersideOutputTransform(backends=[backend])
+    calls = []
+    outputs = [EnrichedOutput("store", "data"), EnrichedOutput("session_store", "data", session_check=True)]
+    cbp = CallbackBlueprint(outputs, Input("dd", "value"), memoize=True)
+
+    def aggregate(value):
+        calls.append(value)
+        return Serverside(value * 2), Serverside(value * 3)
+
+    cbp.f = aggregate
+    transform.apply_serverside([cbp])
+    server = flask.Flask(__name__)
+    server.secret_key = "secret"
+    with server.test_request_context():
+        refs = list(cbp.f(1))
+        assert [transform._try_load(ref) for ref in refs] == [2, 3]
+        # Repeated arguments return the stored references, without evaluating the function.
+        assert cbp.f(1) == refs
+        assert list(cbp.f(2)) != refs
+        assert cbp.f(1) == refs
+        assert calls == [1, 2]
+    # The session scoped value is re-evaluated in a new session.
+    with server.test_request_context():
+        assert list(cbp.f(1)) != refs
+        assert calls == [1, 2, 1]
+
+
+@pytest.mark.parametrize("backend_type", ["file_system", "redis"])
+def test_serverside_output_transform_session_scoped(tmp_path, monkeypatch, backend_type):
+    import flask
+
+    if backend_type == "redis":
+        fakeredis = pytest.importorskip("fakeredis")
+        backend = RedisBackend(host=fakeredis.FakeRedis())
+    else:
+        backend = FileSystemBackend(cache_dir=str(tmp_path))
+    transform = ServersideOutputTransform(
+        backends=[backend], session_scoped=True, session_max_bytes=10_000, reap_interval=None
+    )
+    server = flask.Flask(__name__)
+    server.secret_key = "secret"
+    with server.test_request_context():
+        refs = [transform._try_dump(Serverside(bytes(4000))) for _ in range(2)]
+        # Reading marks the first value as recently used.
+        assert transform._try_load(refs[0]) == bytes(4000)
+        # Keys are namespaced by session, and the least recently used value is evicted when the quota is exceeded.
+        ref = transform._try_dump(Serverside(bytes(4000)))
+        assert json.loads(ref[len(transform.prefix) :])["key"].startswith(f"{flask.session['session_id']}/")
+        assert transform._try_load(refs[1]) is None
+        assert transform._try_load(refs[0]) == transform._try_load(ref) == bytes(4000)
+    # Another session has its own quota, and cannot read the values of other sessions.
+    with server.test_request_context():
+        other = transform._try_dump(Serverside(bytes(4000)))
+        assert transform._try_load(refs[0]) is None
+        # Accesses are recorded (at most) once per interval.
+        index_type, touched = type(backend.session_index), []
+        touch = index_type.touch
+        monkeypatch.setattr(index_type, "touch", lambda self, *args: touched.append(args) or touch(self, *args))
+        for _ in range(3):
+            transform._try_load(other)
+        assert len(touched) == 1
+    assert transform._try_load(refs[0]) is not None
+    # Inactive sessions are removed in bulk.
+    transform.session_timeout = -1
+    assert transform.reap() == 2
+    assert transform._try_load(refs[0]) is None and transform._try_load(other) is None
+    assert transform.reap() == 0
+
+
+def test_redis_backend_expiry():
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeRedis()
+    # Sliding expiry with a fixed timeout.
+    backend = RedisBackend(host=client, default_timeout=100, sliding_expiry=True)
+    backend.set("a", 1)
+    client.expire("a", 10)
+    assert backend.get_many("a", "b") == [1, None]
+    assert client.ttl("a") > 90
+    # Size dependent timeouts.
+    backend = RedisBackend(host=client, sliding_expiry=True, timeout_by_size=[(1000, 300), (100_000, 60)])
+    backend.set_many({"small": b"", "large": bytes(10_000), "huge": bytes(1_000_000)})
+    assert [round(client.ttl(key), -1) for key in ["small", "large", "huge"]] == [300, 60, 24 * 3600]
+    client.expire("large", 10)
+    assert backend.get("large") == bytes(10_000)
+    assert client.ttl("large") > 50
+    # Without a timeout, values never expire.
+    RedisBackend(host=client, default_timeout=0).set("forever", 1)
+    assert client.ttl("forever") == -1
+
+
+def test_redis_backend_lock():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")  # Lua scripting support of fakeredis
+    client = fakeredis.FakeRedis()
+    backend = RedisBackend(host=client)
+    with backend.lock("key"):
+        assert client.exists("key#lock")
+        with pytest.raises(TimeoutError), backend.lock("key", timeout=0.05):
+            pass
+    assert not client.exists("key#lock")
+    # A lock that expired, and was acquired by another process, is not released.
+    with backend.lock("key"):
+        client.set("key#lock", "other")
+    assert client.get("key#lock") == b"other"
+
+
+def test_redis_backend_offload():
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeRedis()
+    offload_backend = MemoryBackend()
+    backend = RedisBackend(host=client, offload_backend=offload_backend, offload_threshold=1000)
+    backend.set_many({"small": b"small", "large": bytes(10_000)})
+    # Only a small pointer is kept in Redis.
+    assert backend.size_of("small") > 5
+    assert backend.size_of("large") < 1000
+    assert offload_backend.has("large") and not offload_backend.has("small")
+    assert backend.get_many("small", "large") == [b"small", bytes(10_000)]
+    backend.delete("large")
+    assert backend.get("large") is None and not offload_backend.has("large")
+
+
+def test_redis_backend_connection_pool():
+    fakeredis = pytest.importorskip("fakeredis")
+    redis = pytest.importorskip("redis")
+    backend = RedisBackend(
+        connection_class=fakeredis.FakeConnection, server=fakeredis.FakeServer(), max_connections=2, pool_timeout=1
+    )
+    # The client is created lazily, and re-created if the process id changes (i.e. after a fork).
+    assert backend._client is None
+    client = backend._write_client
+    assert backend._read_client is client
+    backend.set("a", 1)
+    assert backend.get("a") == 1
+    backend._client_pid = -1
+    assert backend._write_client is not client
+    # The connection pool statistics are tracked.
+    backend.get("a")
+    stats = backend.pool_stats
+    assert stats["connections_acquired"] == 3 and stats["max_connections"] == 2 and stats["connections"] == 1
+    assert stats["max_wait_time"] <= stats["wait_time"] < 1
+    # Keyword arguments of the Redis client are mapped to the connection pool.
+    pool = RedisBackend(ssl=True, ssl_cert_reqs="none", port=6380)._write_client.connection_pool
+    assert pool.connection_class is redis.SSLConnection and pool.connection_kwargs["port"] == 6380
+    pool = RedisBackend(unix_socket_path="/tmp/redis.sock", ssl=False)._write_client.connection_pool
+    assert pool.connection_class is redis.UnixDomainSocketConnection
+    assert pool.connection_kwargs["path"] == "/tmp/redis.sock" and "host" not in pool.connection_kwargs
+
+
+def test_shared_memory_backend(tmp_path):
+    np = pytest.importorskip("numpy")
+    backend = SharedMemoryBackend(path=str(tmp_path), max_bytes=20_000)
+    backend.set("arr", np.arange(1000))
+    backend.set("df", pd.DataFrame({"a": [1, 2, 3]}))
+    # Arrays are mapped read-only, i.e. without copying.
+    arr = backend.get("arr")
+    assert np.array_equal(arr, np.arange(1000)) and not arr.flags.writeable
+    assert backend.get("df")["a"].tolist() == [1, 2, 3]
+    # Removing an entry doesn't invalidate values in use.
+    backend.delete("arr")
+    assert not backend.has("arr") and arr.sum() == np.arange(1000).sum()
+    # The least recently used entries are removed, when the size exceeds max_bytes.
+    for i in range(3):
+        time.sleep(0.01)
+        backend.set(f"big{i}", np.zeros(1000))
+        backend.get("df")
+    assert backend.size <= 20_000
+    assert backend.has("df") and backend.has("big2") and not backend.has("big0")
+    # The directory is only scanned periodically, or when the tracked size exceeds max_bytes.
+    backend = SharedMemoryBackend(path=str(tmp_path / "scan"), max_bytes=10**6, scan_interval=60)
+    scans = []
+    entries = backend._entries
+    backend._entries = lambda: scans.append(1) or entries()
+    for i in range(10):
+        backend.set(f"small{i}", np.zeros(10))
+    assert len(scans) == 1
+    backend.set("large0", np.zeros(100_000))
+    backend.set("large1", np.zeros(100_000))
+    assert len(scans) == 2 and backend.has("large1") and not backend.has("small0")
+    assert backend.size <= 10**6
+
+
+def test_serializer_registry_compression(tmp_path):
+    fakeredis = pytest.importorskip("fakeredis")
+    df = pd.DataFrame({"a": range(10_000), "b": ["x"] * 10_000})
+    registry = ServersideSerializerRegistry(codec="zlib", compression_threshold=1024)
+    data = registry.dumps(df)
+    assert data.startswith(registry.magic_compressed) and len(data) < len(ServersideSerializerRegistry().dumps(df))
+    assert registry.loads(data).equals(df)
+    # Small values are not compressed.
+    assert registry.dumps(1).startswith(registry.magic) and registry.loads(registry.dumps(1)) == 1
+    # Uncompressed entries remain readable.
+    FileSystemBackend(cache_dir=str(tmp_path)).set("legacy", df)
+    backend = FileSystemBackend(cache_dir=str(tmp_path), codec="zlib")
+    backend.set("df", df)
+    assert backend.get("legacy").equals(df) and backend.get("df").equals(df)
+    assert backend.size_of("df") < backend.size_of("legacy")
+    client = fakeredis.FakeRedis()
+    RedisBackend(host=client).set("legacy", df)
+    backend = RedisBackend(host=client, codec="zlib")
+    backend.set("df", df)
+    assert backend.get("legacy").equals(df) and backend.get("df").equals(df)
+    assert backend.size_of("df") < backend.size_of("legacy")
+
+
+@pytest.mark.parametrize("backend_type", ["file_system", "memory"])
+def test_serverside_output_transform_table_arguments(tmp_path, backend_type):
+    pc = pytest.importorskip("pyarrow.compute")
+    if backend_type == "file_system":
+        backend = FileSystemBackend(cache_dir=str(tmp_path), serializer=ServersideSerializerRegistry())
+    else:
+        backend = MemoryBackend()
+    transform = ServersideOutputTransform(backends=[backend])
+    df = pd.DataFrame({"a": range(100), "b": [f"b{i}" for i in range(100)], "c": [i % 3 for i in range(100)]})
+    ref = transform._try_dump(Serverside(df))
+    cbp = CallbackBlueprint(Output("table", "data"), Input("page", "data"), State("store", "data"))
+
+    def show_page(page, data: ServersideTable):
+        assert isinstance(data, ServersideTable)
+        return data.slice(page * 10, (page + 1) * 10).columns(["b"]).to_pandas()["b"].tolist()
+
+    cbp.f = show_page
+    transform.apply_serverside([cbp])
+    assert cbp.f(2, ref) == [f"b{i}" for i in range(20, 30)]
+    # Operations can be chained.
+    table = ServersideTable(functools.partial(transform._load_table, ref))
+    selection = table.filter(pc.field("c") == 0).slice(-2).columns(["a"])
+    assert selection.to_pandas()["a"].tolist() == [96, 99]
+    assert len(table) == 100 and table.column_names == ["a", "b", "c"]
+
+
+def test_serverside_output_transform_versioned():
+    backend = MemoryBackend()
+    transform = ServersideOutputTransform(backends=[backend], max_segments=3)
+    refs = []
+    for i in range(3):
+        refs.append(transform._try_dump(Serverside.append("live", pd.DataFrame({"a": [2 * i, 2 * i + 1]}))))
+    # Each reference resolves to a consistent snapshot.
+    assert transform._try_load(refs[0])["a"].tolist() == [0, 1]
+    assert transform._try_load(refs[2])["a"].tolist() == list(range(6))
+    # Only the delta is written per update.
+    assert backend.get("live#s3")[1]["a"].tolist() == [4, 5]
+    # When the number of segments exceeds max_segments, they are compacted (in the background).
+    ref = transform._try_dump(Serverside.append("live", pd.DataFrame({"a": [6]})))
+    assert transform.flush(timeout=5)
+    assert backend.get("live#v4") == ["live#c4"]
+    assert transform._try_load(ref)["a"].tolist() == list(range(7))
+    ref = transform._try_dump(Serverside.append("live", pd.DataFrame({"a": [7]})))
+    assert transform._try_load(ref)["a"].tolist() == list(range(8))
+    # The segments and manifests superseded by a compaction are removed at the next one.
+    for i in range(8, 10):
+        ref = transform._try_dump(Serverside.append("live", pd.DataFrame({"a": [i]})))
+    assert transform.flush(timeout=5)
+    assert transform._try_load(ref)["a"].tolist() == list(range(10))
+    assert not any(backend.has(f"live#{k}") for k in ["s1", "s4", "v1", "v3"])
+    assert {"live#s5", "live#v4", "live#c4"} <= set(backend.get("live#gc")["keys"])
+    # Dicts can be patched.
+    transform._try_dump(Serverside.replace("config", {"a": 1, "b": 2}))
+    ref = transform._try_dump(Serverside.patch("config", {"b": 3}))
+    assert transform._try_load(ref) == {"a": 1, "b": 3}
+
+
+def test_serverside_output_transform_versioned_concurrent(tmp_path):
+    backend = FileSystemBackend(cache_dir=str(tmp_path))
+    transform = ServersideOutputTransform(backends=[backend], max_segments=100)
+    # Concurrent updates of a key are serialized (via a lock file), i.e. no update is lost.
+    threads = [threading.Thread(target=transform._try_dump, args=(Serverside.append("live", [i]),)) for i in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    ref = transform._try_dump(Serverside.append("live", [16]))
+    assert sorted(transform._try_load(ref)) == list(range(17))
+    assert not any(name.endswith(".lock") for name in os.listdir(tmp_path))
+
+
+def test_serverside_route(tmp_path):
+    backend = FileSystemBackend(cache_dir=str(tmp_path), serializer=ServersideSerializerRegistry())
+    transform = ServersideOutputTransform(backends=[backend], session_scoped=True, reap_interval=None)
+    app = DashProxy(transforms=[transform], serverside_route=True)
+    app.server.secret_key = "secret"
+    assert "/_dash-serverside" in app.routes
+
+    def get(ref, **headers):
+        with app.server.test_request_context("/_dash-serverside", query_string={"ref": ref}, headers=headers):
+            flask.session["session_id"] = "abc"
+            try:
+                response = app._serve_serverside()
+            except HTTPException as e:
+                return e.code, None, {}
+            return response.status_code, b"".join(response.response), response.headers
+
+    df = pd.DataFrame({"a": range(1000)})
+    ref = transform._try_dump(Serverside(df, key="abc/frame"))
+    # Arrow entries are streamed as stored.
+    status, data, headers = get(ref)
+    assert status == 200
+    assert headers["X-Serverside-Format"] == "arrow"
+    with open(backend._get_filename("abc/frame"), "rb") as f:
+        assert f.read().endswith(data)
+    # Range requests.
+    status, chunk, headers = get(ref, Range="bytes=10-19")
+    assert status == 206
+    assert chunk == data[10:20]
+    assert headers["Content-Range"] == f"bytes 10-19/{len(data)}"
+    assert get(ref, Range=f"bytes={len(data)}-")[0] == 416
+    # Conditional requests.
+    assert get(ref, **{"If-None-Match": headers["ETag"]})[0] == 304
+    # Other values are served as JSON.
+    ref = transform._try_dump(Serverside({"a": 1}, key="abc/dict"))
+    assert json.loads(get(ref)[1]) == {"a": 1}
+    # Values of other sessions are rejected.
+    ref = transform._try_dump(Serverside({"a": 1}, key="xyz/dict"))
+    assert get(ref)[0] == 403
+    assert get(transform._reference(backend.uid, "abc/missing"))[0] == 404
+
+
+def test_serverside_output_transform_auto_offload():
+    transform = ServersideOutputTransform(backends=[MemoryBackend()], offload_threshold=10_000)
+    transform.layout(
+        html.Div([dcc.Store(id="store"), dcc.Store(id={"type": "store", "index": 0}), html.Div(id="div")]), False
+    )
+    cbp = CallbackBlueprint(
+        [Output("store", "data"), Output({"type": "store", "index": MATCH}, "data"), Output("div", "children")],
+        Input("btn", "n_clicks"),
+    )
+    cbp.f = lambda n: (list(range(n)), list(range(n)), list(range(n)))
+    transform.apply_serverside([cbp])
+    # Small outputs are returned as-is.
+    assert cbp.f(10) == (list(range(10)), list(range(10)), list(range(10)))
+    # Large outputs targeting a store are offloaded, while other outputs are not.
+    store, pattern_store, div = cbp.f(10_000)
+    assert store.startswith(transform.prefix) and pattern_store.startswith(transform.prefix)
+    assert transform._try_load(store) == list(range(10_000))
+    assert div == list(range(10_000))
+    # Outputs can be marked explicitly, e.g. for components not in the (static) layout.
+    cbp = CallbackBlueprint(
+        [EnrichedOutput("dynamic", "data", offload=True), EnrichedOutput("store", "data", offload=False)],
+        Input("btn", "n_clicks"),
+    )
+    cbp.f = lambda n: (list(range(n)), list(range(n)))
+    transform.apply_serverside([cbp])
+    dynamic, store = cbp.f(10_000)
+    assert dynamic.startswith(transform.prefix) and store == list(range(10_000))
+
+
+def test_serverside_output_transform_auto_offload_dynamic_layout(caplog):
+    transform = ServersideOutputTransform(backends=[MemoryBackend()], offload_threshold=10_000)
+    for _ in range(2):
+        transform.layout(html.Div([dcc.Store(id="store")]), True)
+    assert len([r for r in caplog.records if "EnrichedOutput(offload=True)" in r.message]) == 1
+
+
+def test_serverside_output_transform_routing(tmp_path):
+    import numpy as np
+
+    small, large = MemoryBackend(), ShardedFileSystemBackend(cache_dir=str(tmp_path / "sharded"))
+    arrays, default = SharedMemoryBackend(path=str(tmp_path / "shm")), FileSystemBackend(cache_dir=str(tmp_path / "fs"))
+    policy = ServersideRoutingPolicy(
+        [
+            ServersideRoute(arrays, types=(np.ndarray,)),
+            ServersideRoute(small.uid, max_bytes=1000),
+            ServersideRoute(large, types=(pd.DataFrame,), min_bytes=1000),
+            ServersideRoute(small.uid, hint="hot"),
+        ]
+    )
+    transform = ServersideOutputTransform(backends=[default, small], routing_policy=policy)
+
+    def backend_uid(ref):
+        return json.loads(ref[len(transform.prefix) :])["backend_uid"]
+
+    # The backend is picked by type, size and hint, and recorded in the reference.
+    assert backend_uid(transform._try_dump(Serverside(np.arange(10)))) == arrays.uid
+    assert backend_uid(transform._try_dump(Serverside([1, 2, 3]))) == small.uid
+    assert backend_uid(transform._try_dump(Serverside(pd.DataFrame({"a": range(1000)})))) == large.uid
+    assert backend_uid(transform._try_dump(Serverside(list(range(1000))))) == default.uid
+    assert backend_uid(transform._try_dump(Serverside(list(range(1000)), hint="hot"))) == small.uid
+    # Explicit backends take precedence.
+    assert backend_uid(transform._try_dump(Serverside([1, 2, 3], backend=default))) == default.uid
+    ref = transform._try_dump(Serverside(np.arange(10)))
+    assert transform._try_load(ref).tolist() == list(range(10))
+    # Per output backends and hints.
+    cbp = CallbackBlueprint(
+        [EnrichedOutput("a", "data", backend=large), EnrichedOutput("b", "data", hint="hot")], Input("btn", "n_clicks")
+    )
+    cbp.f = lambda n: (Serverside(list(range(n))), Serverside(list(range(n))))
+    transform.apply_serverside([cbp])
+    assert [backend_uid(ref) for ref in cbp.f(1000)] == [large.uid, small.uid]
+    # Backends set on outputs are registered with the callbacks, i.e. also in processes that never invoked them.
+    other = FileSystemBackend(cache_dir=str(tmp_path / "other"))
+    assert other.uid not in transform._backend_registry
+    cbp = CallbackBlueprint(EnrichedOutput("c", "data", backend=other), Input("btn", "n_clicks"))
+    cbp.f = lambda n: Serverside(n)
+    transform.apply_serverside([cbp])
+    assert other.uid in transform._backend_registry
+    # Unknown backends (e.g. returned by a custom policy) are rejected.
+    policy.route = lambda value, hint=None: FileSystemBackend(cache_dir=str(tmp_path / "unknown"))
+    with pytest.raises(ValueError, match="Unknown serverside backend"):
+        transform._try_dump(Serverside([1, 2, 3]))
+    with pytest.raises(ValueError, match="Unknown serverside backend"):
+        transform._try_load(transform._reference("unknown", "key"))
+
+
+def test_serialization_transform_plans():
+    @dataclass
+    class Model:
+        value: int
+
+    def trivial(n_clicks) -> int:
+        return n_clicks
+
+    def annotated(n_clicks: int, model: Model, *args) -> Model:
+        return Model(value=model.value + n_clicks + len(args))
+
+    def unannotated_return(n_clicks: int, **kwargs):
+        return Model(value=n_clicks)
+
+    transform = DataclassTransform()
+    cbps = []
+    for f in [trivial, annotated, unannotated_return]:
+        cbp = CallbackBlueprint(Output("store", "data"), Input("btn", "n_clicks"))
+        cbp.f = f
+        cbps.append(cbp)
+    transform.apply_serverside(cbps)
+    # Callbacks that need no (un)packing are not wrapped.
+    assert cbps[0].f is trivial
+    assert cbps[1].f(1, {"value": 2}, "a") == {"value": 4}
+    assert cbps[1].f(n_clicks=1, model={"value": 2}) == {"value": 3}
+    # Outputs are dumped, unless the return annotation rules out models.
+    assert cbps[2].f(1, extra={"value": 2}) == {"value": 1}
+    # The serverside transform loads all arguments, but dumps only outputs that might hold Serverside objects.
+    transform = ServersideOutputTransform(backends=[MemoryBackend()])
+    ref = transform._try_dump(Serverside([1, 2, 3]))
+    cbp = CallbackBlueprint(Output("store", "data"), Input("btn", "n_clicks"))
+
+    def load_only(data) -> int:
+        return sum(data)
+
+    cbp.f = load_only
+    transform.apply_serverside([cbp])
+    assert cbp.f(ref) == 6
+    assert not transform._compile_plan(cbp).dump
+
+
+T = TypeVar("T")
+
+
+@pytest.mark.parametrize("ann", [Any, object, T, Any | None, "Serverside"])
+def test_serialization_transform_non_concrete_annotations(ann):
+    @dataclass
+    class Model:
+        value: int
+
+    # Annotations that don't rule out the type, e.g. Any, object or a type variable, are dumped.
+    transform = ServersideOutputTransform(backends=[MemoryBackend()])
+    cbp = CallbackBlueprint(Output("store", "data"), Input("btn", "n_clicks"))
+
+    def update(n_clicks):
+        return Serverside([n_clicks])
+
+    update.__annotations__["return"] = ann
+    cbp.f = update
+    transform.apply_serverside([cbp])
+    assert transform._try_load(cbp.f(1)) == [1]
+    transform = DataclassTransform()
+    cbp = CallbackBlueprint(Output("store", "data"), Input("btn", "n_clicks"))
+
+    def update_model(n_clicks):
+        return Model(value=n_clicks)
+
+    update_model.__annotations__["return"] = ann
+    cbp.f = update_model
+    transform.apply_serverside([cbp])
+    assert cbp.f(1) == {"value": 1}
+
+
+def test_serialization_transform_nested():
+    class Model(BaseModel):
+        value: int
+
+    # Models are (un)packed within nested (flexible signature) structures, guided by the annotations.
+    cbp = CallbackBlueprint(
+        output={"models": [Output("a", "data"), Output("b", "data")], "total": Output("c", "children")},
+        inputs={"pair": {"x": Input("x", "data"), "y": Input("y", "data")}, "many": Input({"id": ALL}, "data")},
+    )
+
+    def combine(pair: dict[str, Model], many: list[Model]):
+        return {"models": [pair["x"], Model(value=sum(m.value for m in many))], "total": pair["y"].value}
+
+    cbp.f = combine
+    BaseModelTransform().apply_serverside([cbp])
+    pair, many = {"x": '{"value": 1}', "y": {"value": 2}}, [{"value": 3}, {"value": 4}]
+    assert cbp.f(pair=pair, many=many) == {"models": ['{"value":1}', '{"value":7}'], "total": 2}
+    assert pair["x"] == '{"value": 1}'  # arguments are not modified in-place
+    # Serverside values/references are resolved within nested structures.
+    transform = ServersideOutputTransform(backends=[MemoryBackend()])
+    cbp = CallbackBlueprint(
+        output={"frames": [Output("a", "data"), Output("b", "data")], "summary": Output("c", "data")},
+        inputs={"refs": {"x": Input("x", "data"), "y": Input("y", "data")}},
+    )
+
+    def split(refs) -> dict:
+        return {
+            "frames": [Serverside(refs["x"]), Serverside(refs["y"])],
+            "summary": {"total": {"value": Serverside(refs["x"] + refs["y"])}},
+        }
+
+    cbp.f = split
+    transform.apply_serverside([cbp])
+    refs = {"x": transform._try_dump(Serverside([1])), "y": transform._try_dump(Serverside([2]))}
+    result = cbp.f(refs=refs)
+    assert [transform._try_load(ref) for ref in result["frames"]] == [[1], [2]]
+    # Values (e.g. a dict) not described by the structure are walked one level deep, deeper only if the annotation
+    # says so.
+    assert isinstance(result["summary"]["total"]["value"], Serverside)
+
+    class Result(TypedDict):
+        frames: list
+        summary: dict[str, dict[str, Serverside[list]]]
+
+    def split_annotated(refs) -> Result:
+        return split(refs)
+
+    cbp.f = split_annotated
+    transform.apply_serverside([cbp])
+    assert transform._try_load(cbp.f(refs=refs)["summary"]["total"]["value"]) == [1, 2]
+
+
+@pytest.mark.parametrize("annotation", [None, dict, Any])
+def test_serialization_transform_unannotated_dict(annotation):
+    class Model(BaseModel):
+        value: int
+
+    # Dicts with unknown items (e.g. returned by callbacks that are not annotated) are dumped one level deep.
+    def update(n_clicks):
+        return {"a": Serverside([n_clicks]), "m": Model(value=n_clicks), "b": n_clicks}
+
+    if annotation is not None:
+        update.__annotations__["return"] = annotation
+    serverside, models = ServersideOutputTransform(backends=[MemoryBackend()]), BaseModelTransform()
+    cbp = CallbackBlueprint(Output("store", "data"), Input("btn", "n_clicks"))
+    cbp.f = update
+    models.apply_serverside(serverside.apply_serverside([cbp]))
+    result = cbp.f(1)
+    assert serverside._try_load(result["a"]) == [1]
+    assert result["m"] == '{"value":1}' and result["b"] == 1
+    json.dumps(result)  # JSON serializable
+
+
+@pytest.mark.parametrize("annotated", [False, True])
+def test_serialization_transform_wildcard_tuple(annotated):
+    # Values for ALL wildcard outputs might be returned as a tuple.
+    transform = ServersideOutputTransform(backends=[MemoryBackend()])
+    cbp = CallbackBlueprint(Output({"id": ALL}, "data"), Input("btn", "n_clicks"))
+
+    def update(n_clicks):
+        return tuple([Serverside([n_clicks])] * 2)
+
+    def update_annotated(n_clicks) -> tuple[Serverside, ...]:
+        return update(n_clicks)
+
+    cbp.f = update_annotated if annotated else update
+    transform.apply_serverside([cbp])
+    result = cbp.f(1)
+    assert isinstance(result, tuple)
+    assert [transform._try_load(ref) for ref in result] == [[1], [1]]
+
+
+@pytest.mark.parametrize("wire_format", ["json", "dict"])
+def test_base_model_transform_wire_format(wire_format):
+    class Model(BaseModel):
+        value: int
+        items: list[int]
+
+    transform = BaseModelTransform(wire_format=wire_format)
+    model = Model(value=1, items=[1, 2])
+    data = transform._try_dump(model)
+    assert isinstance(data, str if wire_format == "json" else dict)
+    assert json.loads(json.dumps(data)) == data  # JSON serializable
+    assert transform._try_load(data, Model) == model
+    assert transform._try_load(data, Model) is not model
+    with pytest.raises(ValueError):
+        BaseModelTransform(wire_format="pickle")
+
+
+def test_base_model_transform_cache():
+    validated = []
+
+    class Model(BaseModel):
+        model_config = ConfigDict(frozen=True)
+        value: int
+        items: tuple[int, ...]
+
+        @field_validator("value")
+        @classmethod
+        def count(cls, value):
+            validated.append(value)
+            return value
+
+    class Mutable(BaseModel):
+        value: int
+
+    data = Model(value=1, items=(1, 2)).model_dump_json()
+    # Without a cache (default), every payload is validated.
+    transform = BaseModelTransform()
+    transform._try_load(data, Model)
+    transform._try_load(data, Model)
+    assert validated == [1, 1, 1]
+    # With a cache, unchanged content is served from the cache, without validation.
+    transform = BaseModelTransform(cache_size=8)
+    first = transform._try_load(data, Model)
+    assert transform._try_load(data, Model) is first and validated == [1, 1, 1, 1]
+    # Models returned by the worker are reused, when sent back unchanged.
+    model, n_validated = Model(value=2, items=()), len(validated)
+    assert transform._try_load(transform._try_dump(model), Model) is model and len(validated) == n_validated
+    # Mutable models (and dict payloads) are not cached.
+    payload = Mutable(value=1).model_dump_json()
+    assert transform._try_load(payload, Mutable) is not transform._try_load(payload, Mutable)
+    assert transform._try_load(model.model_dump(), Model) is not model
+
+
+@pytest.mark.parametrize("validate", [True, False])
+def test_dataclass_transform_compiled(validate):
+    @dataclass
+    class Point:
+        x: float
+        when: datetime
+
+    @dataclass
+    class Series:
+        name: str
+        points: list[Point]
+        tags: dict[str, int]
+        origin: Point | None = None
+
+    transform = DataclassTransform(validate=validate)
+    series = Series("a", [Point(1.0, datetime(2000, 1, 1)), Point(2.5, datetime(2000, 1, 2))], {"a": 1})
+    data = transform._try_dump(series)
+    # The format matches that of dataclass_wizard, independent of validation.
+    assert data == asdict(series)
+    assert json.loads(json.dumps(data)) == data
+    assert transform._try_load(data, Series) == series
+    assert transform._try_load(json.dumps(data), Series) == series
+    # Loaders are compiled (once) per dataclass type, when the callbacks are registered.
+    cbp = CallbackBlueprint(Output("store", "data"), Input("store", "data"))
+
+    def shift(value: Series) -> Series:
+        return Series(value.name, [Point(p.x + 1, p.when) for p in value.points], value.tags)
+
+    cbp.f = shift
+    transform.apply_serverside([cbp])
+    assert Series in transform._loaders and Series in transform._dumpers
+    assert cbp.f(data)["points"][1]["x"] == 3.5
+
+
+@pytest.mark.parametrize("wire_format", ["arrow", "bdata"])
+def test_arrow_transform(wire_format):
+    np = pytest.importorskip("numpy")
+    if wire_format == "arrow":
+        pytest.importorskip("pyarrow")
+    transform = ArrowTransform(wire_format=wire_format)
+    df = pd.DataFrame({"x": np.arange(5, dtype=float), "n": np.arange(5), "label": list("abcde")})
+    df["time"] = pd.date_range("2020-01-01", periods=5)
+    data = json.loads(json.dumps(transform._try_dump(df)))
+    loaded = transform._try_load(data, pd.DataFrame)
+    pd.testing.assert_frame_equal(loaded, df)
+    # Numeric columns are backed by the decoded buffer (i.e. not copied).
+    assert not loaded["x"].to_numpy().flags.writeable
+    # Unless a copy is requested.
+    loaded = ArrowTransform(wire_format=wire_format, copy=True)._try_load(data, pd.DataFrame)
+    loaded.loc[0, "x"] = 42.0
+    assert loaded["x"].to_numpy().flags.writeable and loaded.loc[0, "x"] == 42.0
+    indexed = df.set_index("label")
+    pd.testing.assert_frame_equal(transform._try_load(transform._try_dump(indexed), pd.DataFrame), indexed)
+    # Arrays are sent as typed arrays.
+    arr = np.arange(6, dtype=np.int32).reshape(2, 3)
+    data = transform._try_dump(arr)
+    assert data["dtype"] == "i4" and data["shape"] == "2, 3"
+    loaded = transform._try_load(data, np.ndarray | None)
+    assert np.array_equal(loaded, arr) and loaded.dtype == arr.dtype
+    assert ArrowTransform(wire_format=wire_format, copy=True)._try_load(data, np.ndarray).flags.writeable
+    # Plain data is converted.
+    assert transform._try_load([1, 2], np.ndarray).tolist() == [1, 2]
+    pd.testing.assert_frame_equal(transform._try_load(df.to_dict("records"), pd.DataFrame), df)
+    # Via callbacks, only annotated arguments are decoded.
+    cbp = CallbackBlueprint(Output("store", "data"), Input("store", "data"), Input("other", "data"))
+
+    def scale(frame: pd.DataFrame, other) -> pd.DataFrame:
+        assert isinstance(frame, pd.DataFrame) and isinstance(other, dict)
+        return frame[["x"]] * 2
+
+    cbp.f = scale
+    transform.apply_serverside([cbp])
+    result = transform._try_load(cbp.f(transform._try_dump(df), transform._try_dump(df)), pd.DataFrame)
+    assert result["x"].tolist() == [0.0, 2.0, 4.0, 6.0, 8.0]
+    with pytest.raises(ValueError):
+        ArrowTransform(wire_format="json")
+
+
+def test_figure_transform():
+    np = pytest.importorskip("numpy")
+    go = pytest.importorskip("plotly.graph_objects")
+    transform = FigureTransform()
+    x, y = np.arange(100), np.linspace(0, 1, 100)
+    figure = {"data": [{"x": x, "y": pd.Series(y), "z": np.ones((2, 3)), "text": np.array(["a"] * 100)}], "layout": {}}
+    data = transform._try_dump(figure)
+    trace = data["data"][0]
+    # Integers are narrowed, and arrays that are not numeric are left as-is.
+    assert trace["x"]["dtype"] == "i1" and trace["y"]["dtype"] == "f8" and trace["z"]["shape"] == "2, 3"
+    assert isinstance(trace["text"], np.ndarray)
+    assert np.array_equal(np.frombuffer(base64.b64decode(trace["y"]["bdata"])), y)
+    # The figure itself is not modified.
+    assert figure["data"][0]["x"] is x
+    # Figure objects are encoded too, other values are passed through.
+    data = transform._try_dump(go.Figure(go.Scatter(x=x * 10**6, y=y)))
+    assert data["data"][0]["x"]["dtype"] == "i4"
+    assert transform._try_dump({"data": [x]}) == {"data": [x]}
+    # Outputs annotated with other types are not wrapped.
+    cbp = CallbackBlueprint(Output("graph", "figure"), Input("btn", "n_clicks"))
+
+    def label(n_clicks: int) -> str:
+        return str(n_clicks)
+
+    cbp.f = label
+    transform.apply_serverside([cbp])
+    assert cbp.f is label
+    # Only figure properties are encoded, i.e. not other values shaped like figures (e.g. the data of a store).
+    cbp = CallbackBlueprint(
+        Output("graph", "figure"), Output("store", "data"), Output("other", "figure"), Input("btn", "n_clicks")
+    )
+    store = {"data": [{"x": x}]}
+    cbp.f = lambda n_clicks: (figure, store, None)
+    transform.apply_serverside([cbp])
+    encoded, stored, other = cbp.f(1)
+    assert encoded["data"][0]["x"]["dtype"] == "i1" and stored is store and other is None
+    cbp = CallbackBlueprint(Output("store", "data"), Input("btn", "n_clicks"))
+    cbp.f = lambda n_clicks: figure
+    transform.apply_serverside([cbp])
+    assert cbp.f(1) is figure
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_downsample_transform(method):
+    np = pytest.importorskip("numpy")
+    go = pytest.importorskip("plotly.graph_objects")
+    n = 100_000
+    x = np.datetime64("2020-01-01") + np.arange(n).astype("timedelta64[s]")
+    y = np.random.default_rng(42).normal(size=n).cumsum()
+    transform = DownsampleTransform(backend=MemoryBackend(), max_points=500, method=method)
+    bp = DashBlueprint(transforms=[transform])
+
+    @bp.callback(Output("graph", "figure"), Input("btn", "n_clicks"), downsample=True)
+    def update(n_clicks):
+        return go.Figure([go.Scattergl(x=x, y=y), go.Bar(y=[1, 2])])
+
+    @bp.callback(
+        Output("graph", "figure", allow_duplicate=True),
+        Output("label", "children"),
+        Input("dd", "value"),
+        downsample=True,
+    )
+    def update_small(value):
+        return {"data": [{"y": [1, 2, 3]}]}, value
+
+    callbacks, _ = bp._resolve_callbacks()
+    # The relayout callback is added (once per graph), and the store holding the key is added to the layout.
+    cbp, resample = callbacks[0], callbacks[-1]
+    assert len(callbacks) == 3 and resample.inputs[0].component_property == "relayoutData"
+    bp.layout = html.Div()
+    assert isinstance(bp._layout_value().children[-1], dcc.Store)
+    figure, key = cbp.f(1, None)
+    trace = figure["data"][0]
+    assert len(trace["x"]) <= 500 and trace["x"][0] == x[0] and trace["x"][-1] == x[-1]
+    assert np.array_equal(np.frombuffer(base64.b64decode(trace["y"]["bdata"])), y[np.isin(x, trace["x"])])
+    assert figure["data"][1]["y"] == [1, 2]
+    # Keys are generated server side, and the replaced data is deleted.
+    new_key = cbp.f(2, key)[1]
+    assert new_key != key and transform.backend.get(key) is None
+    key = new_key
+    # Only the visible range is re-sampled.
+    patch, store = resample.f({"xaxis.range[0]": "2020-01-01 01:00:00", "xaxis.range[1]": "2020-01-01 01:05:00.5"}, key)
+    assert store is no_update
+    operations = {tuple(o["location"]): o["params"]["value"] for o in patch.to_plotly_json()["operations"]}
+    assert len(operations[("data", 0, "x")]) == 5 * 60 + 3
+    assert operations[("data", 0, "x")][1] == np.datetime64("2020-01-01T01:00:00")
+    patch, _ = resample.f({"xaxis.autorange": True}, key)
+    assert len(patch.to_plotly_json()["operations"][0]["params"]["value"]) <= 500
+    with pytest.raises(PreventUpdate):
+        resample.f({"yaxis.range[0]": 0, "yaxis.range[1]": 1}, key)
+    # Keys (and values) passed by the client, which were not created by the transform, are ignored.
+    transform.backend.set("other", {"traces": []})
+    transform.backend.set("downsample_" + "0" * 32, {"traces": 1})
+    for other in ["other", "downsample_" + "0" * 32, {"traces": []}]:
+        with pytest.raises(PreventUpdate):
+            resample.f({"xaxis.autorange": True}, other)
+    # Callbacks targeting the same graph share the store, and figures without large traces reset the key.
+    assert callbacks[1].outputs[-1].component_id == cbp.outputs[-1].component_id
+    assert callbacks[1].f("a", key) == [{"data": [{"y": [1, 2, 3]}]}, "a", None]
+    assert transform.backend.get(key) is None
+    # If the data is gone (e.g. evicted), the figure is annotated, and the key is reset.
+    patch, store = resample.f({"xaxis.autorange": True}, key)
+    (operation,) = patch.to_plotly_json()["operations"]
+    assert operation["location"] == ["layout", "annotations"] and "unavailable" in operation["params"]["value"]["text"]
+    assert store is None
+    with pytest.raises(ValueError):
+        DownsampleTransform(method="random")
+
+
+def test_downsample_transform_annotated_arguments():
+    np = pytest.importorskip("numpy")
+
+    class Settings(BaseModel):
+        scale: float
+
+    # The serialization transforms (applied after downsampling) follow the signature of the original callback.
+    bp = DashBlueprint(transforms=[DownsampleTransform(backend=MemoryBackend(), max_points=100), BaseModelTransform()])
+
+    @bp.callback(Output("graph", "figure"), Input("settings", "data"), downsample=True)
+    def update(settings: Settings):
+        assert isinstance(settings, Settings)
+        return {"data": [{"type": "scattergl", "x": np.arange(10_000), "y": np.ones(10_000) * settings.scale}]}
+
+    callbacks, _ = bp._resolve_callbacks()
+    figure, key = callbacks[0].f({"scale": 2.0}, None)
+    assert len(figure["data"][0]["x"]) <= 100 and key.startswith("downsample_")